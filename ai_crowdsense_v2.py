@@ -3,11 +3,15 @@ import requests
 import time
 import json
 from datetime import datetime, timedelta, timezone
-from collections import deque, defaultdict
+from collections import defaultdict
 from twilio.rest import Client
 
 from dotenv import load_dotenv
 
+from core.query_planner import build_or_query, plan_keyword_queries, demultiplex
+from core.time_buckets import BucketedCounter
+from utils.rate_limiter import MAX_WAIT, get_rate_limiter
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -20,6 +24,7 @@ TWILIO_SID = os.getenv("TWILIO_SID")
 TWILIO_AUTH = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE = os.getenv("TWILIO_PHONE")
 MY_PHONE = os.getenv("MY_PHONE")
+MAX_QUERY_LENGTH = int(os.getenv("TWITTER_MAX_QUERY_LENGTH", "512"))
 
 # disaster keywords to monitor
 DISASTER_KEYWORDS = [
@@ -36,14 +41,17 @@ DISASTER_KEYWORDS = [
 WINDOW = timedelta(minutes=15)  # Longer window
 THRESHOLD = 2  # Lower threshold
 ALERT_COOLDOWN = timedelta(minutes=30)
-API_RETRY_DELAY = 900  # 15 minutes for 429 errors
 CYCLE_DELAY = 120  # 2 minutes between cycles
 
+# Keywords are packed into as few OR queries as fit, one query per cycle
+QUERY_FILTERS = "-is:retweet -is:reply lang:en"
+TWEETS_PER_KEYWORD = 10
+QUERY_GROUPS = plan_keyword_queries(DISASTER_KEYWORDS, MAX_QUERY_LENGTH, QUERY_FILTERS)
+
 # Use separate tracking for each keyword
-tweet_times = defaultdict(deque)
+tweet_buckets = BucketedCounter(bucket_seconds=10, horizon=WINDOW)
 last_alert_time = defaultdict(lambda: None)
-api_retry_time = None
-current_keyword_index = 0  # Rotate through keywords
+current_group_index = 0  # Rotate through query groups
 
 # ---------------- TWILIO SETUP ----------------
 twilio_client = Client(TWILIO_SID, TWILIO_AUTH)
@@ -52,6 +60,7 @@ twilio_client = Client(TWILIO_SID, TWILIO_AUTH)
 def send_sms_alert(message: str):
     """Send SMS using Twilio"""
     try:
+        get_rate_limiter("twilio").acquire()
         message_obj = twilio_client.messages.create(
             body=message,
             from_=TWILIO_PHONE,
@@ -90,7 +99,14 @@ def call_groq_ai(prompt, max_tokens=500):
         print(f"   Max tokens: {max_tokens}")
         print(f"   Prompt length: {len(prompt)} characters")
 
+        groq_limiter = get_rate_limiter("groq")
+        if not groq_limiter.acquire(timeout=MAX_WAIT):
+            wait = groq_limiter.wait_time()
+            print(f"⏱️  Groq budget exhausted, next call in {wait:.0f}s")
+            return None
+
         response = requests.post(url, headers=headers, json=data, timeout=30)
+        groq_limiter.update_from_headers(response.headers, response.status_code)
 
         print(f"🌐 Groq API Response: {response.status_code}")
 
@@ -237,7 +253,12 @@ def fetch_news_with_queries(search_queries):
         try:
             print(f"📰 NEWS SEARCH #{i}: '{query}'")
             url = f"https://newsapi.org/v2/everything?q={query}&sortBy=publishedAt&apiKey={NEWS_API_KEY}&pageSize=3&language=en"
+            news_limiter = get_rate_limiter("newsapi")
+            if not news_limiter.acquire(timeout=MAX_WAIT):
+                print("   ⏱️  News API budget exhausted, skipping")
+                break
             response = requests.get(url)
+            news_limiter.update_from_headers(response.headers, response.status_code)
 
             if response.status_code == 200:
                 data = response.json()
@@ -364,35 +385,42 @@ def create_sms_alert(summary, news_urls, keyword, location):
 
 # ---------------- IMPROVED TWITTER FETCH ----------------
 def fetch_tweets():
-    global api_retry_time, current_keyword_index
+    global current_group_index
 
-    # Check if we're in API cooldown
-    if api_retry_time and datetime.now(timezone.utc) < api_retry_time:
-        remaining = (api_retry_time - datetime.now(timezone.utc)).total_seconds()
-        print(f"⏱️  API cooldown: {remaining/60:.1f} minutes remaining")
+    # Wait for the Twitter budget instead of burning the window and idling
+    twitter_limiter = get_rate_limiter("twitter")
+    if not twitter_limiter.try_acquire():
+        minutes = twitter_limiter.wait_time() / 60
+        print(f"⏱️  API budget: next request in {minutes:.1f} minutes")
         return
 
     current_time = datetime.now(timezone.utc)
     print(f"🔍 AI Tweet Analysis - {current_time.strftime('%H:%M:%S')}")
 
-    # Process ONE keyword per cycle to avoid rate limits
-    kw = DISASTER_KEYWORDS[current_keyword_index]
-    print(f"📡 Keyword #{current_keyword_index + 1}/{len(DISASTER_KEYWORDS)}: '{kw}'")
-    current_keyword_index = (current_keyword_index + 1) % len(DISASTER_KEYWORDS)
+    # Process ONE packed query per cycle to avoid rate limits
+    keywords = QUERY_GROUPS[current_group_index]
+    print(f"📡 Query #{current_group_index + 1}/{len(QUERY_GROUPS)}: {keywords}")
+    current_group_index = (current_group_index + 1) % len(QUERY_GROUPS)
 
     # Better Twitter query
-    query = f'"{kw}" -is:retweet -is:reply lang:en'
-    url = f"https://api.twitter.com/2/tweets/search/recent?query={query}&max_results=10&tweet.fields=created_at"
+    query = build_or_query(keywords, QUERY_FILTERS)
+    url = "https://api.twitter.com/2/tweets/search/recent"
+    params = {
+        "query": query,
+        "max_results": min(100, TWEETS_PER_KEYWORD * len(keywords)),
+        "tweet.fields": "created_at",
+    }
     headers = {"Authorization": f"Bearer {BEARER_TOKEN}"}
 
     try:
         print(f"🌐 API Call: {query}")
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=headers, params=params)
+        twitter_limiter.update_from_headers(response.headers, response.status_code)
         print(f"🌐 Status: {response.status_code}")
 
         if response.status_code == 429:
-            print("🚫 RATE LIMITED - 15min cooldown")
-            api_retry_time = current_time + timedelta(seconds=API_RETRY_DELAY)
+            minutes = twitter_limiter.wait_time() / 60
+            print(f"🚫 RATE LIMITED - retrying in {minutes:.1f} minutes")
             return
         elif response.status_code == 401:
             print("❌ AUTH FAILED - Check bearer token")
@@ -405,30 +433,28 @@ def fetch_tweets():
         response_data = response.json()
 
         if "data" in response_data:
-            tweets_data = response_data["data"]
-            print(f"✅ Found {len(tweets_data)} tweets")
-
-            # Add to tracking
-            for _ in tweets_data:
-                tweet_times[kw].append(current_time)
+            print(f"✅ Found {len(response_data['data'])} tweets")
         else:
             print(f"ℹ️  No tweets found")
-            tweets_data = []
+
+        # Split the packed results back out per keyword
+        tweets_by_keyword = demultiplex(response_data.get("data", []), keywords)
 
     except Exception as e:
         print(f"🚨 Network error: {e}")
         return
 
-    # Clean old tweets
-    old_count = len(tweet_times[kw])
-    while tweet_times[kw] and current_time - tweet_times[kw][0] > WINDOW:
-        tweet_times[kw].popleft()
-    cleaned_count = old_count - len(tweet_times[kw])
+    for kw in keywords:
+        print(f"🔑 '{kw}': {len(tweets_by_keyword[kw])} tweets")
+        process_keyword(kw, tweets_by_keyword[kw], current_time)
+
+    print("=" * 60)
 
-    if cleaned_count > 0:
-        print(f"🧹 Cleaned {cleaned_count} old tweets")
 
-    current_count = len(tweet_times[kw])
+def process_keyword(kw, tweets_data, current_time):
+    # Add to tracking; tweets older than the window fall out of the buckets
+    tweet_buckets.add(kw, len(tweets_data), current_time.timestamp())
+    current_count = tweet_buckets.window_sum(kw, WINDOW, current_time.timestamp())
     print(
         f"📊 Window: {current_count}/{THRESHOLD} tweets in {WINDOW.total_seconds()/60:.0f}min"
     )
@@ -471,7 +497,7 @@ def fetch_tweets():
                 if send_sms_alert(alert_msg):
                     print("✅ Alert sent!")
 
-                tweet_times[kw].clear()
+                tweet_buckets.clear(kw)
                 print("🔄 Window reset")
             else:
                 print("❌ AI rejected - not a valid disaster")
@@ -483,8 +509,6 @@ def fetch_tweets():
         needed = THRESHOLD - current_count
         print(f"✅ Need {needed} more tweets for alert")
 
-    print("=" * 60)
-
 
 # ---------------- MAIN LOOP ----------------
 if __name__ == "__main__":
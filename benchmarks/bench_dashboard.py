@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark dashboard polling with and without the snapshot cache
+
+Runs a number of concurrent pollers hitting the dashboard data for a fixed
+time against a throwaway database, and reports requests served per second
+and how many times the dashboard data was actually built from the database.
+
+Usage:
+    python benchmarks/bench_dashboard.py --pollers 1 10 50 --seconds 2
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+import tempfile
+import threading
+import time
+
+from core import database
+
+
+def populate(tweets: int):
+    with database.get_db_connection() as conn:
+        conn.executemany("""
+            INSERT INTO tweets (tweet_id, keyword, text, created_at)
+            VALUES (?, 'flood', 'water rising', datetime('now', ?))
+        """, ((str(i), f'-{i} seconds') for i in range(tweets)))
+        conn.executemany("""
+            INSERT INTO alerts (keyword, message, tweet_count, created_at)
+            VALUES ('flood', 'Flood activity detected', 10, datetime('now', ?))
+        """, ((f'-{i} minutes',) for i in range(50)))
+        conn.commit()
+
+
+def poll(fetch, pollers: int, seconds: float) -> int:
+    served = [0] * pollers
+    deadline = time.perf_counter() + seconds
+
+    def run(index):
+        while time.perf_counter() < deadline:
+            fetch()
+            served[index] += 1
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(pollers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(served)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark cached vs uncached dashboard data')
+    parser.add_argument('--pollers', type=int, nargs='+', default=[1, 10, 50],
+                        help='Concurrent dashboard pollers')
+    parser.add_argument('--seconds', type=float, default=2.0,
+                        help='Polling time per run')
+    parser.add_argument('--tweets', type=int, default=100000,
+                        help='Tweets stored in the database')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database.DATABASE_PATH = os.path.join(tmpdir, "bench.db")
+        database.init_database()
+        populate(args.tweets)
+
+        from core import crowdsense_enhanced
+        try:
+            print(f"{'pollers':>7} {'uncached (req/s)':>17} {'cached (req/s)':>15} "
+                  f"{'builds':>7}")
+            cache = crowdsense_enhanced.dashboard_cache
+            for pollers in args.pollers:
+                uncached = poll(crowdsense_enhanced.get_dashboard_data, pollers,
+                                args.seconds)
+                cache.clear()
+                builds = cache.builds
+                cached = poll(crowdsense_enhanced.get_cached_dashboard_data, pollers,
+                              args.seconds)
+                builds = cache.builds - builds
+                print(f"{pollers:>7} {uncached / args.seconds:>17.0f} "
+                      f"{cached / args.seconds:>15.0f} {builds:>7}")
+        finally:
+            database.connection_pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark priming the anomaly detector from tweet_metrics
+
+Compares loading every keyword's history with one query per keyword against
+the single bulk query, on a throwaway database holding a few hours of
+per-minute metrics for each keyword.
+
+Usage:
+    python benchmarks/bench_history_load.py --keywords 10 1000 10000 --rows 120
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+import tempfile
+import time
+
+from core import database
+from core.anomaly_detection import VectorizedAnomalyDetector
+
+
+def populate(keywords, rows: int):
+    with database.get_db_connection() as conn:
+        conn.execute("DELETE FROM tweet_metrics")
+        conn.executemany("""
+            INSERT INTO tweet_metrics
+                (keyword, count, window_start, window_end, created_at)
+            VALUES (?, ?, '', '', datetime('now', ?))
+        """, ((keyword, minute % 50, f'-{minute} minutes')
+              for keyword in keywords for minute in range(rows)))
+        conn.commit()
+
+
+def bench_per_keyword(keywords, window: int) -> float:
+    detector = VectorizedAnomalyDetector(keywords, window_size=window)
+    start = time.perf_counter()
+    for keyword in keywords:
+        detector.load_historical_data(keyword, hours=48)
+    return time.perf_counter() - start
+
+
+def bench_bulk(keywords, window: int) -> float:
+    detector = VectorizedAnomalyDetector(keywords, window_size=window)
+    start = time.perf_counter()
+    detector.load_historical_data_bulk(keywords, hours=48)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark per-keyword vs bulk history loading')
+    parser.add_argument('--keywords', type=int, nargs='+', default=[10, 1000, 10000],
+                        help='Keyword counts to benchmark')
+    parser.add_argument('--rows', type=int, default=120,
+                        help='Per-minute metrics rows stored per keyword')
+    parser.add_argument('--window', type=int, default=15,
+                        help='Detector window size')
+    args = parser.parse_args()
+
+    # The detectors log every keyword they load; keep that out of the timing
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database.DATABASE_PATH = os.path.join(tmpdir, "bench.db")
+        database.init_database()
+        try:
+            print(f"{'keywords':>8} {'per keyword (s)':>16} {'bulk (s)':>9} "
+                  f"{'speedup':>8}")
+            for count in args.keywords:
+                keywords = [f"keyword{i}" for i in range(count)]
+                populate(keywords, args.rows)
+                per_keyword = bench_per_keyword(keywords, args.window)
+                bulk = bench_bulk(keywords, args.window)
+                print(f"{count:>8} {per_keyword:>16.3f} {bulk:>9.3f} "
+                      f"{per_keyword / bulk:>7.1f}x")
+        finally:
+            database.connection_pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark keyword ingestion against the stand-in API server
+
+Compares one cycle of tweet fetching done serially, with a thread pool, and
+with the aiohttp engine (one query per keyword, then keywords packed into OR
+queries), for growing keyword counts.
+
+Usage:
+    python benchmarks/bench_ingestion.py --keywords 9 100 300 --latency 0.05
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from core.async_ingestion import run_ingestion_cycle
+from core.query_planner import MAX_QUERY_LENGTH
+from simulation.api_server import StandInAPIServer
+
+
+def fetch_page(session: requests.Session, base_url: str, keyword: str) -> int:
+    response = session.get(f"{base_url}/tweets/search/recent",
+                           params={'query': keyword, 'max_results': 10}, timeout=10)
+    return len(response.json().get('data', []))
+
+
+def bench_serial(base_url: str, keywords) -> float:
+    session = requests.Session()
+    start = time.perf_counter()
+    for keyword in keywords:
+        fetch_page(session, base_url, keyword)
+    return time.perf_counter() - start
+
+
+def bench_threads(base_url: str, keywords, workers: int) -> float:
+    session = requests.Session()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda keyword: fetch_page(session, base_url, keyword),
+                          keywords))
+    return time.perf_counter() - start
+
+
+def bench_async(base_url: str, keywords, max_query_length: int = None) -> float:
+    start = time.perf_counter()
+    run_ingestion_cycle(keywords, bearer_token="benchmark", twitter_base_url=base_url,
+                        max_query_length=max_query_length, rate_limiters={})
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark tweet ingestion engines')
+    parser.add_argument('--keywords', type=int, nargs='+', default=[9, 100, 300],
+                        help='Keyword counts to benchmark')
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='Simulated API latency in seconds')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Thread pool size for the threaded engine')
+    args = parser.parse_args()
+
+    with StandInAPIServer(latency=args.latency) as server:
+        print(f"{'keywords':>8} {'serial (s)':>11} {'threads (s)':>12} "
+              f"{'async (s)':>10} {'packed (s)':>11} {'queries':>8}")
+        for count in args.keywords:
+            keywords = [f"keyword{i}" for i in range(count)]
+            serial = bench_serial(server.twitter_base_url, keywords)
+            threads = bench_threads(server.twitter_base_url, keywords, args.workers)
+            async_time = bench_async(server.twitter_base_url, keywords)
+            requests_before = server.request_count
+            packed = bench_async(server.twitter_base_url, keywords, MAX_QUERY_LENGTH)
+            queries = server.request_count - requests_before
+            print(f"{count:>8} {serial:>11.3f} {threads:>12.3f} {async_time:>10.3f} "
+                  f"{packed:>11.3f} {queries:>8}")
+
+
+if __name__ == "__main__":
+    main()
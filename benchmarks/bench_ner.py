@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark location NER on a page of tweets
+
+Compares running the full spaCy pipeline once per tweet with streaming the
+page through nlp.pipe with only the NER component enabled.
+
+Usage:
+    python benchmarks/bench_ner.py --tweets 100 1000 --batch-size 64
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import itertools
+import time
+
+import spacy
+
+from core.location_extraction import _ner_disabled_components
+
+SAMPLE_TWEETS = [
+    "Breaking: Major earthquake hits San Francisco, buildings swaying downtown",
+    "Flooding reported in Mumbai's Bandra area, trains suspended",
+    "Wildfire spreads near Los Angeles, evacuation orders issued",
+    "Storm warning for Houston, Texas - stay indoors",
+    "Heavy rains causing waterlogging in Delhi NCR region",
+    "Tsunami alert issued for coastal areas of Tokyo",
+]
+
+
+def bench_per_tweet(nlp, texts) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        [ent for ent in nlp(text).ents]
+    return time.perf_counter() - start
+
+
+def bench_pipe(nlp, texts, batch_size: int) -> float:
+    disabled = _ner_disabled_components(nlp)
+    start = time.perf_counter()
+    for doc in nlp.pipe(texts, batch_size=batch_size, disable=disabled):
+        [ent for ent in doc.ents]
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched location NER')
+    parser.add_argument('--tweets', type=int, nargs='+', default=[100, 1000],
+                        help='Page sizes to benchmark')
+    parser.add_argument('--batch-size', type=int, default=64,
+                        help='nlp.pipe batch size')
+    parser.add_argument('--model', default='en_core_web_sm',
+                        help='spaCy model to load')
+    args = parser.parse_args()
+
+    try:
+        nlp = spacy.load(args.model)
+    except OSError:
+        sys.exit(f"spaCy model '{args.model}' not found. "
+                 f"Install with: python -m spacy download {args.model}")
+
+    print(f"Pipeline: {nlp.pipe_names}, "
+          f"NER pass disables: {_ner_disabled_components(nlp)}")
+    print(f"{'tweets':>8} {'per tweet (s)':>14} {'pipe (s)':>9} {'speedup':>8}")
+    for count in args.tweets:
+        texts = list(itertools.islice(itertools.cycle(SAMPLE_TWEETS), count))
+        per_tweet = bench_per_tweet(nlp, texts)
+        piped = bench_pipe(nlp, texts, args.batch_size)
+        print(f"{count:>8} {per_tweet:>14.3f} {piped:>9.3f} {per_tweet / piped:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
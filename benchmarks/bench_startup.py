@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark import time for main.py's entry modes
+
+Imports the modules each mode needs in a fresh interpreter, so nothing is
+shared between measurements, and reports wall-clock import time and peak
+RSS. The web apps call initialize_system() when imported, which is counted.
+Every run works in a temporary directory, so the database it creates is
+thrown away.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 3
+    python benchmarks/bench_startup.py --modes web --importtime
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import subprocess
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules imported by each main.py mode, on top of main itself
+ENTRY_MODES = {
+    'main': ['main'],
+    'web': ['main', 'web.hackathon_app.app'],
+    'simulation': ['main', 'web.hackathon_app.app_simulation'],
+    'background': ['main', 'core.scheduler'],
+    'single': ['main', 'core.crowdsense_enhanced'],
+    'test': ['main', 'core.location_extraction', 'core.anomaly_detection'],
+    'ner model': ['core.location_extraction', '!get_nlp'],
+}
+
+MEASURE_SCRIPT = """
+import importlib, json, resource, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+for name in {modules!r}:
+    if name == '!get_nlp':
+        sys.modules['core.location_extraction'].get_nlp()
+    else:
+        importlib.import_module(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'spacy_imported': 'spacy' in sys.modules,
+}}))
+"""
+
+
+def measure(modules, workdir: str, importtime: bool = False) -> dict:
+    """Import modules in a fresh interpreter and return its measurements"""
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', MEASURE_SCRIPT.format(root=PROJECT_ROOT, modules=modules)]
+
+    result = subprocess.run(command, cwd=workdir, capture_output=True, text=True,
+                            env={**os.environ, 'NER_WARMUP': 'false'})
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    if importtime:
+        stats['slowest'] = slowest_imports(result.stderr)
+    return stats
+
+
+def slowest_imports(report: str, count: int = 5) -> list:
+    """
+    (cumulative microseconds, module) of the slowest top-level imports in a
+    -X importtime report
+    """
+    imports = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):  # Nested imports are indented further
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark import time of the entry modes')
+    parser.add_argument('--modes', nargs='+', choices=list(ENTRY_MODES),
+                        default=list(ENTRY_MODES), help='Entry modes to measure')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Fresh interpreters per mode (the best run is reported)')
+    parser.add_argument('--importtime', action='store_true',
+                        help='Also list the slowest top-level imports '
+                             '(python -X importtime)')
+    args = parser.parse_args()
+
+    print(f"{'mode':>12} {'import (s)':>11} {'peak RSS (MB)':>14} {'spaCy':>6}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in args.modes:
+            try:
+                runs = [measure(ENTRY_MODES[mode], workdir) for _ in range(args.repeat)]
+            except RuntimeError as e:
+                print(f"{mode:>12} failed: {e}")
+                continue
+
+            best = min(runs, key=lambda run: run['seconds'])
+            print(f"{mode:>12} {best['seconds']:>11.3f} {best['max_rss_mb']:>14.1f} "
+                  f"{'yes' if best['spacy_imported'] else 'no':>6}")
+
+            if args.importtime:
+                report = measure(ENTRY_MODES[mode], workdir, importtime=True)
+                for microseconds, name in report['slowest']:
+                    print(f"{'':>12}   {microseconds / 1e6:>8.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark dashboard statistics as the tweets table grows
+
+Compares the COUNT(*) scans get_system_stats() used to run against the
+trigger-maintained counters and minute rollups it reads now, on a
+throwaway database holding a week of tweets spread over a set of keywords.
+Also reports what the rollup triggers cost per ingested tweet.
+
+Usage:
+    python benchmarks/bench_system_stats.py --tweets 10000 100000 1000000
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+import tempfile
+import time
+
+from core import database
+
+SCAN_QUERIES = [
+    "SELECT COUNT(*) FROM alerts",
+    "SELECT COUNT(*) FROM tweets",
+    "SELECT COUNT(*) FROM alerts WHERE created_at > datetime('now', '-24 hours')",
+    "SELECT COUNT(*) FROM tweets WHERE created_at > datetime('now', '-1 hour')",
+]
+
+
+def populate(start: int, stop: int, keywords: int) -> float:
+    """Insert tweets start..stop spread over the past week; returns seconds per tweet"""
+    began = time.perf_counter()
+    with database.get_db_connection() as conn:
+        conn.executemany("""
+            INSERT INTO tweets (tweet_id, keyword, text, created_at)
+            VALUES (?, ?, 'text', datetime('now', ?))
+        """, ((str(i), f"keyword{i % keywords}", f'-{i % (7 * 24 * 60)} minutes')
+              for i in range(start, stop)))
+        conn.commit()
+    return (time.perf_counter() - began) / max(1, stop - start)
+
+
+def bench_scans(repeat: int) -> float:
+    start = time.perf_counter()
+    with database.get_db_connection() as conn:
+        for _ in range(repeat):
+            for query in SCAN_QUERIES:
+                conn.execute(query).fetchone()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_rollups(repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        database.get_system_stats()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark COUNT(*) scans vs rollup counters')
+    parser.add_argument('--tweets', type=int, nargs='+',
+                        default=[10000, 100000, 1000000],
+                        help='Table sizes to benchmark, in increasing order')
+    parser.add_argument('--keywords', type=int, default=20,
+                        help='Keywords the tweets are spread over')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Stats calls to average over')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database.DATABASE_PATH = os.path.join(tmpdir, "bench.db")
+        database.init_database()
+        try:
+            print(f"{'tweets':>9} {'insert (us/tweet)':>18} "
+                  f"{'COUNT scans (ms)':>17} {'rollups (ms)':>13}")
+            stored = 0
+            for size in args.tweets:
+                insert_time = populate(stored, size, args.keywords)
+                stored = max(stored, size)
+                scans = bench_scans(args.repeat)
+                rollups = bench_rollups(args.repeat)
+                print(f"{size:>9} {insert_time * 1e6:>18.1f} "
+                      f"{scans * 1000:>17.3f} {rollups * 1000:>13.3f}")
+        finally:
+            database.connection_pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
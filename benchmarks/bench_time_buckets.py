@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-tweet timestamp deques against bucketed counters
+
+Replays an hour of one-minute cycles for a single keyword at increasing
+tweet rates, counting the 5 minute window after each cycle, and reports the
+time per cycle and how many objects each structure holds at the end.
+
+Usage:
+    python benchmarks/bench_time_buckets.py --rates 100 1000 10000
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from core.time_buckets import BucketedCounter
+
+WINDOW = timedelta(minutes=5)
+
+
+def bench_deque(rate: int, cycles: int):
+    buffer = deque()
+    start_time = datetime(2026, 1, 1)
+    start = time.perf_counter()
+    for cycle in range(cycles):
+        current_time = start_time + timedelta(minutes=cycle)
+        buffer.extend([current_time] * rate)
+        cutoff = current_time - WINDOW
+        while buffer and buffer[0] < cutoff:
+            buffer.popleft()
+        len(buffer)
+    return (time.perf_counter() - start) / cycles, len(buffer)
+
+
+def bench_buckets(rate: int, cycles: int):
+    counter = BucketedCounter(bucket_seconds=10, horizon=timedelta(minutes=60))
+    start = time.perf_counter()
+    for cycle in range(cycles):
+        now = 1_700_000_000 + 60 * cycle
+        counter.add("keyword", rate, now)
+        counter.window_sum("keyword", WINDOW, now)
+    return (time.perf_counter() - start) / cycles, counter.num_buckets
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark tweet window counting')
+    parser.add_argument('--rates', type=int, nargs='+',
+                        default=[100, 1000, 10000, 100000],
+                        help='Tweets per minute for one keyword')
+    parser.add_argument('--cycles', type=int, default=60,
+                        help='One-minute cycles to replay')
+    args = parser.parse_args()
+
+    print(f"{'tweets/min':>10} {'deque (ms)':>11} {'entries':>9} "
+          f"{'buckets (ms)':>13} {'entries':>8}")
+    for rate in args.rates:
+        deque_time, deque_entries = bench_deque(rate, args.cycles)
+        bucket_time, bucket_entries = bench_buckets(rate, args.cycles)
+        print(f"{rate:>10} {deque_time * 1000:>11.3f} {deque_entries:>9} "
+              f"{bucket_time * 1000:>13.3f} {bucket_entries:>8}")
+
+
+if __name__ == "__main__":
+    main()
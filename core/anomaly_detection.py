@@ -2,15 +2,143 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import math
+import tempfile
+import time
 import numpy as np
+from abc import ABC, abstractmethod
 from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Mapping, Tuple, Optional
 import logging
-from core.database import get_tweet_metrics_history, save_tweet_metrics
+from core.database import get_tweet_metrics_history, get_tweet_metrics_histories
 
 logger = logging.getLogger(__name__)
 
+# Bumped when the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_VERSION = 2
+
+# Seasonal baselines: one slot per hour of the week
+HOURS_PER_WEEK = 7 * 24
+
+# (z_score, ewma_value, is_anomaly) per keyword, as returned by update_counts
+Scores = Dict[str, Tuple[float, float, bool]]
+
+# (z_scores, ewma_values, is_anomaly) arrays, as returned by update_batch
+BatchScores = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Methods accepted by create_anomaly_detector
+ANOMALY_METHODS = (
+    "zscore", "vectorized", "seasonal", "cusum", "page_hinkley", "adaptive"
+)
+
+
+def _write_snapshot(path: str, detector: str, layout: Mapping[str, int],
+                    keywords: List[str], arrays: Mapping[str, np.ndarray]):
+    """
+    Write detector state to an .npz file
+
+    The file is written next to its destination and renamed into place,
+    so a crash mid-write never leaves a truncated snapshot behind.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.detector-', suffix='.npz')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(
+                f,
+                version=SNAPSHOT_VERSION,
+                detector=detector,
+                saved_at=time.time(),
+                keywords=np.array(keywords, dtype=str),
+                **layout,
+                **arrays,
+            )
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _read_snapshot(
+        path: str, detector: str, layout: Mapping[str, int], names: Iterable[str],
+        max_age: Optional[float]) -> Optional[Tuple[List[str], Dict[str, np.ndarray]]]:
+    """
+    Read detector state written by _write_snapshot
+
+    Returns:
+        Tuple of (keywords, arrays by name), or None if the snapshot is
+        missing, unreadable, stale or was written with another layout
+    """
+    try:
+        with np.load(path, allow_pickle=False) as snapshot:
+            if (int(snapshot['version']) != SNAPSHOT_VERSION
+                    or str(snapshot['detector']) != detector):
+                logger.info(f"Ignoring {snapshot['detector']} detector snapshot {path} "
+                            f"with version {int(snapshot['version'])}")
+                return None
+            for name, expected in layout.items():
+                if int(snapshot[name]) != expected:
+                    logger.info(f"Ignoring detector snapshot {path} with {name} "
+                                f"{int(snapshot[name])}, expected {expected}")
+                    return None
+
+            age = time.time() - float(snapshot['saved_at'])
+            if max_age is not None and age > max_age:
+                logger.info(f"Ignoring detector snapshot {path} saved {age:.0f}s ago")
+                return None
+
+            arrays = {name: snapshot[name].copy() for name in names}
+            keywords = [str(keyword) for keyword in snapshot['keywords']]
+
+    except FileNotFoundError:
+        logger.info(f"No detector snapshot at {path}")
+        return None
+    except (OSError, KeyError, ValueError) as e:
+        logger.error(f"Unreadable detector snapshot {path}: {e}")
+        return None
+
+    logger.info(f"Restored detector state for {len(keywords)} keywords from {path} "
+                f"({age:.0f}s old)")
+    return keywords, arrays
+
+
+class WindowStats:
+    """
+    Running count, sum and sum of squares of a sliding window
+
+    Tweet counts are integers, so the sums are exact and values can leave the
+    window without the drift that subtracting floats accumulates.
+    """
+    __slots__ = ('n', 'total', 'total_sq')
+
+    def __init__(self, values=()):
+        self.n = 0
+        self.total = 0
+        self.total_sq = 0
+        for value in values:
+            self.add(value)
+
+    def add(self, value):
+        self.n += 1
+        self.total += value
+        self.total_sq += value * value
+
+    def remove(self, value):
+        self.n -= 1
+        self.total -= value
+        self.total_sq -= value * value
+
+    def mean(self) -> float:
+        return self.total / self.n
+
+    def std(self) -> float:
+        """Population standard deviation (as np.std)"""
+        # n^2 * variance, exact for integer counts
+        spread = self.n * self.total_sq - self.total * self.total
+        return math.sqrt(max(spread, 0)) / self.n
+
 
 class AnomalyDetector:
     """Smart anomaly detection using Z-score and EWMA"""
@@ -33,6 +161,10 @@ class AnomalyDetector:
         self.keyword_history: Dict[str, deque] = {}
         self.keyword_ewma: Dict[str, float] = {}
         
+        # Statistics of the window each new count is scored against: the
+        # latest window_size - 1 counts before it
+        self.keyword_stats: Dict[str, WindowStats] = {}
+
     def update_history(self, keyword: str, count: int) -> Tuple[float, float, bool]:
         """
         Update historical data and detect anomalies
@@ -48,13 +180,21 @@ class AnomalyDetector:
         if keyword not in self.keyword_history:
             self.keyword_history[keyword] = deque(maxlen=self.window_size)
             self.keyword_ewma[keyword] = count
+        if keyword not in self.keyword_stats:
+            self._reset_stats(keyword)
             
-        # Add current count to history
-        self.keyword_history[keyword].append(count)
-        
-        # Calculate Z-score
+        # Calculate Z-score against the counts before this one
         z_score = self._calculate_z_score(keyword, count)
         
+        # Slide the scoring window forward, then add current count to history
+        history = self.keyword_history[keyword]
+        stats = self.keyword_stats[keyword]
+        if self.window_size > 1:
+            stats.add(count)
+            if stats.n > self.window_size - 1:
+                stats.remove(history[-(self.window_size - 1)])
+        history.append(count)
+
         # Update EWMA
         if keyword in self.keyword_ewma:
             self.keyword_ewma[keyword] = (
@@ -74,28 +214,30 @@ class AnomalyDetector:
         
         return z_score, ewma_value, is_anomaly
     
-    def _calculate_z_score(self, keyword: str, current_count: int) -> float:
-        """Calculate Z-score for current count"""
+    def has_history(self, keyword: str) -> bool:
+        """Whether any counts have been seen or loaded for a keyword"""
+        return bool(self.keyword_history.get(keyword))
+
+    def _reset_stats(self, keyword: str):
+        """Rebuild a keyword's window statistics from its history"""
         history = list(self.keyword_history[keyword])
+        reference = history[-(self.window_size - 1):] if self.window_size > 1 else []
+        self.keyword_stats[keyword] = WindowStats(reference)
         
-        if len(history) < 2:
-            return 0.0
-            
-        # Use historical data excluding current count
-        historical_data = history[:-1] if len(history) > 1 else history
+    def _calculate_z_score(self, keyword: str, current_count: int) -> float:
+        """Calculate Z-score for current count, in O(1) from the running window stats"""
+        stats = self.keyword_stats[keyword]
         
-        if len(historical_data) == 0:
+        if stats.n == 0:
             return 0.0
             
-        mean = np.mean(historical_data)
-        std = np.std(historical_data)
+        std = stats.std()
         
         # Avoid division by zero
         if std == 0:
             return 0.0
             
-        z_score = (current_count - mean) / std
-        return float(z_score)
+        return (current_count - stats.mean()) / std
     
     def _is_anomaly(self, z_score: float, current_count: int, ewma_value: float) -> bool:
         """
@@ -114,6 +256,17 @@ class AnomalyDetector:
         # Require both conditions for stronger signal
         return z_anomaly and ewma_anomaly
     
+    def _load_history(self, keyword: str, history: List[Dict]):
+        """Prime a keyword from metrics rows, newest first"""
+        # Load the most recent counts, oldest first
+        counts = [record['count'] for record in reversed(history[:self.window_size])]
+        self.keyword_history[keyword] = deque(counts, maxlen=self.window_size)
+        self._reset_stats(keyword)
+
+        # Initialize EWMA with the average of the most recent values
+        recent_counts = [record['count'] for record in history[:5]]
+        self.keyword_ewma[keyword] = np.mean(recent_counts)
+
     def load_historical_data(self, keyword: str, hours: int = 24):
         """Load historical data from database"""
         try:
@@ -122,20 +275,906 @@ class AnomalyDetector:
             if not history:
                 return
                 
-            # Load historical counts
-            counts = [record['count'] for record in history[-self.window_size:]]
-            self.keyword_history[keyword] = deque(counts, maxlen=self.window_size)
+            self._load_history(keyword, history)
+            loaded = min(len(history), self.window_size)
+            logger.info(f"Loaded {loaded} historical data points for {keyword}")
             
-            # Initialize EWMA with most recent value or average
-            if history:
-                recent_counts = [record['count'] for record in history[-5:]]
-                self.keyword_ewma[keyword] = np.mean(recent_counts)
+        except Exception as e:
+            logger.error(f"Error loading historical data for {keyword}: {e}")
+
+    def load_historical_data_bulk(
+            self, keywords: Iterable[str], hours: int = 24) -> int:
+        """
+        Load historical data for many keywords with a single database query
+
+        Args:
+            keywords: Keywords to load
+            hours: How far back to look
+
+        Returns:
+            Number of keywords that had history
+        """
+        try:
+            histories = get_tweet_metrics_histories(
+                list(keywords), hours, limit=self.window_size)
+        except Exception as e:
+            logger.error(f"Error loading historical data: {e}")
+            return 0
+
+        for keyword, history in histories.items():
+            self._load_history(keyword, history)
+        logger.info(f"Loaded historical data for {len(histories)} keywords")
+        return len(histories)
+
+    def update_counts(self, counts: Mapping[str, int]) -> Scores:
+        """
+        Score a cycle's counts given per keyword, one keyword at a time
+
+        Args:
+            counts: Dictionary of keyword -> current count
+
+        Returns:
+            Dictionary of keyword -> (z_score, ewma_value, is_anomaly)
+        """
+        return {keyword: self.update_history(keyword, count)
+                for keyword, count in counts.items()}
+
+    def save_snapshot(self, path: str):
+        """
+        Write every keyword's window and EWMA to an .npz file
+
+        Args:
+            path: Snapshot file path
+        """
+        keywords = list(self.keyword_history)
+        history = np.zeros((len(keywords), self.window_size), dtype=np.int64)
+        lengths = np.zeros(len(keywords), dtype=np.int64)
+        for row, keyword in enumerate(keywords):
+            counts = self.keyword_history[keyword]
+            history[row, :len(counts)] = counts
+            lengths[row] = len(counts)
+        ewma = np.array([self.keyword_ewma.get(keyword, 0.0) for keyword in keywords],
+                        dtype=np.float64)
+        _write_snapshot(path, 'zscore', {'window_size': self.window_size}, keywords,
+                        {'history': history, 'lengths': lengths, 'ewma': ewma})
+
+    def load_snapshot(self, path: str, max_age: Optional[float] = None) -> bool:
+        """
+        Restore the windows and EWMAs written by save_snapshot
+
+        Args:
+            path: Snapshot file path
+            max_age: Maximum snapshot age in seconds (None accepts any age)
+
+        Returns:
+            Whether the state was restored
+        """
+        snapshot = _read_snapshot(path, 'zscore', {'window_size': self.window_size},
+                                  ('history', 'lengths', 'ewma'), max_age)
+        if snapshot is None:
+            return False
+
+        keywords, state = snapshot
+        self.keyword_history.clear()
+        self.keyword_ewma.clear()
+        self.keyword_stats.clear()
+        for row, keyword in enumerate(keywords):
+            counts = state['history'][row, :state['lengths'][row]]
+            self.keyword_history[keyword] = deque((int(count) for count in counts),
+                                                  maxlen=self.window_size)
+            self.keyword_ewma[keyword] = float(state['ewma'][row])
+            self._reset_stats(keyword)
+        return True
+
+
+class VectorizedAnomalyDetector:
+    """
+    Z-score and EWMA detection for many series at once
+
+    Scores the same way as AnomalyDetector, but keeps every keyword's history
+    in one keywords x window ring buffer and updates a whole cycle's counts
+    with a handful of array operations instead of a Python loop per keyword.
+    """
+
+    def __init__(self, keywords: Iterable[str] = (), window_size: int = 10,
+                 ewma_alpha: float = 0.3, z_threshold: float = 2.0):
+        """
+        Initialize the detector
+
+        Args:
+            keywords: Series to track (more can be added with add_keywords)
+            window_size: Number of historical windows to consider for Z-score
+            ewma_alpha: Smoothing factor for EWMA (0-1)
+            z_threshold: Z-score threshold for anomaly detection
+        """
+        self.window_size = window_size
+        self.ewma_alpha = ewma_alpha
+        self.z_threshold = z_threshold
+
+        self.keywords: List[str] = []
+        self.index: Dict[str, int] = {}
+
+        # Row per keyword; counts are integers, so int64 sums are exact
+        self.history = np.zeros((0, window_size), dtype=np.int64)
+        # Next column to write, and counts seen capped at window_size, per row
+        self.positions = np.zeros(0, dtype=np.int64)
+        self.lengths = np.zeros(0, dtype=np.int64)
+        self.ewma = np.zeros(0, dtype=np.float64)
+
+        # Sums over the window each new count is scored against: the latest
+        # window_size - 1 counts before it
+        self.sums = np.zeros(0, dtype=np.int64)
+        self.sums_sq = np.zeros(0, dtype=np.int64)
+
+        self.add_keywords(keywords)
+
+    def add_keywords(self, keywords: Iterable[str]):
+        """Start tracking new series (existing ones are ignored)"""
+        new = [keyword for keyword in dict.fromkeys(keywords)
+               if keyword not in self.index]
+        if not new:
+            return
+
+        for keyword in new:
+            self.index[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+
+        count = len(new)
+        self.history = np.vstack(
+            [self.history, np.zeros((count, self.window_size), dtype=np.int64)])
+        self.positions = np.concatenate(
+            [self.positions, np.zeros(count, dtype=np.int64)])
+        self.lengths = np.concatenate([self.lengths, np.zeros(count, dtype=np.int64)])
+        self.ewma = np.concatenate([self.ewma, np.zeros(count, dtype=np.float64)])
+        self.sums = np.concatenate([self.sums, np.zeros(count, dtype=np.int64)])
+        self.sums_sq = np.concatenate([self.sums_sq, np.zeros(count, dtype=np.int64)])
+
+    def has_history(self, keyword: str) -> bool:
+        """Whether any counts have been seen or loaded for a keyword"""
+        row = self.index.get(keyword)
+        return row is not None and self.lengths[row] > 0
+
+    def update_batch(self, counts, rows=None) -> BatchScores:
+        """
+        Score one cycle's counts and add them to the histories
+
+        Args:
+            counts: Current count per series, aligned with self.keywords (or rows)
+            rows: Indices of the series the counts belong to (defaults to all)
+
+        Returns:
+            Tuple of (z_scores, ewma_values, is_anomaly) arrays aligned with counts
+        """
+        if rows is None:
+            rows = np.arange(len(self.keywords))
+        rows = np.asarray(rows, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.int64)
+        lengths = self.lengths[rows]
+        sums = self.sums[rows]
+        sums_sq = self.sums_sq[rows]
+
+        # Z-score against the reference window: n^2 * variance is exact in integers
+        n = np.minimum(lengths, self.window_size - 1)
+        safe_n = np.maximum(n, 1)
+        spread = np.maximum(n * sums_sq - sums * sums, 0)
+        std = np.sqrt(spread) / safe_n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_scores = np.where((n > 0) & (std > 0),
+                                (counts - sums / safe_n) / std, 0.0)
+
+        # EWMA, seeded with the first count of a new series
+        smoothed = self.ewma_alpha * counts + (1 - self.ewma_alpha) * self.ewma[rows]
+        ewma = np.where(lengths == 0, counts, smoothed)
+        self.ewma[rows] = ewma
+
+        # Require both conditions for stronger signal, as AnomalyDetector._is_anomaly
+        is_anomaly = ((np.abs(z_scores) > self.z_threshold)
+                      & (counts > ewma * 1.5) & (ewma > 0))
+
+        # Slide the reference window forward
+        if self.window_size > 1:
+            full = n == self.window_size - 1
+            oldest = (self.positions[rows] - (self.window_size - 1)) % self.window_size
+            leaving = self.history[rows, oldest]
+            leaving = np.where(full, leaving, 0)
+            self.sums[rows] = sums + counts - leaving
+            self.sums_sq[rows] = sums_sq + counts * counts - leaving * leaving
+
+        # Add current counts to the ring buffer
+        self.history[rows, self.positions[rows]] = counts
+        self.positions[rows] = (self.positions[rows] + 1) % self.window_size
+        self.lengths[rows] = np.minimum(lengths + 1, self.window_size)
+
+        return z_scores, ewma, is_anomaly
+
+    def update_counts(self, counts: Mapping[str, int]) -> Scores:
+        """
+        Score a cycle's counts given per keyword
+
+        Args:
+            counts: Dictionary of keyword -> current count (unknown keywords are added)
+
+        Returns:
+            Dictionary of keyword -> (z_score, ewma_value, is_anomaly)
+        """
+        self.add_keywords(counts)
+        keywords = list(counts)
+        rows = [self.index[keyword] for keyword in keywords]
+        z_scores, ewma, is_anomaly = self.update_batch(
+            [counts[k] for k in keywords], rows)
+
+        return {keyword: (float(z_scores[i]), float(ewma[i]), bool(is_anomaly[i]))
+                for i, keyword in enumerate(keywords)}
+
+    def update_history(self, keyword: str, count: int) -> Tuple[float, float, bool]:
+        """Score a single count (same interface as AnomalyDetector.update_history)"""
+        return self.update_counts({keyword: count})[keyword]
+
+    def load_counts(self, keyword: str, counts: List[int], ewma_value: float):
+        """Replace a keyword's history with counts, oldest first"""
+        self.add_keywords([keyword])
+        row = self.index[keyword]
+        counts = list(counts)[-self.window_size:]
+        reference = np.array(
+            counts[-(self.window_size - 1):] if self.window_size > 1 else [],
+            dtype=np.int64)
+
+        self.history[row] = 0
+        self.history[row, :len(counts)] = counts
+        self.positions[row] = len(counts) % self.window_size
+        self.lengths[row] = len(counts)
+        self.sums[row] = reference.sum()
+        self.sums_sq[row] = (reference * reference).sum()
+        self.ewma[row] = ewma_value
+
+    def _load_history(self, keyword: str, history: List[Dict]):
+        """Prime a keyword from metrics rows, newest first"""
+        counts = [record['count'] for record in reversed(history[:self.window_size])]
+        recent_counts = [record['count'] for record in history[:5]]
+        self.load_counts(keyword, counts, float(np.mean(recent_counts)))
+
+    def load_historical_data(self, keyword: str, hours: int = 24):
+        """Load historical data from database"""
+        try:
+            history = get_tweet_metrics_history(keyword, hours)
+
+            if not history:
+                return
                 
-            logger.info(f"Loaded {len(counts)} historical data points for {keyword}")
+            self._load_history(keyword, history)
+            loaded = min(len(history), self.window_size)
+            logger.info(f"Loaded {loaded} historical data points for {keyword}")
+
+        except Exception as e:
+            logger.error(f"Error loading historical data for {keyword}: {e}")
+
+    def load_historical_data_bulk(
+            self, keywords: Iterable[str], hours: int = 24) -> int:
+        """
+        Load historical data for many keywords with a single database query
+
+        Args:
+            keywords: Keywords to load
+            hours: How far back to look
+
+        Returns:
+            Number of keywords that had history
+        """
+        try:
+            histories = get_tweet_metrics_histories(
+                list(keywords), hours, limit=self.window_size)
+        except Exception as e:
+            logger.error(f"Error loading historical data: {e}")
+            return 0
+
+        self.add_keywords(histories)
+        for keyword, history in histories.items():
+            self._load_history(keyword, history)
+        logger.info(f"Loaded historical data for {len(histories)} keywords")
+        return len(histories)
+
+    # Arrays that make up the detector state, as saved in snapshots
+    STATE_ARRAYS = ('history', 'positions', 'lengths', 'ewma', 'sums', 'sums_sq')
+
+    def save_snapshot(self, path: str):
+        """
+        Write the full detector state to an .npz file
+
+        Args:
+            path: Snapshot file path
+        """
+        _write_snapshot(path, 'vectorized', {'window_size': self.window_size},
+                        self.keywords,
+                        {name: getattr(self, name) for name in self.STATE_ARRAYS})
+
+    def load_snapshot(self, path: str, max_age: Optional[float] = None) -> bool:
+        """
+        Restore the detector state from a snapshot written by save_snapshot
+
+        The detector's own ewma_alpha and z_threshold are kept; snapshots with
+        a different layout or window size, or older than max_age, are ignored.
+
+        Args:
+            path: Snapshot file path
+            max_age: Maximum snapshot age in seconds (None accepts any age)
+
+        Returns:
+            Whether the state was restored
+        """
+        snapshot = _read_snapshot(path, 'vectorized', {'window_size': self.window_size},
+                                  self.STATE_ARRAYS, max_age)
+        if snapshot is None:
+            return False
+
+        keywords, state = snapshot
+        tracked = self.keywords
+        self.keywords = keywords
+        self.index = {keyword: row for row, keyword in enumerate(keywords)}
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.add_keywords(tracked)
+        return True
+
+
+class SeasonalAnomalyDetector:
+    """
+    Z-score and EWMA detection against hour-of-week baselines
+
+    Each keyword keeps a mean and variance for each of the 168 hours of the
+    week, so a count is compared with what is normal for that time rather
+    than with the last few windows, and daily and weekly peaks stop looking
+    anomalous. Baselines are updated incrementally with weights capped at
+    slot_memory samples, so they adapt as normal volume drifts. Slots with
+    too few samples fall back to the keyword's baseline across all hours.
+    """
+
+    def __init__(self, keywords: Iterable[str] = (), ewma_alpha: float = 0.3,
+                 z_threshold: float = 2.0, min_slot_samples: int = 5,
+                 slot_memory: int = 240):
+        """
+        Initialize the detector
+
+        Args:
+            keywords: Series to track (more can be added with add_keywords)
+            ewma_alpha: Smoothing factor for EWMA (0-1)
+            z_threshold: Z-score threshold for anomaly detection
+            min_slot_samples: Samples an hour-of-week slot needs before it is
+                scored against
+            slot_memory: Samples after which older observations are forgotten
+                exponentially
+        """
+        self.ewma_alpha = ewma_alpha
+        self.z_threshold = z_threshold
+        self.min_slot_samples = min_slot_samples
+        self.slot_memory = slot_memory
+
+        self.keywords: List[str] = []
+        self.index: Dict[str, int] = {}
+
+        # Row per keyword, column per hour of the week
+        self.slot_weights = np.zeros((0, HOURS_PER_WEEK), dtype=np.float64)
+        self.slot_means = np.zeros((0, HOURS_PER_WEEK), dtype=np.float64)
+        self.slot_vars = np.zeros((0, HOURS_PER_WEEK), dtype=np.float64)
+
+        # Fallback baseline across all hours, and the EWMA
+        self.weights = np.zeros(0, dtype=np.float64)
+        self.means = np.zeros(0, dtype=np.float64)
+        self.vars = np.zeros(0, dtype=np.float64)
+        self.ewma = np.zeros(0, dtype=np.float64)
+
+        self.add_keywords(keywords)
+
+    def add_keywords(self, keywords: Iterable[str]):
+        """Start tracking new series (existing ones are ignored)"""
+        new = [keyword for keyword in dict.fromkeys(keywords)
+               if keyword not in self.index]
+        if not new:
+            return
+
+        for keyword in new:
+            self.index[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+
+        count = len(new)
+        for name in ('slot_weights', 'slot_means', 'slot_vars'):
+            grown = [getattr(self, name), np.zeros((count, HOURS_PER_WEEK))]
+            setattr(self, name, np.vstack(grown))
+        for name in ('weights', 'means', 'vars', 'ewma'):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(count)]))
+
+    def has_history(self, keyword: str) -> bool:
+        """Whether any counts have been seen or loaded for a keyword"""
+        row = self.index.get(keyword)
+        return row is not None and self.weights[row] > 0
+
+    @staticmethod
+    def hour_of_week(timestamp: datetime) -> int:
+        """Slot for a UTC timestamp: hours since Monday 00:00"""
+        return timestamp.weekday() * 24 + timestamp.hour
+
+    def _observe(self, weights, means, variances, counts):
+        """Fold counts into running means and variances (arrays or plain floats)"""
+        weights = np.minimum(weights + 1, self.slot_memory)
+        share = 1.0 / weights
+        delta = counts - means
+        means = means + share * delta
+        variances = (1 - share) * (variances + share * delta * delta)
+        return weights, means, variances
+
+    def update_batch(self, counts, rows=None,
+                     timestamp: datetime = None) -> BatchScores:
+        """
+        Score one cycle's counts and add them to the baselines
+
+        Args:
+            counts: Current count per series, aligned with self.keywords (or rows)
+            rows: Indices of the series the counts belong to (defaults to all)
+            timestamp: UTC time of the counts (defaults to now)
+
+        Returns:
+            Tuple of (z_scores, ewma_values, is_anomaly) arrays aligned with counts
+        """
+        if rows is None:
+            rows = np.arange(len(self.keywords))
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.float64)
+        slot = self.hour_of_week(timestamp or datetime.utcnow())
+
+        slot_weights = self.slot_weights[rows, slot]
+        slot_means = self.slot_means[rows, slot]
+        slot_vars = self.slot_vars[rows, slot]
+        weights = self.weights[rows]
+
+        # Score against the matching hour of the week, or all hours until it has
+        # enough samples
+        seasonal = slot_weights >= self.min_slot_samples
+        mean = np.where(seasonal, slot_means, self.means[rows])
+        std = np.sqrt(np.where(seasonal, slot_vars, self.vars[rows]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_scores = np.where((weights > 0) & (std > 0), (counts - mean) / std, 0.0)
+
+        # EWMA, seeded with the first count of a new series
+        ewma = np.where(weights == 0, counts,
+                        self.ewma_alpha * counts
+                        + (1 - self.ewma_alpha) * self.ewma[rows])
+        self.ewma[rows] = ewma
+
+        # Require both conditions for stronger signal, as AnomalyDetector._is_anomaly
+        is_anomaly = ((np.abs(z_scores) > self.z_threshold)
+                      & (counts > ewma * 1.5) & (ewma > 0))
+
+        (self.slot_weights[rows, slot], self.slot_means[rows, slot],
+         self.slot_vars[rows, slot]) = self._observe(
+            slot_weights, slot_means, slot_vars, counts)
+        self.weights[rows], self.means[rows], self.vars[rows] = (
+            self._observe(weights, self.means[rows], self.vars[rows], counts))
+
+        return z_scores, ewma, is_anomaly
+
+    def update_counts(self, counts: Mapping[str, int],
+                      timestamp: datetime = None) -> Scores:
+        """
+        Score a cycle's counts given per keyword
+
+        Args:
+            counts: Dictionary of keyword -> current count (unknown keywords are added)
+            timestamp: UTC time of the counts (defaults to now)
+
+        Returns:
+            Dictionary of keyword -> (z_score, ewma_value, is_anomaly)
+        """
+        self.add_keywords(counts)
+        keywords = list(counts)
+        rows = [self.index[keyword] for keyword in keywords]
+        z_scores, ewma, is_anomaly = self.update_batch(
+            [counts[k] for k in keywords], rows, timestamp)
+
+        return {keyword: (float(z_scores[i]), float(ewma[i]), bool(is_anomaly[i]))
+                for i, keyword in enumerate(keywords)}
+
+    def update_history(self, keyword: str, count: int,
+                       timestamp: datetime = None) -> Tuple[float, float, bool]:
+        """Score a single count (same interface as AnomalyDetector.update_history)"""
+        return self.update_counts({keyword: count}, timestamp)[keyword]
+
+    def _load_history(self, keyword: str, history: List[Dict]):
+        """Rebuild a keyword's baselines from metrics rows, newest first"""
+        self.add_keywords([keyword])
+        row = self.index[keyword]
+        slot_weights = self.slot_weights[row].tolist()
+        slot_means = self.slot_means[row].tolist()
+        slot_vars = self.slot_vars[row].tolist()
+        baseline = (0.0, 0.0, 0.0)
+        ewma = None
+
+        # Plain floats: replaying weeks of rows one array element at a time is far
+        # slower
+        for record in reversed(history):
+            count = float(record['count'])
+            slot = self.hour_of_week(datetime.fromisoformat(record['created_at']))
+            slot_weights[slot], slot_means[slot], slot_vars[slot] = self._observe(
+                slot_weights[slot], slot_means[slot], slot_vars[slot], count)
+            baseline = self._observe(*baseline, count)
+            if ewma is None:
+                ewma = count
+            else:
+                ewma = self.ewma_alpha * count + (1 - self.ewma_alpha) * ewma
+
+        self.slot_weights[row] = slot_weights
+        self.slot_means[row] = slot_means
+        self.slot_vars[row] = slot_vars
+        self.weights[row], self.means[row], self.vars[row] = baseline
+        self.ewma[row] = ewma
+
+    def load_historical_data(self, keyword: str, hours: int = 24 * 7 * 4):
+        """Build a keyword's baselines from its stored metrics"""
+        try:
+            history = get_tweet_metrics_history(keyword, hours)
+
+            if not history:
+                return
+
+            self._load_history(keyword, history)
+            logger.info(f"Loaded {len(history)} historical data points for {keyword}")
+
+        except Exception as e:
+            logger.error(f"Error loading historical data for {keyword}: {e}")
+
+    def load_historical_data_bulk(
+            self, keywords: Iterable[str], hours: int = 24 * 7 * 4) -> int:
+        """
+        Build baselines for many keywords from their stored metrics in one query
+
+        Args:
+            keywords: Keywords to load
+            hours: How far back to look
+
+        Returns:
+            Number of keywords that had history
+        """
+        try:
+            histories = get_tweet_metrics_histories(list(keywords), hours)
+        except Exception as e:
+            logger.error(f"Error loading historical data: {e}")
+            return 0
+
+        self.add_keywords(histories)
+        for keyword, history in histories.items():
+            self._load_history(keyword, history)
+        logger.info(f"Loaded historical data for {len(histories)} keywords")
+        return len(histories)
+
+    # Arrays that make up the detector state, as saved in snapshots
+    STATE_ARRAYS = ('slot_weights', 'slot_means', 'slot_vars',
+                    'weights', 'means', 'vars', 'ewma')
+
+    def save_snapshot(self, path: str):
+        """
+        Write the full detector state to an .npz file
+
+        Args:
+            path: Snapshot file path
+        """
+        _write_snapshot(path, 'seasonal', {}, self.keywords,
+                        {name: getattr(self, name) for name in self.STATE_ARRAYS})
+
+    def load_snapshot(self, path: str, max_age: Optional[float] = None) -> bool:
+        """
+        Restore the detector state from a snapshot written by save_snapshot
+
+        Args:
+            path: Snapshot file path
+            max_age: Maximum snapshot age in seconds (None accepts any age)
+
+        Returns:
+            Whether the state was restored
+        """
+        snapshot = _read_snapshot(path, 'seasonal', {}, self.STATE_ARRAYS, max_age)
+        if snapshot is None:
+            return False
+
+        keywords, state = snapshot
+        tracked = self.keywords
+        self.keywords = keywords
+        self.index = {keyword: row for row, keyword in enumerate(keywords)}
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.add_keywords(tracked)
+        return True
+
+
+class ChangePointDetector(ABC):
+    """
+    Streaming change-point detection over per-keyword baselines
+
+    Each count is standardized against an exponentially weighted baseline
+    mean and variance, and the residuals are accumulated into a drift
+    statistic that fires once it exceeds threshold (in standard deviations).
+    Small but persistent rises add up cycle after cycle, so slow-building
+    events are caught long before any single count is a large outlier.
+    State is a handful of numbers per keyword. Subclasses define how the
+    statistic accumulates.
+    """
+
+    # Detector name recorded in snapshots
+    method = None
+
+    # Per-keyword arrays beyond the baseline and statistic
+    EXTRA_ARRAYS: Tuple[str, ...] = ()
+
+    def __init__(self, keywords: Iterable[str] = (), threshold: float = 5.0,
+                 drift: float = 0.5, ewma_alpha: float = 0.3,
+                 baseline_memory: int = 60, min_samples: int = 5):
+        """
+        Initialize the detector
+
+        Args:
+            keywords: Series to track (more can be added with add_keywords)
+            threshold: Statistic, in standard deviations, at which a change is reported
+            drift: Slack subtracted from every residual, so noise does not accumulate
+            ewma_alpha: Smoothing factor for the reported EWMA (0-1)
+            baseline_memory: Samples after which the baseline forgets older counts
+                exponentially
+            min_samples: Samples a keyword needs before changes are reported
+        """
+        self.threshold = threshold
+        self.drift = drift
+        self.ewma_alpha = ewma_alpha
+        self.baseline_memory = baseline_memory
+        self.min_samples = min_samples
+
+        self.keywords: List[str] = []
+        self.index: Dict[str, int] = {}
+
+        self.weights = np.zeros(0, dtype=np.float64)
+        self.means = np.zeros(0, dtype=np.float64)
+        self.vars = np.zeros(0, dtype=np.float64)
+        self.ewma = np.zeros(0, dtype=np.float64)
+        self.statistics = np.zeros(0, dtype=np.float64)
+        for name in self.EXTRA_ARRAYS:
+            setattr(self, name, np.zeros(0, dtype=np.float64))
+
+        self.add_keywords(keywords)
+
+    @property
+    def state_arrays(self) -> Tuple[str, ...]:
+        """Arrays that make up the detector state, as saved in snapshots"""
+        return ('weights', 'means', 'vars', 'ewma', 'statistics') + self.EXTRA_ARRAYS
+
+    def add_keywords(self, keywords: Iterable[str]):
+        """Start tracking new series (existing ones are ignored)"""
+        new = [keyword for keyword in dict.fromkeys(keywords)
+               if keyword not in self.index]
+        if not new:
+            return
+
+        for keyword in new:
+            self.index[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+
+        for name in self.state_arrays:
+            grown = [getattr(self, name), np.zeros(len(new))]
+            setattr(self, name, np.concatenate(grown))
+
+    def has_history(self, keyword: str) -> bool:
+        """Whether any counts have been seen or loaded for a keyword"""
+        row = self.index.get(keyword)
+        return row is not None and self.weights[row] > 0
+
+    def change_score(self, keyword: str) -> float:
+        """Change statistic of a keyword's latest count, in standard deviations"""
+        row = self.index.get(keyword)
+        return 0.0 if row is None else float(self.statistics[row])
+
+    @abstractmethod
+    def _accumulate(self, rows: np.ndarray, counts: np.ndarray,
+                    z_scores: np.ndarray, std: np.ndarray) -> np.ndarray:
+        """Fold a cycle's counts into the statistic of each row, returning it"""
+
+    def _reset(self, rows: np.ndarray):
+        """Restart accumulation for rows that just reported a change"""
+        for name in self.EXTRA_ARRAYS:
+            getattr(self, name)[rows] = 0.0
+
+    def update_batch(self, counts, rows=None) -> BatchScores:
+        """
+        Score one cycle's counts and add them to the baselines
+
+        Args:
+            counts: Current count per series, aligned with self.keywords (or rows)
+            rows: Indices of the series the counts belong to (defaults to all)
+
+        Returns:
+            Tuple of (z_scores, ewma_values, is_change) arrays aligned with counts
+        """
+        if rows is None:
+            rows = np.arange(len(self.keywords))
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.float64)
+        weights = self.weights[rows]
+        means = self.means[rows]
+        variances = self.vars[rows]
+
+        # Counts are roughly Poisson, so the spread is at least sqrt(mean)
+        std = np.sqrt(np.maximum(variances, np.maximum(means, 1.0)))
+        z_scores = np.where(weights > 0, (counts - means) / std, 0.0)
+
+        warmed_up = weights >= self.min_samples
+        statistics = np.zeros(len(rows))
+        statistics[warmed_up] = self._accumulate(rows[warmed_up], counts[warmed_up],
+                                                 z_scores[warmed_up], std[warmed_up])
+        self.statistics[rows] = statistics
+        is_change = statistics > self.threshold
+        self._reset(rows[is_change])
+
+        # EWMA, seeded with the first count of a new series
+        ewma = np.where(weights == 0, counts,
+                        self.ewma_alpha * counts
+                        + (1 - self.ewma_alpha) * self.ewma[rows])
+        self.ewma[rows] = ewma
+
+        # Baseline, with weights capped at baseline_memory
+        weights = np.minimum(weights + 1, self.baseline_memory)
+        share = 1.0 / weights
+        delta = counts - means
+        self.weights[rows] = weights
+        self.means[rows] = means + share * delta
+        self.vars[rows] = (1 - share) * (variances + share * delta * delta)
+
+        return z_scores, ewma, is_change
+
+    def update_counts(self, counts: Mapping[str, int]) -> Scores:
+        """
+        Score a cycle's counts given per keyword
+
+        Args:
+            counts: Dictionary of keyword -> current count (unknown keywords are added)
+
+        Returns:
+            Dictionary of keyword -> (z_score, ewma_value, is_anomaly)
+        """
+        self.add_keywords(counts)
+        keywords = list(counts)
+        rows = [self.index[keyword] for keyword in keywords]
+        z_scores, ewma, is_change = self.update_batch(
+            [counts[k] for k in keywords], rows)
+
+        return {keyword: (float(z_scores[i]), float(ewma[i]), bool(is_change[i]))
+                for i, keyword in enumerate(keywords)}
+
+    def update_history(self, keyword: str, count: int) -> Tuple[float, float, bool]:
+        """Score a single count (same interface as AnomalyDetector.update_history)"""
+        return self.update_counts({keyword: count})[keyword]
+
+    def _load_history(self, keyword: str, history: List[Dict]):
+        """Replay a keyword's metrics rows, newest first"""
+        self.add_keywords([keyword])
+        row = [self.index[keyword]]
+        for record in reversed(history):
+            self.update_batch([record['count']], row)
+
+    def load_historical_data(self, keyword: str, hours: int = 24):
+        """Load historical data from database"""
+        try:
+            history = get_tweet_metrics_history(keyword, hours)
+
+            if not history:
+                return
+
+            # Older counts have been forgotten by the baseline
+            history = history[:4 * self.baseline_memory]
+            self._load_history(keyword, history)
+            logger.info(f"Loaded {len(history)} historical data points for {keyword}")
             
         except Exception as e:
             logger.error(f"Error loading historical data for {keyword}: {e}")
 
+    def load_historical_data_bulk(
+            self, keywords: Iterable[str], hours: int = 24) -> int:
+        """
+        Load historical data for many keywords with a single database query
+
+        Args:
+            keywords: Keywords to load
+            hours: How far back to look
+
+        Returns:
+            Number of keywords that had history
+        """
+        try:
+            histories = get_tweet_metrics_histories(
+                list(keywords), hours, limit=4 * self.baseline_memory)
+        except Exception as e:
+            logger.error(f"Error loading historical data: {e}")
+            return 0
+
+        self.add_keywords(histories)
+        for keyword, history in histories.items():
+            self._load_history(keyword, history)
+        logger.info(f"Loaded historical data for {len(histories)} keywords")
+        return len(histories)
+
+    def save_snapshot(self, path: str):
+        """
+        Write the full detector state to an .npz file
+
+        Args:
+            path: Snapshot file path
+        """
+        _write_snapshot(path, self.method, {}, self.keywords,
+                        {name: getattr(self, name) for name in self.state_arrays})
+
+    def load_snapshot(self, path: str, max_age: Optional[float] = None) -> bool:
+        """
+        Restore the detector state from a snapshot written by save_snapshot
+
+        Args:
+            path: Snapshot file path
+            max_age: Maximum snapshot age in seconds (None accepts any age)
+
+        Returns:
+            Whether the state was restored
+        """
+        snapshot = _read_snapshot(path, self.method, {}, self.state_arrays, max_age)
+        if snapshot is None:
+            return False
+
+        keywords, state = snapshot
+        tracked = self.keywords
+        self.keywords = keywords
+        self.index = {keyword: row for row, keyword in enumerate(keywords)}
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.add_keywords(tracked)
+        return True
+
+
+class CusumDetector(ChangePointDetector):
+    """
+    One-sided CUSUM: S = max(0, S + z - drift), reporting when S > threshold
+
+    Only upward shifts are tracked; a drop in volume is not an emergency.
+    """
+
+    method = "cusum"
+    EXTRA_ARRAYS = ('sums',)
+
+    def _accumulate(self, rows, counts, z_scores, std):
+        sums = np.maximum(0.0, self.sums[rows] + z_scores - self.drift)
+        self.sums[rows] = sums
+        return sums
+
+
+class PageHinkleyDetector(ChangePointDetector):
+    """
+    Page-Hinkley test for an upward shift in the mean
+
+    Deviations are measured from the mean of all counts since the last
+    reported change rather than from the baseline, scaled by the baseline
+    spread: m += (x - mean) / std - drift, reporting when m exceeds its
+    running minimum by threshold. Counting from its own mean makes it slower
+    than CUSUM on gradual rises but less sensitive to a baseline that lags
+    behind normal growth.
+    """
+
+    method = "page_hinkley"
+    EXTRA_ARRAYS = ('samples', 'sample_means', 'cumulative', 'minimums')
+
+    def _accumulate(self, rows, counts, z_scores, std):
+        samples = self.samples[rows] + 1
+        sample_means = self.sample_means[rows]
+        sample_means = sample_means + (counts - sample_means) / samples
+        cumulative = self.cumulative[rows] + (counts - sample_means) / std - self.drift
+        minimums = np.minimum(self.minimums[rows], cumulative)
+
+        self.samples[rows] = samples
+        self.sample_means[rows] = sample_means
+        self.cumulative[rows] = cumulative
+        self.minimums[rows] = minimums
+        return cumulative - minimums
+
 
 class AdaptiveThresholdDetector:
     """Alternative detector using adaptive thresholds"""
@@ -191,15 +1230,140 @@ class AdaptiveThresholdDetector:
         
         return current_threshold, is_anomaly
 
+    def has_history(self, keyword: str) -> bool:
+        """Whether a running average exists for a keyword"""
+        return keyword in self.keyword_averages
+
+    def update_counts(self, counts: Mapping[str, int]) -> Scores:
+        """
+        Score a cycle's counts given per keyword
+
+        There is no z-score here: the first value is the count as a multiple
+        of the keyword's threshold (1.0 or more is an anomaly).
+
+        Args:
+            counts: Dictionary of keyword -> current count
+
+        Returns:
+            Dictionary of keyword -> (threshold_ratio, running_average, is_anomaly)
+        """
+        scores = {}
+        for keyword, count in counts.items():
+            threshold, is_anomaly = self.update_threshold(keyword, count)
+            average = self.keyword_averages[keyword]
+            scores[keyword] = (count / threshold, average, is_anomaly)
+        return scores
+
+    def _load_history(self, keyword: str, history: List[Dict]):
+        """Replay metrics rows, newest first, into a keyword's running average"""
+        counts = [record['count'] for record in reversed(history)]
+        average = float(counts[0])
+        for count in counts[1:]:
+            average = (self.adaptation_rate * count
+                       + (1 - self.adaptation_rate) * average)
+        self.keyword_averages[keyword] = average
+        self.keyword_thresholds[keyword] = max(self.base_threshold, average * 2.0)
+
+    def load_historical_data_bulk(self, keywords: Iterable[str],
+                                  hours: int = 24) -> int:
+        """
+        Load historical data for many keywords with a single database query
+
+        Args:
+            keywords: Keywords to load
+            hours: How far back to look
+
+        Returns:
+            Number of keywords that had history
+        """
+        try:
+            histories = get_tweet_metrics_histories(list(keywords), hours)
+        except Exception as e:
+            logger.error(f"Error loading historical data: {e}")
+            return 0
+
+        for keyword, history in histories.items():
+            self._load_history(keyword, history)
+        logger.info(f"Loaded historical data for {len(histories)} keywords")
+        return len(histories)
+
+    def save_snapshot(self, path: str):
+        """
+        Write every keyword's running average and threshold to an .npz file
+
+        Args:
+            path: Snapshot file path
+        """
+        keywords = list(self.keyword_averages)
+        averages = [self.keyword_averages[k] for k in keywords]
+        thresholds = [self.keyword_thresholds[k] for k in keywords]
+        _write_snapshot(path, 'adaptive', {}, keywords, {
+            'averages': np.array(averages, dtype=np.float64),
+            'thresholds': np.array(thresholds, dtype=np.float64),
+        })
+
+    def load_snapshot(self, path: str, max_age: Optional[float] = None) -> bool:
+        """
+        Restore the averages and thresholds written by save_snapshot
+
+        Args:
+            path: Snapshot file path
+            max_age: Maximum snapshot age in seconds (None accepts any age)
+
+        Returns:
+            Whether the state was restored
+        """
+        snapshot = _read_snapshot(path, 'adaptive', {}, ('averages', 'thresholds'),
+                                  max_age)
+        if snapshot is None:
+            return False
+
+        keywords, state = snapshot
+        self.keyword_averages = dict(zip(keywords, state['averages'].tolist()))
+        self.keyword_thresholds = dict(zip(keywords, state['thresholds'].tolist()))
+        return True
+
 
-def create_anomaly_detector(method: str = "zscore") -> AnomalyDetector:
-    """Factory function to create anomaly detector"""
+def create_anomaly_detector(
+        method: str = "zscore", keywords: Iterable[str] = ()) -> AnomalyDetector:
+    """
+    Factory function to create anomaly detector
+
+    Args:
+        method: One of ANOMALY_METHODS
+        keywords: Series to track up front (all but "zscore" and "adaptive")
+    """
     if method == "zscore":
         return AnomalyDetector(
             window_size=15,    # Look at last 15 windows
             ewma_alpha=0.3,    # Moderate smoothing
             z_threshold=2.5    # 2.5 standard deviations
         )
+    elif method == "vectorized":
+        return VectorizedAnomalyDetector(
+            keywords,
+            window_size=15,
+            ewma_alpha=0.3,
+            z_threshold=2.5
+        )
+    elif method == "seasonal":
+        return SeasonalAnomalyDetector(
+            keywords,
+            ewma_alpha=0.3,
+            z_threshold=2.5    # Against the hour-of-week baseline
+        )
+    elif method == "cusum":
+        return CusumDetector(
+            keywords,
+            threshold=5.0,     # Standard deviations of accumulated drift
+            drift=0.5
+        )
+    elif method == "page_hinkley":
+        return PageHinkleyDetector(
+            keywords,
+            threshold=5.0,
+            drift=0.5
+        )
     elif method == "adaptive":
         return AdaptiveThresholdDetector(
             base_threshold=5,
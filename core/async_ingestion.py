@@ -0,0 +1,357 @@
+"""
+Async ingestion engine - concurrent Twitter and NewsAPI fetching with aiohttp
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from core.query_planner import (
+    MAX_QUERY_LENGTH, build_or_query, demultiplex, group_since_id, is_newer,
+    plan_keyword_queries
+)
+from utils.config import TWITTER_BEARER_TOKEN, NEWS_API_KEY
+from utils.logging_config import get_logger, log_api_request, log_error
+from utils.rate_limiter import (
+    MAX_WAIT, TokenBucket, parse_retry_after, rate_limiters as shared_rate_limiters
+)
+
+logger = get_logger('crowdsense.async_ingestion')
+
+TWITTER_API_BASE = "https://api.twitter.com/2"
+NEWS_API_BASE = "https://newsapi.org/v2"
+
+# Retry policy mirroring build_retry_session() in core.crowdsense_enhanced
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_AFTER_STATUSES = {429, 503}
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 0.5
+BACKOFF_MAX = 120
+
+# Recent search paging (see fetch_tweet_pages in core.crowdsense_enhanced)
+INITIAL_PAGE_SIZE = 10
+TWITTER_PAGE_SIZE = 100
+TWITTER_MAX_PAGES = 5
+
+Tweets = List[Dict[str, Any]]
+PageProcessor = Callable[[List[str], Tweets], Dict[str, Tweets]]
+
+
+def backoff_delay(retry_number: int, backoff_factor: float = BACKOFF_FACTOR) -> float:
+    """Delay before a retry, matching urllib3's exponential backoff"""
+    if retry_number <= 1:
+        return 0.0
+    return min(BACKOFF_MAX, backoff_factor * (2 ** (retry_number - 1)))
+
+
+class AsyncIngestionEngine:
+    """Fetch tweets and news for many keywords over one shared aiohttp session"""
+
+    def __init__(self, bearer_token: str = None, news_api_key: str = None,
+                 twitter_base_url: str = TWITTER_API_BASE,
+                 news_base_url: str = NEWS_API_BASE,
+                 process_page: Optional[PageProcessor] = None,
+                 since_ids: Optional[Dict[str, str]] = None,
+                 on_since_id: Optional[Callable[[str, str], None]] = None,
+                 initial_page_size: int = INITIAL_PAGE_SIZE,
+                 page_size: int = TWITTER_PAGE_SIZE, max_pages: int = TWITTER_MAX_PAGES,
+                 max_query_length: Optional[int] = MAX_QUERY_LENGTH,
+                 rate_limiters: Optional[Dict[str, TokenBucket]] = None,
+                 max_connections: int = 100, max_connections_per_host: int = 20,
+                 timeout: float = 10, max_retries: int = MAX_RETRIES,
+                 backoff_factor: float = BACKOFF_FACTOR):
+        """
+        Initialize the ingestion engine
+
+        Args:
+            bearer_token: Twitter API bearer token (defaults to TWITTER_BEARER_TOKEN)
+            news_api_key: NewsAPI key (defaults to NEWS_API_KEY)
+            twitter_base_url: Twitter API v2 base URL
+            news_base_url: NewsAPI v2 base URL
+            process_page: Called with (keywords, tweets) to enrich, save and split
+                each page per keyword; runs in a worker thread. Raw tweets are
+                split with query_planner.demultiplex if None.
+            since_ids: Newest tweet id already processed, per keyword
+            on_since_id: Called with (keyword, newest_id) once a keyword's new
+                tweets are processed; updates since_ids directly if None
+            initial_page_size: Page size when a keyword has no since_id yet
+            page_size: Page size when fetching incrementally
+            max_pages: Upper bound on next_token pages followed per query
+            max_query_length: Keywords are packed into OR queries up to this
+                length (None sends one query per keyword)
+            rate_limiters: Budget per API name (defaults to the process-wide
+                limiters; APIs without one are not limited)
+            max_connections: Total simultaneous connections
+            max_connections_per_host: Simultaneous connections per API host
+            timeout: Total timeout per request, in seconds
+            max_retries: Retries on connection errors and retryable statuses
+            backoff_factor: Exponential backoff factor between retries
+        """
+        if bearer_token is None:
+            bearer_token = TWITTER_BEARER_TOKEN
+        self.bearer_token = bearer_token
+        self.news_api_key = news_api_key if news_api_key is not None else NEWS_API_KEY
+        self.twitter_base_url = twitter_base_url.rstrip('/')
+        self.news_base_url = news_base_url.rstrip('/')
+        self.process_page = process_page
+        self.since_ids = since_ids if since_ids is not None else {}
+        self.on_since_id = on_since_id
+        self.initial_page_size = initial_page_size
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.max_query_length = max_query_length
+        if rate_limiters is None:
+            rate_limiters = shared_rate_limiters
+        self.rate_limiters = rate_limiters
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        """Open the shared HTTP session"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _get_json(
+            self, api_name: str, url: str, params: Dict[str, Any],
+            headers: Dict[str, str] = None) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        GET a JSON resource, retrying like build_retry_session()
+
+        Returns:
+            Tuple of (status_code, parsed body or None for non-200 responses)
+        """
+        await self.start()
+        limiter = self.rate_limiters.get(api_name)
+        retry_number = 0
+
+        while True:
+            if (limiter is not None
+                    and not await limiter.acquire_async(timeout=MAX_WAIT)):
+                logger.warning(f"{api_name} rate limit budget exhausted, "
+                               "skipping request", api_name=api_name)
+                return 429, None
+
+            start_time = time.time()
+            try:
+                request = self.session.get(url, params=params, headers=headers)
+                async with request as response:
+                    log_api_request(api_name, response.status, time.time() - start_time)
+                    if limiter is not None:
+                        limiter.update_from_headers(response.headers, response.status)
+
+                    if (response.status in RETRY_STATUSES
+                            and retry_number < self.max_retries):
+                        retry_number += 1
+                        delay = None
+                        if limiter is not None and response.status == 429:
+                            delay = 0.0  # The limiter holds the next attempt back
+                        elif response.status in RETRY_AFTER_STATUSES:
+                            delay = parse_retry_after(
+                                response.headers.get('Retry-After'))
+                        if delay is None:
+                            delay = backoff_delay(retry_number, self.backoff_factor)
+                        logger.debug(f"{api_name} returned {response.status}, "
+                                     f"retrying in {delay}s",
+                                     api_name=api_name, status_code=response.status)
+                        await asyncio.sleep(delay)
+                        continue
+
+                    if response.status != 200:
+                        return response.status, None
+                    return response.status, await response.json()
+
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if retry_number >= self.max_retries:
+                    raise
+                retry_number += 1
+                await asyncio.sleep(backoff_delay(retry_number, self.backoff_factor))
+
+    async def fetch_tweet_pages(
+            self, query: str, since_id: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch raw tweets newer than since_id, following next_token across pages
+
+        Returns:
+            Tuple of (raw tweets, new high-water mark or None)
+        """
+        url = f"{self.twitter_base_url}/tweets/search/recent"
+        headers = {"Authorization": f"Bearer {self.bearer_token}"}
+        params = {
+            'query': query,
+            'max_results': self.page_size if since_id else self.initial_page_size,
+            'tweet.fields': 'created_at,author_id,public_metrics',
+        }
+        if since_id:
+            params['since_id'] = since_id
+        max_pages = self.max_pages if since_id else 1
+
+        tweets = []
+        newest_id = None
+
+        for page in range(max_pages):
+            status, data = await self._get_json('twitter', url, params, headers)
+
+            if status == 400 and since_id and page == 0:
+                logger.warning(f"Twitter rejected since_id for '{query}', "
+                               "starting over", query=query, since_id=since_id)
+                return await self.fetch_tweet_pages(query)
+
+            if status != 200:
+                logger.error(f"Twitter API error for '{query}': {status}",
+                             query=query, status_code=status, page=page)
+                return tweets, None
+
+            meta = data.get("meta", {})
+            tweets.extend(data.get("data", []))
+            if page == 0:
+                newest_id = meta.get("newest_id")
+
+            next_token = meta.get("next_token")
+            if not next_token:
+                break
+            params['next_token'] = next_token
+
+        return tweets, newest_id
+
+    async def fetch_tweets_for_query(self, keywords: List[str]) -> Dict[str, Tweets]:
+        """Async equivalent of crowdsense_enhanced.fetch_tweets_for_query"""
+        tweets = {keyword: [] for keyword in keywords}
+
+        if not self.bearer_token:
+            logger.error("TWITTER_BEARER_TOKEN not configured")
+            return tweets
+
+        query = build_or_query(keywords)
+
+        try:
+            tweets_data, newest_id = await self.fetch_tweet_pages(
+                query, group_since_id(keywords, self.since_ids))
+
+            if not tweets_data:
+                logger.debug(f"No tweets found for query '{query}'", query=query)
+                return tweets
+
+            if self.process_page is not None:
+                # NER and database writes block, so keep them off the event loop
+                loop = asyncio.get_running_loop()
+                split = await loop.run_in_executor(None, self.process_page,
+                                                   keywords, tweets_data)
+            else:
+                split = demultiplex(tweets_data, keywords)
+
+            for keyword, records in split.items():
+                since_id = self.since_ids.get(keyword)
+                tweets[keyword] = [record for record in records
+                                   if is_newer(record['id'], since_id)]
+
+            if newest_id:
+                for keyword in keywords:
+                    if self.on_since_id is not None:
+                        self.on_since_id(keyword, newest_id)
+                    else:
+                        self.since_ids[keyword] = newest_id
+
+            return tweets
+
+        except Exception as e:
+            log_error('twitter_api', e, {'keywords': keywords})
+            return {keyword: [] for keyword in keywords}
+
+    async def fetch_tweets_for_keyword(self, keyword: str) -> List[Dict[str, Any]]:
+        """Async equivalent of crowdsense_enhanced.fetch_tweets_for_keyword"""
+        return (await self.fetch_tweets_for_query([keyword]))[keyword]
+
+    async def check_news(self, keyword: str) -> List[Dict[str, Any]]:
+        """Async equivalent of crowdsense_enhanced.check_news"""
+        if not self.news_api_key:
+            logger.warning("NEWS_API_KEY not configured")
+            return []
+
+        try:
+            url = f"{self.news_base_url}/everything"
+            params = {'q': keyword, 'sortBy': 'publishedAt',
+                      'apiKey': self.news_api_key}
+
+            status, data = await self._get_json('newsapi', url, params)
+
+            if status != 200:
+                logger.warning(f"News API returned status {status}",
+                               keyword=keyword, status_code=status)
+                return []
+
+            articles = data.get("articles", [])[:3]
+            logger.debug(f"Retrieved {len(articles)} news articles for '{keyword}'",
+                         keyword=keyword, article_count=len(articles))
+            return articles
+
+        except Exception as e:
+            log_error('news_api', e, {'keyword': keyword})
+            return []
+
+    async def fetch_all(self, keywords: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch tweets for every keyword, packed into OR queries fetched concurrently
+
+        Args:
+            keywords: Keywords to fetch
+
+        Returns:
+            Dictionary of keyword -> tweets (processed records if process_page is set)
+        """
+        groups = plan_keyword_queries(keywords, self.max_query_length)
+        results = await asyncio.gather(
+            *(self.fetch_tweets_for_query(group) for group in groups))
+
+        tweets = {}
+        for split in results:
+            tweets.update(split)
+        return {keyword: tweets[keyword] for keyword in keywords}
+
+
+def run_ingestion_cycle(keywords: List[str],
+                        **engine_options) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Synchronous wrapper for the scheduler: run one async fetch over all keywords
+
+    Args:
+        keywords: Keywords to fetch
+        **engine_options: Passed through to AsyncIngestionEngine
+
+    Returns:
+        Dictionary of keyword -> tweets
+    """
+    async def run():
+        async with AsyncIngestionEngine(**engine_options) as engine:
+            return await engine.fetch_all(keywords)
+
+    return asyncio.run(run())
@@ -0,0 +1,510 @@
+"""
+Backtesting - replay metric series through the anomaly detectors offline
+
+Stored metrics are streamed from the tweet_metrics table one per-minute
+cycle at a time and fed to every detector configuration as they are read,
+so memory does not grow with the number of keywords or the replayed time
+span. Generated series with known events are replayed from an in-memory
+dataset instead. Either way each configuration is graded on precision,
+recall, detection delay and throughput, and parameter grids run in
+parallel across processes.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import csv
+import itertools
+import logging
+import multiprocessing
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import repeat
+from typing import (
+    Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+)
+
+import numpy as np
+
+from core import anomaly_detection, database
+from core.anomaly_detection import (
+    AnomalyDetector, VectorizedAnomalyDetector, SeasonalAnomalyDetector,
+    CusumDetector, PageHinkleyDetector, AdaptiveThresholdDetector
+)
+from core.database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Detector classes by method name, as in create_anomaly_detector
+DETECTORS = {
+    'zscore': AnomalyDetector,
+    'vectorized': VectorizedAnomalyDetector,
+    'seasonal': SeasonalAnomalyDetector,
+    'cusum': CusumDetector,
+    'page_hinkley': PageHinkleyDetector,
+    'adaptive': AdaptiveThresholdDetector,
+}
+
+# Constructor arguments tried per method when no grid is given
+DEFAULT_GRID = [
+    ('zscore', {'window_size': [15], 'ewma_alpha': [0.3], 'z_threshold': [2.5]}),
+    ('vectorized', {'window_size': [10, 15, 30], 'ewma_alpha': [0.3],
+                    'z_threshold': [2.0, 2.5, 3.0]}),
+    ('seasonal', {'z_threshold': [2.5, 3.0]}),
+    ('cusum', {'threshold': [4.0, 5.0, 8.0], 'drift': [0.5, 1.0]}),
+    ('page_hinkley', {'threshold': [5.0, 8.0], 'drift': [0.5, 1.0]}),
+    ('adaptive', {'base_threshold': [5], 'adaptation_rate': [0.15]}),
+]
+
+# Alerts this many cycles after an event ends still count as detecting it
+GRACE_CYCLES = 5
+
+# tweet_metrics rows fetched per round trip while streaming
+STREAM_BATCH_ROWS = 5000
+
+# Set in each worker by _init_worker
+_worker_data = None
+
+
+class BacktestData:
+    """Counts of many series on a shared grid of cycles, with known events"""
+
+    def __init__(self, keywords: List[str], timestamps: List[datetime],
+                 counts: np.ndarray, events: Iterable[Tuple[int, int, int]] = ()):
+        """
+        Initialize the dataset
+
+        Args:
+            keywords: Series names, one per row of counts
+            timestamps: UTC time of each cycle, one per column of counts
+            counts: keywords x cycles array, NaN where a series has no count
+            events: (row, start, end) cycle ranges of real events, end exclusive
+        """
+        self.keywords = keywords
+        self.timestamps = timestamps
+        self.counts = counts
+        self.events = list(events)
+
+    @property
+    def points(self) -> int:
+        """Number of counts in the dataset"""
+        return int(np.isfinite(self.counts).sum())
+
+
+def stream_metrics(hours: Optional[int] = None,
+                   batch_size: int = STREAM_BATCH_ROWS
+                   ) -> Iterator[Tuple[datetime, Dict[str, int]]]:
+    """
+    Stream tweet_metrics one per-minute cycle at a time, oldest first
+
+    Rows are read in batches with fetchmany, so only one batch and one
+    cycle's counts are held in memory at once.
+
+    Args:
+        hours: Only use metrics from the last hours (the whole table when None)
+        batch_size: Rows fetched per round trip
+
+    Yields:
+        Tuple of (cycle start in UTC, keyword -> count)
+    """
+    query = "SELECT keyword, count, created_at FROM tweet_metrics"
+    params: Tuple = ()
+    if hours is not None:
+        query += " WHERE created_at > datetime('now', ?)"
+        params = (f'-{int(hours)} hours',)
+
+    minute, counts = None, {}
+    with get_db_connection() as conn:
+        cursor = conn.execute(query + " ORDER BY created_at", params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            for record in batch:
+                key = record['created_at'][:16]
+                if key != minute:
+                    if counts:
+                        yield datetime.fromisoformat(minute), counts
+                    minute, counts = key, {}
+                counts[record['keyword']] = record['count']
+    if counts:
+        yield datetime.fromisoformat(minute), counts
+
+
+def load_metrics(hours: Optional[int] = None,
+                 labels_path: Optional[str] = None) -> BacktestData:
+    """
+    Load tweet_metrics into a dense dataset with one cycle per minute
+
+    Holds keywords x cycles counts in memory; replay_metrics streams the
+    table instead and is what the backtest mode uses.
+
+    Args:
+        hours: Only use metrics from the last hours (the whole table when None)
+        labels_path: CSV of known events with keyword, start and end columns (UTC)
+
+    Returns:
+        Dataset with events from the labels file, if any
+    """
+    rows: Dict[str, int] = {}
+    timestamps: List[datetime] = []
+    cells: List[Tuple[int, int, int]] = []
+    for column, (timestamp, cycle_counts) in enumerate(stream_metrics(hours)):
+        timestamps.append(timestamp)
+        for keyword, count in cycle_counts.items():
+            cells.append((rows.setdefault(keyword, len(rows)), column, count))
+
+    counts = np.full((len(rows), len(timestamps)), np.nan)
+    if cells:
+        row_index, column_index, values = zip(*cells)
+        counts[list(row_index), list(column_index)] = values
+
+    data = BacktestData(list(rows), timestamps, counts)
+    if labels_path:
+        data.events = load_labels(labels_path, data.keywords, data.timestamps)
+    logger.info(f"Loaded {data.points} metrics for {len(rows)} keywords "
+                f"over {len(timestamps)} cycles")
+    return data
+
+
+def load_labels(path: str, keywords: List[str],
+                timestamps: List[datetime]) -> List[Tuple[int, int, int]]:
+    """
+    Convert a CSV of known events (keyword, start, end in UTC) to cycle ranges
+
+    Args:
+        path: CSV file path
+        keywords: Series names, in row order
+        timestamps: Start of each cycle, ascending
+
+    Returns:
+        (row, start, end) cycle ranges, end exclusive
+    """
+    index = {keyword: row for row, keyword in enumerate(keywords)}
+    events = []
+    with open(path, newline='') as f:
+        for label in csv.DictReader(f):
+            if label['keyword'] not in index:
+                logger.warning(f"Ignoring event for unknown keyword {label['keyword']}")
+                continue
+            start = bisect_left(timestamps, datetime.fromisoformat(label['start']))
+            end = bisect_left(timestamps, datetime.fromisoformat(label['end']))
+            events.append((index[label['keyword']], start, max(end, start + 1)))
+    return events
+
+
+def generate_series(keywords: int = 50, cycles: int = 7 * 24 * 60,
+                    events_per_keyword: int = 2, baseline: float = 20,
+                    seed: int = 0) -> BacktestData:
+    """
+    Generate per-minute series with daily cycles and labelled events
+
+    Counts are Poisson around a per-keyword baseline that peaks in the
+    evening. Each series gets spike, step or ramp events at random times.
+
+    Args:
+        keywords: Number of series
+        cycles: Minutes per series
+        events_per_keyword: Events injected into each series
+        baseline: Typical mean count per cycle
+        seed: Random seed
+
+    Returns:
+        Dataset with the injected events
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime(2026, 1, 5)  # A Monday
+    timestamps = [start + timedelta(minutes=minute) for minute in range(cycles)]
+    hours = np.array([timestamp.hour for timestamp in timestamps])
+    daily = np.where((hours >= 18) & (hours < 22), 2.0, np.where(hours < 7, 0.4, 1.0))
+
+    rates = rng.uniform(0.5, 2.0, size=(keywords, 1)) * baseline * daily
+    events = []
+    slots = max(cycles // max(events_per_keyword, 1), 1)
+    for row in range(keywords):
+        for slot in range(events_per_keyword):
+            duration = int(rng.integers(10, 60))
+            latest = max(slots - duration, slots // 4 + 1)
+            onset = slot * slots + int(rng.integers(slots // 4, latest))
+            end = min(onset + duration, cycles)
+            shape = rng.choice(['spike', 'step', 'ramp'])
+            t = np.arange(end - onset)
+            if shape == 'spike':
+                factor = np.where(t < 3, 4.0, 1.0)
+            elif shape == 'step':
+                factor = np.full(t.shape, 1.6)
+            else:
+                factor = 1.0 + 0.04 * t
+            rates[row, onset:end] *= factor
+            events.append((row, onset, end))
+
+    counts = rng.poisson(rates).astype(np.float64)
+    names = [f"keyword{row}" for row in range(keywords)]
+    return BacktestData(names, timestamps, counts, events)
+
+
+def expand_grid(grid: Sequence[Tuple[str, Mapping[str, Sequence[Any]]]]
+                ) -> List[Tuple[str, Dict[str, Any]]]:
+    """Every (method, constructor arguments) combination of a parameter grid"""
+    configs = []
+    for method, options in grid:
+        names = list(options)
+        for values in itertools.product(*(options[name] for name in names)):
+            configs.append((method, dict(zip(names, values))))
+    return configs
+
+
+def _score_cycle(detector, keywords: List[str], rows: np.ndarray, counts: np.ndarray,
+                 timestamp: datetime) -> np.ndarray:
+    """Anomaly flags for one cycle's counts"""
+    if isinstance(detector, SeasonalAnomalyDetector):
+        return detector.update_batch(counts, rows, timestamp)[2]
+    if hasattr(detector, 'update_batch'):
+        return detector.update_batch(counts, rows)[2]
+    if isinstance(detector, AdaptiveThresholdDetector):
+        return np.array([detector.update_threshold(keywords[row], int(count))[1]
+                         for row, count in zip(rows, counts)])
+    return np.array([detector.update_history(keywords[row], int(count))[2]
+                     for row, count in zip(rows, counts)])
+
+
+def _grade(events: Sequence[Tuple[int, int, int]],
+           alerts: Mapping[int, Sequence[int]]) -> Dict[str, Any]:
+    """
+    Grade alerts, given as ascending flagged cycles per row, against events
+
+    An alert is a true positive if it falls inside an event (or up to
+    GRACE_CYCLES after it); an event is detected if it has one.
+    """
+    windows: Dict[int, List[Tuple[int, int]]] = {}
+    delays = []
+    for row, start, end in events:
+        windows.setdefault(row, []).append((start, end + GRACE_CYCLES))
+        cycles = alerts.get(row, ())
+        first = bisect_left(cycles, start)
+        if first < len(cycles) and cycles[first] < end + GRACE_CYCLES:
+            delays.append(cycles[first] - start)
+
+    total = sum(len(cycles) for cycles in alerts.values())
+    hits = sum(1 for row, cycles in alerts.items() for cycle in cycles
+               if any(start <= cycle < end for start, end in windows.get(row, ())))
+    return {
+        'alerts': total,
+        'precision': hits / total if total and events else None,
+        'recall': len(delays) / len(events) if events else None,
+        'mean_delay': float(np.mean(delays)) if delays else None,
+        'median_delay': float(np.median(delays)) if delays else None,
+    }
+
+
+def evaluate(data: BacktestData, flags: np.ndarray) -> Dict[str, Any]:
+    """
+    Grade anomaly flags against the dataset's events
+
+    Args:
+        data: Dataset the flags were computed for
+        flags: keywords x cycles array, True where a detector alerted
+
+    Returns:
+        Dictionary of alerts, precision, recall and detection delays in cycles
+        (precision and recall are None without events to grade against)
+    """
+    alerts: Dict[int, List[int]] = {}
+    for row, cycle in zip(*np.nonzero(flags)):
+        alerts.setdefault(int(row), []).append(int(cycle))
+    return _grade(data.events, alerts)
+
+
+def run_backtest(data: BacktestData, method: str,
+                 params: Mapping[str, Any] = None) -> Dict[str, Any]:
+    """
+    Replay a dataset through one detector configuration
+
+    Args:
+        data: Series to replay
+        method: Detector name in DETECTORS
+        params: Detector constructor arguments
+
+    Returns:
+        Dictionary with the configuration, evaluate() results and throughput
+    """
+    params = dict(params or {})
+    detector = DETECTORS[method](**params)
+    if hasattr(detector, 'add_keywords'):
+        detector.add_keywords(data.keywords)  # Detector rows match data rows
+
+    present = np.isfinite(data.counts)
+    flags = np.zeros(data.counts.shape, dtype=bool)
+
+    # The per-keyword detectors log every count
+    level = anomaly_detection.logger.level
+    anomaly_detection.logger.setLevel(logging.WARNING)
+    try:
+        started = time.perf_counter()
+        for cycle, timestamp in enumerate(data.timestamps):
+            rows = np.flatnonzero(present[:, cycle])
+            if rows.size:
+                flags[rows, cycle] = _score_cycle(detector, data.keywords, rows,
+                                                  data.counts[rows, cycle], timestamp)
+        seconds = time.perf_counter() - started
+    finally:
+        anomaly_detection.logger.setLevel(level)
+
+    result = {'method': method, 'params': params}
+    result.update(evaluate(data, flags))
+    result['points'] = data.points
+    result['seconds'] = seconds
+    result['points_per_second'] = data.points / seconds if seconds > 0 else None
+    return result
+
+
+def _init_worker(data: BacktestData):
+    """Receive the dataset once per worker process"""
+    global _worker_data
+    _worker_data = data
+
+
+def _run_config(config: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
+    method, params = config
+    return run_backtest(_worker_data, method, params)
+
+
+def run_grid(data: BacktestData, grid: Sequence = DEFAULT_GRID,
+             workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Backtest every configuration of a parameter grid
+
+    Args:
+        data: Series to replay
+        grid: (method, {argument: [values]}) entries
+        workers: Worker processes (defaults to the number of cores; 1 runs in-process)
+
+    Returns:
+        run_backtest() results in grid order
+    """
+    configs = expand_grid(grid)
+    workers = min(workers or os.cpu_count() or 1, len(configs))
+    if workers <= 1:
+        return [run_backtest(data, method, params) for method, params in configs]
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(data,)) as executor:
+        return list(executor.map(_run_config, configs))
+
+
+def _score_counts(detector, counts: Mapping[str, int],
+                  timestamp: datetime) -> Dict[str, Tuple[float, float, bool]]:
+    """Score one streamed cycle's counts with any detector"""
+    if isinstance(detector, SeasonalAnomalyDetector):
+        return detector.update_counts(counts, timestamp)
+    return detector.update_counts(counts)
+
+
+def _replay_configs(configs: Sequence[Tuple[str, Dict[str, Any]]],
+                    hours: Optional[int] = None,
+                    labels_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Stream tweet_metrics once, feeding each cycle to every configuration
+
+    Only the cycle start times, the keyword index and the flagged cycles
+    are kept, not the counts themselves.
+    """
+    detectors = [DETECTORS[method](**params) for method, params in configs]
+    alerts: List[Dict[int, List[int]]] = [{} for _ in configs]
+    seconds = [0.0] * len(configs)
+    index: Dict[str, int] = {}
+    timestamps: List[datetime] = []
+    points = 0
+
+    # The per-keyword detectors log every count
+    level = anomaly_detection.logger.level
+    anomaly_detection.logger.setLevel(logging.WARNING)
+    try:
+        for cycle, (timestamp, counts) in enumerate(stream_metrics(hours)):
+            timestamps.append(timestamp)
+            points += len(counts)
+            for keyword in counts:
+                index.setdefault(keyword, len(index))
+            for i, detector in enumerate(detectors):
+                started = time.perf_counter()
+                scores = _score_counts(detector, counts, timestamp)
+                seconds[i] += time.perf_counter() - started
+                for keyword, (_, _, is_anomaly) in scores.items():
+                    if is_anomaly:
+                        alerts[i].setdefault(index[keyword], []).append(cycle)
+    finally:
+        anomaly_detection.logger.setLevel(level)
+
+    events = load_labels(labels_path, list(index), timestamps) if labels_path else []
+    results = []
+    for (method, params), flagged, elapsed in zip(configs, alerts, seconds):
+        result = {'method': method, 'params': params}
+        result.update(_grade(events, flagged))
+        result['points'] = points
+        result['seconds'] = elapsed
+        result['points_per_second'] = points / elapsed if elapsed > 0 else None
+        results.append(result)
+    return results
+
+
+def _init_stream_worker(database_path: str):
+    """Point a worker process at the parent's database"""
+    database.DATABASE_PATH = database_path
+
+
+def replay_metrics(grid: Sequence = DEFAULT_GRID, hours: Optional[int] = None,
+                   labels_path: Optional[str] = None,
+                   workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Backtest every configuration of a parameter grid on streamed tweet_metrics
+
+    Configurations are split across worker processes, each streaming the
+    table once for its share.
+
+    Args:
+        grid: (method, {argument: [values]}) entries
+        hours: Only use metrics from the last hours (the whole table when None)
+        labels_path: CSV of known events with keyword, start and end columns (UTC)
+        workers: Worker processes (defaults to the number of cores; 1 runs in-process)
+
+    Returns:
+        Results as from run_backtest(), in grid order
+    """
+    configs = expand_grid(grid)
+    workers = min(workers or os.cpu_count() or 1, len(configs))
+    if workers <= 1:
+        return _replay_configs(configs, hours, labels_path)
+
+    shares = [configs[worker::workers] for worker in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_stream_worker,
+                             initargs=(database.DATABASE_PATH,)) as executor:
+        parts = list(executor.map(_replay_configs, shares, repeat(hours),
+                                  repeat(labels_path)))
+
+    results: List[Dict[str, Any]] = [{}] * len(configs)
+    for worker, part in enumerate(parts):
+        results[worker::workers] = part
+    return results
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """Results as a text table"""
+    def fmt(value, spec):
+        return "-" if value is None else format(value, spec)
+
+    lines = [f"{'method':<13} {'params':<48} {'alerts':>7} {'precision':>9} "
+             f"{'recall':>7} {'delay':>6} {'points/s':>10}"]
+    for result in results:
+        params = ", ".join(f"{name}={value}"
+                           for name, value in result['params'].items())
+        lines.append(f"{result['method']:<13} {params:<48} {result['alerts']:>7} "
+                     f"{fmt(result['precision'], '.2f'):>9} "
+                     f"{fmt(result['recall'], '.2f'):>7} "
+                     f"{fmt(result['median_delay'], '.1f'):>6} "
+                     f"{fmt(result['points_per_second'], ',.0f'):>10}")
+    return "\n".join(lines)
@@ -2,9 +2,11 @@
 Enhanced CrowdSense - Real-time disaster detection with smart anomaly detection
 """
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from collections import deque
-from typing import Dict, List, Any, Optional, Tuple
+from functools import partial
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -14,14 +16,30 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.config import TWITTER_BEARER_TOKEN, NEWS_API_KEY
+from utils.config import (
+    TWITTER_BEARER_TOKEN, NEWS_API_KEY, FETCH_WORKERS, INGESTION_MODE,
+    TWITTER_MAX_QUERY_LENGTH, ANOMALY_METHOD, DETECTOR_SNAPSHOT_PATH,
+    DETECTOR_SNAPSHOT_MAX_AGE, DASHBOARD_CACHE_TTL
+)
 from utils.alert import send_alert
+from utils.rate_limiter import MAX_WAIT, get_rate_limiter
 from core.database import (
-    init_database, save_alert, save_tweet, save_tweet_metrics, 
-    get_recent_alerts, get_recent_tweets, get_system_stats
+    init_database, save_alert, save_tweets_bulk, save_tweet_metrics,
+    get_recent_alerts, get_recent_tweets, get_system_stats,
+    get_keyword_since_ids, save_keyword_since_id
+)
+from core.anomaly_detection import ChangePointDetector, create_anomaly_detector
+from core.async_ingestion import run_ingestion_cycle
+from core.snapshot_cache import SnapshotCache
+from core.time_buckets import BucketedCounter
+from core.query_planner import (
+    build_or_query, plan_keyword_queries, match_query_keywords, demultiplex,
+    group_since_id, is_newer
+)
+from core.location_extraction import (
+    extract_locations_from_tweets, warm_geocode_cache, warm_place_matcher,
+    warm_ner_model
 )
-from core.anomaly_detection import AnomalyDetector
-from core.location_extraction import extract_location_from_tweet
 from utils.logging_config import (
     setup_logging, get_logger, metrics, 
     log_tweet_processed, log_alert_sent, log_anomaly_detected,
@@ -34,12 +52,33 @@ DISASTER_KEYWORDS = ["earthquake", "flood", "cyclone", "tsunami", "landslide", "
 
 # Time window for analysis
 WINDOW = timedelta(minutes=5)
+# Trailing windows reported on the dashboard, from the same tweet counters
+VOLUME_WINDOWS = {'1m': timedelta(minutes=1), '5m': WINDOW,
+                  '15m': timedelta(minutes=15), '60m': timedelta(minutes=60)}
 ALERT_COOLDOWN = timedelta(minutes=15)
 
+# Stored metrics replayed into a detector without history: the seasonal
+# detector needs weeks to fill its hour-of-week baselines
+HISTORY_HOURS = 24 * 7 * 4 if ANOMALY_METHOD == "seasonal" else 48
+
+# Twitter recent search paging
+TWITTER_SEARCH_URL = "https://api.twitter.com/2/tweets/search/recent"
+TWITTER_TWEET_FIELDS = "created_at,author_id,public_metrics"
+# The first fetch for a keyword only establishes the high-water mark
+INITIAL_PAGE_SIZE = 10
+TWITTER_PAGE_SIZE = 100   # API maximum for recent search
+TWITTER_MAX_PAGES = 5     # Upper bound on pages followed per query per cycle
+
 # Global state
-tweet_buffers = {keyword: deque() for keyword in DISASTER_KEYWORDS}
+tweet_buckets = BucketedCounter(bucket_seconds=10, horizon=max(VOLUME_WINDOWS.values()))
 last_alert_times = {keyword: None for keyword in DISASTER_KEYWORDS}
-anomaly_detector = AnomalyDetector(window_size=15, ewma_alpha=0.3, z_threshold=2.5)
+keyword_since_ids: Dict[str, str] = {}  # Newest tweet id seen per keyword
+anomaly_detector = create_anomaly_detector(ANOMALY_METHOD, DISASTER_KEYWORDS)
+
+# Worker pool for concurrent keyword fetching (created on first use)
+_fetch_executor: Optional[ThreadPoolExecutor] = None
+_fetch_executor_workers = 0
+_fetch_executor_lock = threading.Lock()
 
 # Initialize logging
 setup_logging('INFO', enable_db_logging=True)
@@ -53,7 +92,7 @@ def build_retry_session() -> requests.Session:
         read=5,
         connect=5,
         backoff_factor=0.5,
-        status_forcelist=[429, 500, 502, 503, 504],
+        status_forcelist=[500, 502, 503, 504],  # 429s are left to the rate limiters
         allowed_methods=["GET", "POST"],
         raise_on_status=False,
     )
@@ -74,11 +113,18 @@ def check_news(keyword: str) -> List[Dict[str, Any]]:
         return []
         
     try:
+        if not get_rate_limiter('newsapi').acquire(timeout=MAX_WAIT):
+            logger.warning("News API budget exhausted, "
+                           f"skipping news check for '{keyword}'", keyword=keyword)
+            return []
+
         start_time = time.time()
         url = f"https://newsapi.org/v2/everything?q={keyword}&sortBy=publishedAt&apiKey={NEWS_API_KEY}"
         
         response = http.get(url, timeout=10)
         response_time = time.time() - start_time
+        get_rate_limiter('newsapi').update_from_headers(response.headers,
+                                                        response.status_code)
         
         log_api_request('newsapi', response.status_code, response_time)
         
@@ -98,106 +144,267 @@ def check_news(keyword: str) -> List[Dict[str, Any]]:
         return []
 
 
-def fetch_tweets_for_keyword(keyword: str) -> List[Dict[str, Any]]:
-    """Fetch tweets for a specific keyword"""
-    if not TWITTER_BEARER_TOKEN:
-        logger.error("TWITTER_BEARER_TOKEN not configured")
-        return []
+def process_query_page(
+        keywords: List[str],
+        tweets_data: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Enrich a page of raw API tweets with locations, save it, and split it per keyword
+
+    A tweet matching several of the query's keywords is stored once, under
+    the first of them, and counted for each of them. The split comes from
+    keyword matches rather than from which rows the insert added, since a
+    tweet can also be returned to another query group whose page is saved
+    first; callers drop tweets older than each keyword's since_id.
+
+    Args:
+        keywords: Keywords packed into the query the page was fetched for
+        tweets_data: The "data" list of a Twitter search response
+
+    Returns:
+        Dictionary of keyword -> records of the page's tweets matching it,
+        each tweet once
+    """
+    matched_tweets = []
+    seen_ids = set()
+    for tweet_data in tweets_data:
+        if tweet_data.get('id') in seen_ids:
+            continue
+        matched = match_query_keywords(tweet_data, keywords)
+        if matched:
+            seen_ids.add(tweet_data.get('id'))
+            matched_tweets.append((tweet_data, matched))
+
+    # Extract location information for the whole page in one NER pass
+    location_infos = extract_locations_from_tweets(
+        [tweet_data.get('text', '') for tweet_data, _ in matched_tweets]
+    )
 
+    records = []
+    for (tweet_data, matched), location_info in zip(matched_tweets, location_infos):
+        if location_info['primary_location']:
+            log_location_extracted(
+                location_info['primary_location'],
+                location_info['latitude'],
+                location_info['longitude']
+            )
+
+        # Prepare tweet data for storage
+        tweet_record = {
+            'id': tweet_data.get('id'),
+            'keyword': matched[0],
+            # We get author_id from API v2
+            'user_screen_name': tweet_data.get('author_id'),
+            'text': tweet_data.get('text'),
+            'sentiment': None,  # Could add sentiment analysis here
+            'location': location_info['primary_location'],
+            'latitude': location_info['latitude'],
+            'longitude': location_info['longitude'],
+            'created_at': tweet_data.get('created_at'),
+            'tweet_created_at': tweet_data.get('created_at')
+        }
+
+        records.append(tweet_record)
+
+    # Save the whole page in one transaction; tweets already stored are skipped
+    inserted_ids = save_tweets_bulk(records)
+
+    logger.debug(f"Processed {len(records)} tweets for keywords {keywords}",
+                 keywords=keywords, tweet_count=len(records),
+                 new_count=len(inserted_ids))
+
+    return demultiplex(records, keywords)
+
+
+def fetch_tweet_pages(
+        query: str,
+        since_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch tweets newer than since_id, following next_token across pages
+
+    Without a since_id only one small page is read, to establish where the
+    query's stream currently is.
+
+    Args:
+        query: Search query, one keyword or several packed with build_or_query
+        since_id: Newest tweet id already processed for this query
+
+    Returns:
+        Tuple of (raw tweets, new high-water mark). The high-water mark is
+        None when nothing new arrived or a page failed part way, so the next
+        cycle re-reads from the old mark instead of skipping tweets.
+    """
     headers = {"Authorization": f"Bearer {TWITTER_BEARER_TOKEN}"}
+    params = {
+        'query': query,
+        'max_results': TWITTER_PAGE_SIZE if since_id else INITIAL_PAGE_SIZE,
+        'tweet.fields': TWITTER_TWEET_FIELDS,
+    }
+    if since_id:
+        params['since_id'] = since_id
+    max_pages = TWITTER_MAX_PAGES if since_id else 1
+
+    tweets = []
+    newest_id = None
+
+    for page in range(max_pages):
+        if not get_rate_limiter('twitter').acquire(timeout=MAX_WAIT):
+            logger.warning("Twitter rate limit budget exhausted, "
+                           f"skipping '{query}' this cycle", query=query)
+            return tweets, None
 
-    try:
         start_time = time.time()
-        url = f"https://api.twitter.com/2/tweets/search/recent?query={keyword}&max_results=10&tweet.fields=created_at,author_id,public_metrics"
-        
-        response = http.get(url, headers=headers, timeout=10)
+        response = http.get(TWITTER_SEARCH_URL, params=params, headers=headers,
+                            timeout=10)
         response_time = time.time() - start_time
+        get_rate_limiter('twitter').update_from_headers(response.headers,
+                                                        response.status_code)
         
         log_api_request('twitter', response.status_code, response_time)
         
+        if response.status_code == 400 and since_id and page == 0:
+            # Recent search rejects since_id values older than its 7-day window
+            logger.warning(f"Twitter rejected since_id for '{query}', starting over",
+                           query=query, since_id=since_id)
+            return fetch_tweet_pages(query)
+
         if response.status_code != 200:
-            logger.error(f"Twitter API error for '{keyword}': {response.status_code}",
-                        keyword=keyword, status_code=response.status_code)
-            return []
+            logger.error(f"Twitter API error for '{query}': {response.status_code}",
+                         query=query, status_code=response.status_code, page=page)
+            return tweets, None
             
         data = response.json()
+        meta = data.get("meta", {})
+        tweets.extend(data.get("data", []))
         
-        if "data" not in data:
-            logger.debug(f"No tweets found for keyword '{keyword}'", keyword=keyword)
-            return []
-            
-        tweets = []
-        for tweet_data in data["data"]:
-            # Extract location information
-            location_info = extract_location_from_tweet(tweet_data.get('text', ''))
+        # Results are newest first, so the first page carries the new mark
+        if page == 0:
+            newest_id = meta.get("newest_id")
             
-            if location_info['primary_location']:
-                log_location_extracted(
-                    location_info['primary_location'],
-                    location_info['latitude'],
-                    location_info['longitude']
-                )
-            
-            # Prepare tweet data for storage
-            tweet_record = {
-                'id': tweet_data.get('id'),
-                'keyword': keyword,
-                'user_screen_name': tweet_data.get('author_id'),  # We get author_id from API v2
-                'text': tweet_data.get('text'),
-                'sentiment': None,  # Could add sentiment analysis here
-                'location': location_info['primary_location'],
-                'latitude': location_info['latitude'],
-                'longitude': location_info['longitude'],
-                'created_at': tweet_data.get('created_at'),
-                'tweet_created_at': tweet_data.get('created_at')
-            }
-            
-            # Save to database
-            if save_tweet(tweet_record):
-                tweets.append(tweet_record)
+        next_token = meta.get("next_token")
+        if not next_token:
+            break
+        params['next_token'] = next_token
+    else:
+        if since_id:
+            logger.warning(f"Stopped paging '{query}' after {max_pages} pages",
+                           query=query, tweet_count=len(tweets))
+
+    return tweets, newest_id
+
+
+def update_since_id(keyword: str, since_id: str):
+    """Advance and persist a keyword's high-water mark"""
+    keyword_since_ids[keyword] = since_id
+    save_keyword_since_id(keyword, since_id)
+
+
+def fetch_tweets_for_query(keywords: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch tweets for a group of keywords with one packed OR query
+
+    Args:
+        keywords: Keywords to fetch, as planned by plan_keyword_queries
+
+    Returns:
+        Dictionary of keyword -> tweets that arrived since that keyword's last fetch
+    """
+    tweets = {keyword: [] for keyword in keywords}
+
+    if not TWITTER_BEARER_TOKEN:
+        logger.error("TWITTER_BEARER_TOKEN not configured")
+        return tweets
+
+    query = build_or_query(keywords)
+
+    try:
+        since_id = group_since_id(keywords, keyword_since_ids)
+        tweets_data, newest_id = fetch_tweet_pages(query, since_id)
+        
+        if not tweets_data:
+            logger.debug(f"No tweets found for query '{query}'", query=query)
+            return tweets
             
-        logger.debug(f"Processed {len(tweets)} tweets for keyword '{keyword}'",
-                    keyword=keyword, tweet_count=len(tweets))
+        # A keyword further ahead than the group's since_id skips what it already saw
+        for keyword, records in process_query_page(keywords, tweets_data).items():
+            since_id = keyword_since_ids.get(keyword)
+            tweets[keyword] = [record for record in records
+                               if is_newer(record['id'], since_id)]
         
+        # Only advance once the tweets are safely stored
+        if newest_id:
+            for keyword in keywords:
+                update_since_id(keyword, newest_id)
+
         return tweets
         
     except Exception as e:
-        log_error('twitter_api', e, {'keyword': keyword})
-        return []
+        log_error('twitter_api', e, {'keywords': keywords})
+        return {keyword: [] for keyword in keywords}
 
 
-def analyze_tweet_anomaly(keyword: str, tweet_count: int) -> Tuple[float, float, bool]:
-    """Analyze tweet count for anomalies using smart detection"""
+def fetch_tweets_for_keyword(keyword: str) -> List[Dict[str, Any]]:
+    """Fetch tweets for a specific keyword that arrived since the last fetch"""
+    return fetch_tweets_for_query([keyword])[keyword]
+
+
+def analyze_tweet_anomalies(
+        tweet_counts: Dict[str, int]) -> Dict[str, Tuple[float, float, bool]]:
+    """
+    Analyze a whole cycle's tweet counts for anomalies in one vectorized update
+
+    Args:
+        tweet_counts: Dictionary of keyword -> tweet count in the current window
+
+    Returns:
+        Dictionary of keyword -> (z_score, ewma_value, is_anomaly)
+    """
     try:
-        # Load historical data for this keyword if not already loaded
-        if keyword not in anomaly_detector.keyword_history or not anomaly_detector.keyword_history[keyword]:
-            anomaly_detector.load_historical_data(keyword, hours=24)
+        # Load historical data for keywords seen for the first time
+        missing = [keyword for keyword in tweet_counts
+                   if not anomaly_detector.has_history(keyword)]
+        if missing:
+            anomaly_detector.load_historical_data_bulk(missing, hours=HISTORY_HOURS)
         
         # Update anomaly detector and get results
-        z_score, ewma_value, is_anomaly = anomaly_detector.update_history(keyword, tweet_count)
+        scores = anomaly_detector.update_counts(tweet_counts)
         
-        # Save metrics to database
-        window_start = datetime.utcnow() - WINDOW
-        window_end = datetime.utcnow()
-        
-        save_tweet_metrics(
-            keyword=keyword,
-            count=tweet_count,
-            window_start=window_start,
-            window_end=window_end,
-            z_score=z_score,
-            ewma_value=ewma_value,
-            is_anomaly=is_anomaly
-        )
+    except Exception as e:
+        log_error('anomaly_detection', e, {'tweet_counts': tweet_counts})
+        return {keyword: (0.0, 0.0, False) for keyword in tweet_counts}
         
-        if is_anomaly:
-            log_anomaly_detected(keyword, z_score, tweet_count)
+    # Save metrics to database
+    window_start = datetime.utcnow() - WINDOW
+    window_end = datetime.utcnow()
+
+    tracks_changes = isinstance(anomaly_detector, ChangePointDetector)
+
+    for keyword, (z_score, ewma_value, is_anomaly) in scores.items():
+        try:
+            save_tweet_metrics(
+                keyword=keyword,
+                count=tweet_counts[keyword],
+                window_start=window_start,
+                window_end=window_end,
+                z_score=z_score,
+                ewma_value=ewma_value,
+                is_anomaly=is_anomaly,
+                change_score=(anomaly_detector.change_score(keyword)
+                              if tracks_changes else None)
+            )
             
-        return z_score, ewma_value, is_anomaly
-        
-    except Exception as e:
-        log_error('anomaly_detection', e, {'keyword': keyword, 'tweet_count': tweet_count})
-        return 0.0, 0.0, False
+            if is_anomaly:
+                log_anomaly_detected(keyword, z_score, tweet_counts[keyword])
+
+        except Exception as e:
+            log_error('anomaly_detection', e,
+                      {'keyword': keyword, 'tweet_count': tweet_counts[keyword]})
+
+    return scores
+
+
+def analyze_tweet_anomaly(keyword: str, tweet_count: int) -> Tuple[float, float, bool]:
+    """Analyze tweet count for anomalies using smart detection"""
+    return analyze_tweet_anomalies({keyword: tweet_count})[keyword]
 
 
 def should_send_alert(keyword: str) -> bool:
@@ -212,8 +419,100 @@ def should_send_alert(keyword: str) -> bool:
     return datetime.utcnow() - last_alert > ALERT_COOLDOWN
 
 
-def fetch_and_analyze_tweets() -> Dict[str, Any]:
-    """Main function to fetch and analyze tweets for all keywords"""
+def _get_fetch_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Get the shared fetch worker pool, resizing it if the worker count changed"""
+    global _fetch_executor, _fetch_executor_workers
+
+    with _fetch_executor_lock:
+        if _fetch_executor is None or _fetch_executor_workers != max_workers:
+            if _fetch_executor is not None:
+                _fetch_executor.shutdown(wait=False)
+            _fetch_executor = ThreadPoolExecutor(max_workers=max_workers,
+                                                 thread_name_prefix='crowdsense-fetch')
+            _fetch_executor_workers = max_workers
+        return _fetch_executor
+
+
+def _fetch_on_first_use(
+        keywords: List[str]) -> Callable[[], Dict[str, List[Dict[str, Any]]]]:
+    """Fetch a query group when first asked for, then replay its result or error"""
+    outcome = {}
+
+    def result():
+        if not outcome:
+            try:
+                outcome['tweets'] = fetch_tweets_for_query(keywords)
+            except Exception as e:
+                outcome['error'] = e
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['tweets']
+
+    return result
+
+
+def start_keyword_fetches(
+        keywords: List[str],
+        max_workers: int = 1) -> Dict[str, Callable[[], List[Dict[str, Any]]]]:
+    """
+    Start fetching tweets for each keyword
+
+    Keywords are packed into as few OR queries as TWITTER_MAX_QUERY_LENGTH
+    allows. With more than one worker every query is fetched and enriched in
+    the background at once, so a cycle takes roughly as long as the slowest
+    query instead of the sum of all of them. With INGESTION_MODE=async the
+    whole cycle is fetched up front by the aiohttp engine instead of threads.
+
+    Args:
+        keywords: Keywords to fetch
+        max_workers: Number of concurrent fetches (1 fetches serially on demand)
+
+    Returns:
+        Dictionary of keyword -> callable returning that keyword's tweets
+        (re-raising any exception from its query's fetch)
+    """
+    if INGESTION_MODE == 'async':
+        fetched = run_ingestion_cycle(keywords, process_page=process_query_page,
+                                      since_ids=keyword_since_ids,
+                                      on_since_id=update_since_id,
+                                      initial_page_size=INITIAL_PAGE_SIZE,
+                                      page_size=TWITTER_PAGE_SIZE,
+                                      max_pages=TWITTER_MAX_PAGES,
+                                      max_query_length=TWITTER_MAX_QUERY_LENGTH)
+        return {keyword: (lambda tweets=fetched[keyword]: tweets)
+                for keyword in keywords}
+
+    groups = plan_keyword_queries(keywords, TWITTER_MAX_QUERY_LENGTH)
+    logger.debug(f"Packed {len(keywords)} keywords into {len(groups)} queries",
+                 keyword_count=len(keywords), query_count=len(groups))
+
+    if max_workers <= 1:
+        group_fetches = [_fetch_on_first_use(group) for group in groups]
+    else:
+        executor = _get_fetch_executor(max_workers)
+        group_fetches = [executor.submit(fetch_tweets_for_query, group).result
+                         for group in groups]
+
+    return {keyword: (lambda keyword=keyword, fetch=group_fetch: fetch()[keyword])
+            for group, group_fetch in zip(groups, group_fetches)
+            for keyword in group}
+
+
+def fetch_and_analyze_tweets(max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Main function to fetch and analyze tweets for all keywords
+
+    Fetching runs concurrently across keywords; the window counts of every
+    keyword are then scored in one vectorized anomaly detector update, and
+    alerting and updates to the per-keyword state stay on the calling thread,
+    in keyword order, so results are the same as a serial run.
+
+    Args:
+        max_workers: Concurrent keyword fetches (defaults to FETCH_WORKERS)
+    """
+    if max_workers is None:
+        max_workers = FETCH_WORKERS
+
     results = {
         'timestamp': datetime.utcnow().isoformat(),
         'keywords_processed': 0,
@@ -226,26 +525,35 @@ def fetch_and_analyze_tweets() -> Dict[str, Any]:
     try:
         logger.info("Starting tweet fetch and analysis cycle")
         
+        fetches = start_keyword_fetches(DISASTER_KEYWORDS, max_workers)
+        tweet_counts = {}
+        window_counts = {}
+
         for keyword in DISASTER_KEYWORDS:
             try:
-                # Fetch tweets for this keyword
-                tweets = fetch_tweets_for_keyword(keyword)
+                # Wait for this keyword's tweets
+                tweets = fetches[keyword]()
                 tweet_count = len(tweets)
                 
-                # Update tweet buffer
-                current_time = datetime.utcnow()
-                tweet_buffers[keyword].extend([current_time] * tweet_count)
-                
-                # Clean old tweets from buffer
-                cutoff = current_time - WINDOW
-                while tweet_buffers[keyword] and tweet_buffers[keyword][0] < cutoff:
-                    tweet_buffers[keyword].popleft()
+                # Count tweets in this keyword's time buckets
+                tweet_buckets.add(keyword, tweet_count)
                 
                 # Get current count in window
-                window_count = len(tweet_buffers[keyword])
+                tweet_counts[keyword] = tweet_count
+                window_counts[keyword] = tweet_buckets.window_sum(keyword, WINDOW)
                 
-                # Analyze for anomalies
-                z_score, ewma_value, is_anomaly = analyze_tweet_anomaly(keyword, window_count)
+            except Exception as e:
+                log_error('keyword_processing', e, {'keyword': keyword})
+                results['errors'] += 1
+                
+        # Analyze every keyword for anomalies at once
+        scores = analyze_tweet_anomalies(window_counts) if window_counts else {}
+        current_time = datetime.utcnow()
+
+        for keyword, (z_score, ewma_value, is_anomaly) in scores.items():
+            try:
+                tweet_count = tweet_counts[keyword]
+                window_count = window_counts[keyword]
                 
                 # Log tweet processing
                 log_tweet_processed(keyword, tweet_count)
@@ -282,8 +590,8 @@ def fetch_and_analyze_tweets() -> Dict[str, Any]:
                             last_alert_times[keyword] = current_time
                             results['alerts_sent'] += 1
                             
-                            # Clear buffer after alert
-                            tweet_buffers[keyword].clear()
+                            # Clear window after alert
+                            tweet_buckets.clear(keyword)
                             
                             log_alert_sent(keyword, alert_msg, sms_sid)
                             
@@ -313,6 +621,13 @@ def fetch_and_analyze_tweets() -> Dict[str, Any]:
         logger.info("Tweet analysis cycle completed",
                    **{k: v for k, v in results.items() if k != 'timestamp'})
         
+        # Publish the cycle's results to dashboards that are being watched
+        if dashboard_cache.age() is not None:
+            try:
+                dashboard_cache.refresh()
+            except Exception:
+                pass  # Logged by get_dashboard_data; the next request retries
+
         return results
         
     except Exception as e:
@@ -321,8 +636,41 @@ def fetch_and_analyze_tweets() -> Dict[str, Any]:
         return results
 
 
-def get_dashboard_data() -> Dict[str, Any]:
-    """Get data for the web dashboard"""
+def get_keyword_volumes() -> Dict[str, Dict[str, int]]:
+    """Tweets counted per keyword over each of the VOLUME_WINDOWS"""
+    return {
+        keyword: dict(zip(VOLUME_WINDOWS,
+                          tweet_buckets.window_sums(keyword, VOLUME_WINDOWS.values())))
+        for keyword in DISASTER_KEYWORDS
+    }
+
+
+def dashboard_error_data(error: Exception) -> Dict[str, Any]:
+    """Dashboard data reporting that the real data could not be built"""
+    return {
+        'status': 'ERROR',
+        'tweets': [],
+        'news': [],
+        'alerts': [],
+        'stats': {},
+        'metrics': {},
+        'volumes': {},
+        'last_updated': datetime.utcnow().isoformat(),
+        'error': str(error)
+    }
+
+
+def get_dashboard_data(raise_errors: bool = False) -> Dict[str, Any]:
+    """
+    Get data for the web dashboard
+
+    Args:
+        raise_errors: Re-raise database errors instead of returning an
+            ERROR payload
+
+    Returns:
+        Dashboard data dictionary
+    """
     try:
         # Get recent data from database
         recent_alerts = get_recent_alerts(limit=10)
@@ -369,21 +717,55 @@ def get_dashboard_data() -> Dict[str, Any]:
             'alerts': recent_alerts,
             'stats': system_stats,
             'metrics': metrics.get_metrics(),
+            'volumes': get_keyword_volumes(),
             'last_updated': datetime.utcnow().isoformat()
         }
         
     except Exception as e:
         log_error('dashboard_data', e)
-        return {
-            'status': 'ERROR',
-            'tweets': [],
-            'news': [],
-            'alerts': [],
-            'stats': {},
-            'metrics': {},
-            'last_updated': datetime.utcnow().isoformat(),
-            'error': str(e)
-        }
+        if raise_errors:
+            raise
+        return dashboard_error_data(e)
+
+
+# Dashboard data served from memory; built on first use, then refreshed by
+# each ingestion cycle or after DASHBOARD_CACHE_TTL seconds. Failed builds
+# raise rather than being cached, so the next request tries again.
+dashboard_cache = SnapshotCache(partial(get_dashboard_data, raise_errors=True),
+                                ttl=DASHBOARD_CACHE_TTL)
+
+
+def get_cached_dashboard_data() -> Dict[str, Any]:
+    """Get the dashboard data snapshot, with its age in seconds"""
+    try:
+        data, age = dashboard_cache.get()
+    except Exception as e:
+        return {**dashboard_error_data(e), 'snapshot_age_seconds': 0.0}
+    return {**data, 'snapshot_age_seconds': round(age, 1)}
+
+
+def save_detector_snapshot() -> str:
+    """Write the anomaly detector state so the next start can skip the history replay"""
+    anomaly_detector.save_snapshot(DETECTOR_SNAPSHOT_PATH)
+    return f"Detector state saved to {DETECTOR_SNAPSHOT_PATH}"
+
+
+def restore_detector_state() -> int:
+    """
+    Restore the anomaly detector from its snapshot, replaying history only where needed
+
+    Returns:
+        Number of keywords whose history was replayed from the database
+    """
+    if anomaly_detector.load_snapshot(DETECTOR_SNAPSHOT_PATH,
+                                      max_age=DETECTOR_SNAPSHOT_MAX_AGE):
+        logger.info("Anomaly detector state restored from snapshot")
+
+    missing = [keyword for keyword in DISASTER_KEYWORDS
+               if not anomaly_detector.has_history(keyword)]
+    if missing:
+        anomaly_detector.load_historical_data_bulk(missing, hours=HISTORY_HOURS)
+    return len(missing)
 
 
 def initialize_system():
@@ -394,11 +776,19 @@ def initialize_system():
     init_database()
     logger.info("Database initialized")
     
-    # Load historical data for anomaly detection
-    for keyword in DISASTER_KEYWORDS:
-        anomaly_detector.load_historical_data(keyword, hours=48)
+    # Resume incremental fetching where the last run stopped
+    keyword_since_ids.update(get_keyword_since_ids())
+    logger.info(f"Loaded tweet high-water marks for {len(keyword_since_ids)} keywords")
     
-    logger.info("Historical data loaded for anomaly detection")
+    # Reuse geocoding results from earlier runs and other processes
+    logger.info(f"Loaded {warm_geocode_cache()} cached geocoding results")
+    warm_place_matcher()
+    warm_ner_model()
+
+    # Load historical data for anomaly detection
+    replayed = restore_detector_state()
+    logger.info(f"Historical data loaded for anomaly detection "
+                f"({replayed} keywords replayed from the database)")
     logger.info("CrowdSense system initialization complete")
 
 
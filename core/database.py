@@ -4,8 +4,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import sqlite3
 import json
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import List, Dict, Any, Optional, Tuple
 from contextlib import contextmanager
 import logging
 
@@ -15,16 +18,118 @@ logger = logging.getLogger(__name__)
 
 DATABASE_PATH = "crowdsense.db"
 
+# Connection tuning
+BUSY_TIMEOUT_MS = 5000              # How long SQLite waits on a locked database
+CACHE_SIZE_KB = 20000               # Page cache per connection (~20 MB)
+MMAP_SIZE_BYTES = 256 * 1024 * 1024  # Memory-mapped I/O window
+
+# Retry policy for "database is locked" errors that outlast the busy timeout
+LOCK_RETRY_ATTEMPTS = 3
+LOCK_RETRY_DELAY = 0.1  # Seconds, doubled after each attempt
+
+
+class ConnectionPool:
+    """Thread-aware pool that keeps one tuned SQLite connection per thread"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[Tuple[int, str], sqlite3.Connection] = {}
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        """Open a new connection and apply the performance pragmas"""
+        # check_same_thread is disabled only so close_all() can close
+        # connections owned by finished threads; each thread still uses its own
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")  # Safe with WAL, far fewer fsyncs
+        conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE_BYTES}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def _prune_dead_threads(self):
+        """Close connections whose owning thread has exited"""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for key in [key for key in self._connections if key[0] not in alive]:
+            try:
+                self._connections.pop(key).close()
+            except sqlite3.Error:
+                pass
+
+    def get(self, path: str = None) -> sqlite3.Connection:
+        """Get the calling thread's connection for a database path"""
+        path = path or DATABASE_PATH
+        cached = getattr(self._local, 'connections', None)
+        if cached is None:
+            cached = self._local.connections = {}
+
+        conn = cached.get(path)
+        if conn is None:
+            conn = self._open(path)
+            cached[path] = conn
+            with self._lock:
+                self._prune_dead_threads()
+                self._connections[(threading.get_ident(), path)] = conn
+        return conn
+
+    @contextmanager
+    def connection(self, path: str = None):
+        """Borrow the calling thread's connection for the duration of a block"""
+        conn = self.get(path)
+        depth = getattr(self._local, 'depth', 0)
+        self._local.depth = depth + 1
+        try:
+            yield conn
+        finally:
+            self._local.depth = depth
+            # Uncommitted work is discarded, as it was when connections were
+            # closed after every call; nested blocks leave it to the outermost
+            if depth == 0 and conn.in_transaction:
+                conn.rollback()
+
+    def close_all(self):
+        """Close every pooled connection (used on shutdown and in tests)"""
+        with self._lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+
+# Global connection pool
+connection_pool = ConnectionPool()
+
 
 @contextmanager
 def get_db_connection():
-    """Context manager for database connections"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # Enable column access by name
-    try:
+    """Context manager for database connections (pooled per thread)"""
+    with connection_pool.connection() as conn:
         yield conn
-    finally:
-        conn.close()
+
+
+def retry_on_locked(func):
+    """Retry a database write when SQLite reports the database is locked"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        delay = LOCK_RETRY_DELAY
+        for attempt in range(LOCK_RETRY_ATTEMPTS):
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) or attempt == LOCK_RETRY_ATTEMPTS - 1:
+                    raise
+                logger.warning(f"Database locked in {func.__name__}, "
+                               f"retrying in {delay}s")
+                time.sleep(delay)
+                delay *= 2
+    return wrapper
 
 
 def init_database():
@@ -88,9 +193,160 @@ def init_database():
         """)
         
         conn.commit()
+        apply_migrations(conn)
         logger.info("Database initialized successfully")
 
 
+# Rollup granularities and the bucket each created_at timestamp falls into
+ROLLUP_FORMATS = {
+    'minute': '%Y-%m-%d %H:%M:00',
+    'hour': '%Y-%m-%d %H:00:00',
+    'day': '%Y-%m-%d 00:00:00',
+}
+
+# Tables whose rows are counted per keyword in volume_rollups, keyed by rollup kind
+ROLLUP_SOURCES = {'tweets': 'tweets', 'alerts': 'alerts'}
+
+
+def _rollup_migration() -> List[str]:
+    """
+    Statements creating the rollup and counter tables, the triggers that keep
+    them current on every insert, and a backfill from the existing rows
+    """
+    statements = [
+        """CREATE TABLE IF NOT EXISTS volume_rollups (
+               kind TEXT NOT NULL,         -- Source table: 'tweets' or 'alerts'
+               granularity TEXT NOT NULL,  -- 'minute', 'hour' or 'day'
+               bucket TEXT NOT NULL,       -- Bucket start, same format as created_at
+               keyword TEXT NOT NULL,
+               count INTEGER NOT NULL,
+               PRIMARY KEY (kind, granularity, bucket, keyword)
+           )""",
+        """CREATE TABLE IF NOT EXISTS stat_counters (
+               name TEXT PRIMARY KEY,
+               value INTEGER NOT NULL
+           )""",
+    ]
+
+    for kind, table in ROLLUP_SOURCES.items():
+        counter = f'total_{kind}'
+        upserts = "".join(
+            f"""
+                INSERT INTO volume_rollups (kind, granularity, bucket, keyword, count)
+                VALUES ('{kind}', '{granularity}',
+                        strftime('{bucket}',
+                                 COALESCE(NEW.created_at, CURRENT_TIMESTAMP)),
+                        NEW.keyword, 1)
+                ON CONFLICT (kind, granularity, bucket, keyword)
+                DO UPDATE SET count = count + 1;"""
+            for granularity, bucket in ROLLUP_FORMATS.items())
+        statements += [
+            f"""CREATE TRIGGER IF NOT EXISTS {table}_rollup_insert
+               AFTER INSERT ON {table}
+               BEGIN
+                INSERT INTO stat_counters (name, value) VALUES ('{counter}', 1)
+                ON CONFLICT (name) DO UPDATE SET value = value + 1;{upserts}
+               END""",
+            # Retention cleanup only shrinks the totals; rolled-up history is kept
+            f"""CREATE TRIGGER IF NOT EXISTS {table}_rollup_delete
+               AFTER DELETE ON {table}
+               BEGIN
+                UPDATE stat_counters SET value = value - 1 WHERE name = '{counter}';
+               END""",
+            f"""INSERT OR REPLACE INTO stat_counters (name, value)
+               SELECT '{counter}', COUNT(*) FROM {table}""",
+        ]
+        statements += [
+            f"""INSERT OR REPLACE INTO volume_rollups
+                   (kind, granularity, bucket, keyword, count)
+               SELECT '{kind}', '{granularity}', strftime('{bucket}', created_at),
+                      keyword, COUNT(*)
+               FROM {table} WHERE created_at IS NOT NULL
+               GROUP BY 3, 4"""
+            for granularity, bucket in ROLLUP_FORMATS.items()
+        ]
+    return statements
+
+
+# Versioned schema migrations, applied in order and tracked with PRAGMA user_version.
+# Append new entries; never edit one that has already shipped.
+SCHEMA_MIGRATIONS = [
+    (1, [
+        # Recent tweets feed and retention cleanup
+        "CREATE INDEX IF NOT EXISTS idx_tweets_created_at ON tweets (created_at)",
+        # Map feed: only geotagged tweets, already ordered by recency
+        """CREATE INDEX IF NOT EXISTS idx_tweets_geo_created_at ON tweets (created_at)
+           WHERE latitude IS NOT NULL AND longitude IS NOT NULL""",
+        "CREATE INDEX IF NOT EXISTS idx_alerts_created_at ON alerts (created_at)",
+        # Per-keyword metric history for anomaly detection
+        """CREATE INDEX IF NOT EXISTS idx_tweet_metrics_keyword_created
+           ON tweet_metrics (keyword, created_at)""",
+    ]),
+    (2, [
+        # Per-keyword Twitter high-water marks for incremental fetching
+        """CREATE TABLE IF NOT EXISTS keyword_state (
+               keyword TEXT PRIMARY KEY,
+               since_id TEXT,
+               updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+           )""",
+    ]),
+    (3, [
+        # Geocoding results shared by every process; NULL coordinates cache a miss
+        """CREATE TABLE IF NOT EXISTS geocode_cache (
+               location_key TEXT PRIMARY KEY,
+               latitude REAL,
+               longitude REAL,
+               created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+               expires_at TIMESTAMP NOT NULL
+           )""",
+        "CREATE INDEX IF NOT EXISTS idx_geocode_cache_expires_at "
+        "ON geocode_cache (expires_at)",
+    ]),
+    (4, [
+        # Change-point statistic (CUSUM / Page-Hinkley) alongside the z-score
+        "ALTER TABLE tweet_metrics ADD COLUMN change_score REAL",
+    ]),
+    (5, [
+        # Per-keyword tweet/alert volume rollups and O(1) totals, maintained by triggers
+        *_rollup_migration(),
+        "CREATE INDEX IF NOT EXISTS idx_volume_rollups_bucket "
+        "ON volume_rollups (granularity, bucket)",
+    ]),
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Get the schema version recorded in the database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Apply any schema migrations newer than the database's recorded version
+
+    Args:
+        conn: Open database connection
+
+    Returns:
+        Schema version after migrating
+    """
+    current_version = get_schema_version(conn)
+
+    for version, statements in SCHEMA_MIGRATIONS:
+        if version <= current_version:
+            continue
+
+        for statement in statements:
+            conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {version}")
+        conn.commit()
+        current_version = version
+        logger.info(f"Applied database migration {version}")
+
+    return current_version
+
+
+@retry_on_locked
 def save_alert(keyword: str, message: str, tweet_count: int, sms_sid: str = None, 
                news_articles: List[Dict] = None) -> int:
     """Save an alert to the database"""
@@ -111,47 +367,222 @@ def save_alert(keyword: str, message: str, tweet_count: int, sms_sid: str = None
         return alert_id
 
 
+@retry_on_locked
+def _insert_tweet(tweet_data: Dict[str, Any]):
+    """Insert a single tweet row, ignoring duplicates"""
+    with get_db_connection() as conn:
+        conn.execute("""
+            INSERT OR IGNORE INTO tweets
+            (tweet_id, keyword, user_screen_name, text, sentiment, location,
+             latitude, longitude, tweet_created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            tweet_data.get('id'),
+            tweet_data.get('keyword'),
+            tweet_data.get('user_screen_name'),
+            tweet_data.get('text'),
+            tweet_data.get('sentiment'),
+            tweet_data.get('location'),
+            tweet_data.get('latitude'),
+            tweet_data.get('longitude'),
+            tweet_data.get('created_at')
+        ))
+        conn.commit()
+
+
 def save_tweet(tweet_data: Dict[str, Any]) -> bool:
     """Save a tweet to the database"""
     try:
-        with get_db_connection() as conn:
-            conn.execute("""
-                INSERT OR IGNORE INTO tweets 
-                (tweet_id, keyword, user_screen_name, text, sentiment, location, 
-                 latitude, longitude, tweet_created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                tweet_data.get('id'),
-                tweet_data.get('keyword'),
-                tweet_data.get('user_screen_name'),
-                tweet_data.get('text'),
-                tweet_data.get('sentiment'),
-                tweet_data.get('location'),
-                tweet_data.get('latitude'),
-                tweet_data.get('longitude'),
-                tweet_data.get('created_at')
-            ))
-            conn.commit()
-            return True
+        _insert_tweet(tweet_data)
+        return True
     except Exception as e:
         logger.error(f"Error saving tweet: {e}")
         return False
 
 
-def save_tweet_metrics(keyword: str, count: int, window_start: datetime, 
-                      window_end: datetime, z_score: float = None, 
-                      ewma_value: float = None, is_anomaly: bool = False) -> int:
+@retry_on_locked
+def _insert_tweets(records: List[Dict[str, Any]]) -> List[str]:
+    """Insert a page of tweets in one transaction and return the new tweet ids"""
+    ids = [record.get('id') for record in records]
+    with get_db_connection() as conn:
+        # Take the write lock up front so the duplicate check and the
+        # insert see the same table state
+        conn.execute("BEGIN IMMEDIATE")
+        placeholders = ",".join("?" * len(ids))
+        cursor = conn.execute(
+            f"SELECT tweet_id FROM tweets WHERE tweet_id IN ({placeholders})", ids
+        )
+        seen = {row['tweet_id'] for row in cursor.fetchall()}
+
+        new_ids = []
+        rows = []
+        for record in records:
+            tweet_id = record.get('id')
+            if tweet_id in seen:
+                continue
+            seen.add(tweet_id)
+            new_ids.append(tweet_id)
+            rows.append((
+                tweet_id,
+                record.get('keyword'),
+                record.get('user_screen_name'),
+                record.get('text'),
+                record.get('sentiment'),
+                record.get('location'),
+                record.get('latitude'),
+                record.get('longitude'),
+                record.get('created_at')
+            ))
+
+        conn.executemany("""
+            INSERT OR IGNORE INTO tweets
+            (tweet_id, keyword, user_screen_name, text, sentiment, location,
+             latitude, longitude, tweet_created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+        return new_ids
+
+
+def save_tweets_bulk(records: List[Dict[str, Any]]) -> List[str]:
+    """
+    Save a page of tweets with a single executemany transaction
+
+    Args:
+        records: Tweet records in the same shape accepted by save_tweet
+
+    Returns:
+        Ids of the tweets that were newly inserted, in input order
+    """
+    if not records:
+        return []
+
+    try:
+        return _insert_tweets(records)
+    except Exception as e:
+        logger.error(f"Error saving {len(records)} tweets: {e}")
+        return []
+
+
+@retry_on_locked
+def save_tweet_metrics(keyword: str, count: int, window_start: datetime,
+                       window_end: datetime, z_score: float = None,
+                       ewma_value: float = None, is_anomaly: bool = False,
+                       change_score: float = None) -> int:
     """Save tweet metrics for anomaly detection"""
     with get_db_connection() as conn:
         cursor = conn.execute("""
             INSERT INTO tweet_metrics 
-            (keyword, count, window_start, window_end, z_score, ewma_value, is_anomaly)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (keyword, count, window_start, window_end, z_score, ewma_value, is_anomaly))
+            (keyword, count, window_start, window_end, z_score, ewma_value,
+             is_anomaly, change_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (keyword, count, window_start, window_end, z_score, ewma_value,
+              is_anomaly, change_score))
         conn.commit()
         return cursor.lastrowid
 
 
+def get_keyword_since_ids() -> Dict[str, str]:
+    """Get the newest fetched tweet id for every keyword"""
+    with get_db_connection() as conn:
+        cursor = conn.execute("""
+            SELECT keyword, since_id FROM keyword_state
+            WHERE since_id IS NOT NULL
+        """)
+        return {row['keyword']: row['since_id'] for row in cursor.fetchall()}
+
+
+@retry_on_locked
+def save_keyword_since_id(keyword: str, since_id: str):
+    """Record the newest fetched tweet id for a keyword"""
+    with get_db_connection() as conn:
+        conn.execute("""
+            INSERT INTO keyword_state (keyword, since_id, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(keyword) DO UPDATE SET
+                since_id = excluded.since_id,
+                updated_at = excluded.updated_at
+        """, (keyword, since_id))
+        conn.commit()
+
+
+def _coordinates(row: sqlite3.Row) -> Optional[Tuple[float, float]]:
+    """Coordinates of a geocode_cache row, or None for a cached miss"""
+    if row['latitude'] is None or row['longitude'] is None:
+        return None
+    return (row['latitude'], row['longitude'])
+
+
+def get_geocode_cache_entry(
+        location_key: str) -> Tuple[bool, Optional[Tuple[float, float]], float]:
+    """
+    Look up an unexpired geocoding result
+
+    Args:
+        location_key: Normalized location string
+
+    Returns:
+        Tuple of (found, coordinates or None for a cached miss,
+        expiry as a Unix timestamp)
+    """
+    with get_db_connection() as conn:
+        row = conn.execute("""
+            SELECT latitude, longitude,
+                   CAST(strftime('%s', expires_at) AS INTEGER) AS expires
+            FROM geocode_cache
+            WHERE location_key = ? AND expires_at > datetime('now')
+        """, (location_key,)).fetchone()
+
+    if row is None:
+        return False, None, 0.0
+    return True, _coordinates(row), float(row['expires'])
+
+
+def load_geocode_cache() -> Dict[str, Tuple[Optional[Tuple[float, float]], float]]:
+    """
+    Load every unexpired geocoding result, for warming an in-memory cache
+
+    Returns:
+        Dictionary of location key -> (coordinates or None, expiry as a Unix timestamp)
+    """
+    with get_db_connection() as conn:
+        cursor = conn.execute("""
+            SELECT location_key, latitude, longitude,
+                   CAST(strftime('%s', expires_at) AS INTEGER) AS expires
+            FROM geocode_cache
+            WHERE expires_at > datetime('now')
+        """)
+        return {row['location_key']: (_coordinates(row), float(row['expires']))
+                for row in cursor.fetchall()}
+
+
+@retry_on_locked
+def save_geocode_cache_entry(location_key: str,
+                             coordinates: Optional[Tuple[float, float]],
+                             ttl_seconds: int):
+    """
+    Store a geocoding result
+
+    Args:
+        location_key: Normalized location string
+        coordinates: (latitude, longitude), or None when the location was not found
+        ttl_seconds: How long the result stays valid
+    """
+    latitude, longitude = coordinates if coordinates else (None, None)
+    with get_db_connection() as conn:
+        conn.execute("""
+            INSERT INTO geocode_cache
+                (location_key, latitude, longitude, created_at, expires_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP, datetime('now', ?))
+            ON CONFLICT(location_key) DO UPDATE SET
+                latitude = excluded.latitude,
+                longitude = excluded.longitude,
+                created_at = excluded.created_at,
+                expires_at = excluded.expires_at
+        """, (location_key, latitude, longitude, f"+{int(ttl_seconds)} seconds"))
+        conn.commit()
+
+
 def get_recent_alerts(limit: int = 10) -> List[Dict]:
     """Get recent alerts from the database"""
     with get_db_connection() as conn:
@@ -191,58 +622,192 @@ def get_tweet_metrics_history(keyword: str, hours: int = 24) -> List[Dict]:
     with get_db_connection() as conn:
         cursor = conn.execute("""
             SELECT * FROM tweet_metrics 
-            WHERE keyword = ? AND created_at > datetime('now', '-{} hours')
+            WHERE keyword = ? AND created_at > datetime('now', ?)
             ORDER BY created_at DESC
-        """.format(hours), (keyword,))
+        """, (keyword, f'-{int(hours)} hours'))
         return [dict(row) for row in cursor.fetchall()]
 
 
+def get_tweet_metrics_histories(keywords: List[str], hours: int = 24,
+                                limit: int = None) -> Dict[str, List[Dict]]:
+    """
+    Get the tweet metrics history of many keywords in one query
+
+    Each keyword's newest rows are read with an index seek bounded by limit,
+    so the cost follows keywords x limit rather than every row in the window.
+
+    Args:
+        keywords: Keywords to load
+        hours: How far back to look
+        limit: Keep only the newest rows per keyword (all rows when None)
+
+    Returns:
+        Dictionary of keyword -> metrics rows, newest first (keywords without
+        rows are omitted)
+    """
+    histories: Dict[str, List[Dict]] = {}
+    if not keywords:
+        return histories
+
+    with get_db_connection() as conn:
+        cursor = conn.execute("""
+            SELECT m.* FROM json_each(?) AS k
+            JOIN tweet_metrics AS m ON m.id IN (
+                SELECT id FROM tweet_metrics
+                WHERE keyword = k.value AND created_at > datetime('now', ?)
+                ORDER BY created_at DESC
+                LIMIT ?
+            )
+            ORDER BY k.key, m.created_at DESC
+        """, (json.dumps(list(dict.fromkeys(keywords))), f'-{int(hours)} hours',
+              limit if limit is not None else -1))
+        for row in cursor:
+            histories.setdefault(row['keyword'], []).append(dict(row))
+    return histories
+
+
+@retry_on_locked
+def _insert_log(level: str, module: str, message: str, extra_data: Dict = None):
+    """Insert a single system log row"""
+    with get_db_connection() as conn:
+        conn.execute("""
+            INSERT INTO system_logs (level, module, message, extra_data)
+            VALUES (?, ?, ?, ?)
+        """, (
+            level,
+            module,
+            message,
+            json.dumps(extra_data) if extra_data else None
+        ))
+        conn.commit()
+
+
 def log_to_database(level: str, module: str, message: str, extra_data: Dict = None):
     """Log messages to the database"""
     try:
-        with get_db_connection() as conn:
-            conn.execute("""
-                INSERT INTO system_logs (level, module, message, extra_data)
-                VALUES (?, ?, ?, ?)
-            """, (
-                level, 
-                module, 
-                message, 
-                json.dumps(extra_data) if extra_data else None
-            ))
-            conn.commit()
+        _insert_log(level, module, message, extra_data)
     except Exception as e:
         logger.error(f"Error logging to database: {e}")
 
 
-def get_system_stats() -> Dict[str, Any]:
-    """Get system statistics"""
-    with get_db_connection() as conn:
-        stats = {}
-        
-        # Total alerts
-        cursor = conn.execute("SELECT COUNT(*) as count FROM alerts")
-        stats['total_alerts'] = cursor.fetchone()['count']
-        
-        # Total tweets
-        cursor = conn.execute("SELECT COUNT(*) as count FROM tweets")
-        stats['total_tweets'] = cursor.fetchone()['count']
+@retry_on_locked
+def save_system_logs(entries: List[Tuple[str, str, str, Optional[Dict]]]) -> int:
+    """
+    Write a batch of log entries to system_logs in one transaction
+
+    Unlike log_to_database, failures are raised rather than logged so the
+    logging handler that calls this cannot recurse into itself.
+
+    Args:
+        entries: (level, module, message, extra_data) tuples
         
-        # Alerts in last 24 hours
+    Returns:
+        Number of rows written
+    """
+    rows = [
+        (level, module, message,
+         json.dumps(extra_data, default=str) if extra_data else None)
+        for level, module, message, extra_data in entries
+    ]
+    with get_db_connection() as conn:
+        conn.executemany("""
+            INSERT INTO system_logs (level, module, message, extra_data)
+            VALUES (?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+    return len(rows)
+
+
+def _rollup_total(conn: sqlite3.Connection, kind: str, hours: int) -> int:
+    """
+    Sum one kind's rollups over the trailing hours, accurate to a minute
+
+    Whole hours inside the window are read from hourly buckets and only the
+    partial hours at either end from minute buckets, so a 24 hour window
+    reads about 23 hourly and at most 120 minute rows per keyword instead
+    of 1440.
+    """
+    now = datetime.utcnow()
+    start = now - timedelta(hours=hours)
+    current_hour = now.replace(minute=0, second=0, microsecond=0)
+    first_hour = start.replace(minute=0, second=0, microsecond=0)
+    if first_hour < start:
+        first_hour += timedelta(hours=1)
+    first_hour = min(first_hour, current_hour)
+
+    cursor = conn.execute("""
+        SELECT COALESCE(SUM(count), 0) as count FROM volume_rollups
+        WHERE (kind = :kind AND granularity = 'minute'
+               AND bucket > :start AND bucket < :first_hour)
+           OR (kind = :kind AND granularity = 'hour'
+               AND bucket >= :first_hour AND bucket < :current_hour)
+           OR (kind = :kind AND granularity = 'minute' AND bucket >= :current_hour)
+    """, {
+        'kind': kind,
+        'start': start.strftime('%Y-%m-%d %H:%M:%S'),
+        'first_hour': first_hour.strftime('%Y-%m-%d %H:%M:%S'),
+        'current_hour': current_hour.strftime('%Y-%m-%d %H:%M:%S'),
+    })
+    return cursor.fetchone()['count']
+
+
+def get_stat_counters() -> Dict[str, int]:
+    """Get the running row totals maintained by the rollup triggers"""
+    with get_db_connection() as conn:
         cursor = conn.execute("""
-            SELECT COUNT(*) as count FROM alerts 
-            WHERE created_at > datetime('now', '-24 hours')
+            SELECT name, value FROM stat_counters
+            WHERE name IN ('total_alerts', 'total_tweets')
         """)
-        stats['alerts_24h'] = cursor.fetchone()['count']
+        counters = {'total_alerts': 0, 'total_tweets': 0}
+        counters.update((row['name'], row['value']) for row in cursor.fetchall())
+        return counters
+
+
+def get_volume_series(granularity: str = 'hour', hours: int = 24, keyword: str = None,
+                      kind: str = 'tweets') -> List[Dict]:
+    """
+    Get per-keyword volume over time from the rollup tables
+
+    Args:
+        granularity: Bucket size: 'minute', 'hour' or 'day'
+        hours: How far back to read
+        keyword: Only this keyword (all keywords if None)
+        kind: 'tweets' or 'alerts'
         
-        # Tweets in last hour
-        cursor = conn.execute("""
-            SELECT COUNT(*) as count FROM tweets 
-            WHERE created_at > datetime('now', '-1 hour')
-        """)
-        stats['tweets_1h'] = cursor.fetchone()['count']
+    Returns:
+        Rows with bucket, keyword and count, oldest bucket first
+    """
+    if granularity not in ROLLUP_FORMATS:
+        raise ValueError(f"Unknown granularity '{granularity}', "
+                         f"expected one of {list(ROLLUP_FORMATS)}")
+    if kind not in ROLLUP_SOURCES:
+        raise ValueError(f"Unknown rollup kind '{kind}', "
+                         f"expected one of {list(ROLLUP_SOURCES)}")
         
-        return stats
+    # Start from the bucket containing the cutoff so the first bucket is not dropped
+    query = """
+        SELECT bucket, keyword, count FROM volume_rollups
+        WHERE kind = ? AND granularity = ? AND bucket >= strftime(?, 'now', ?)
+    """
+    params = [kind, granularity, ROLLUP_FORMATS[granularity], f'-{int(hours)} hours']
+    if keyword is not None:
+        query += " AND keyword = ?"
+        params.append(keyword)
+    query += " ORDER BY bucket, keyword"
+
+    with get_db_connection() as conn:
+        cursor = conn.execute(query, params)
+        return [dict(row) for row in cursor.fetchall()]
+
+
+def get_system_stats() -> Dict[str, Any]:
+    """Get system statistics from the trigger-maintained counters and rollups"""
+    stats = get_stat_counters()
+    with get_db_connection() as conn:
+        # Minute buckets, so the windows are accurate to a minute
+        stats['alerts_24h'] = _rollup_total(conn, 'alerts', 24)
+        stats['tweets_1h'] = _rollup_total(conn, 'tweets', 1)
+    return stats
 
 
 if __name__ == "__main__":
@@ -0,0 +1,236 @@
+"""
+Offline gazetteer - resolve place names to coordinates without network calls
+
+Loads a GeoNames-style TSV into a compact index: place attributes live in
+parallel arrays, and every name and alias maps to place ids through a
+marisa-trie RecordTrie (or a plain dict when marisa-trie is not installed).
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bisect
+import csv
+import logging
+import threading
+import unicodedata
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.config import GAZETTEER_PATH
+
+try:
+    import marisa_trie
+except ImportError:  # Optional: falls back to a dict index
+    marisa_trie = None
+
+logger = logging.getLogger(__name__)
+
+# Aliases shorter than this ("LA", "NY") are too ambiguous to index
+MIN_ALIAS_LENGTH = 3
+
+# Column layout of GeoNames dumps such as cities15000.txt (no header row)
+GEONAMES_COLUMNS = 19
+GEONAMES_FIELDS = {
+    'name': 1, 'asciiname': 2, 'alternate_names': 3, 'latitude': 4, 'longitude': 5,
+    'feature_code': 7, 'country_code': 8, 'population': 14,
+}
+
+
+def normalize_name(name: str) -> str:
+    """Lookup key for a place name: accents stripped, case-folded, spaces collapsed"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    name = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(name.casefold().split()).strip(" .,;:!?'\"#@")
+
+
+def _read_rows(path: str) -> Iterable[Dict[str, str]]:
+    """
+    Read gazetteer rows from a GeoNames dump or a TSV with a header row
+
+    The header format needs name, latitude and longitude columns, and may have
+    alternate_names (comma separated), country_code, feature_code and population.
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        reader = csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE)
+        header = None
+
+        for row in reader:
+            if not row or row[0].startswith('#'):
+                continue
+
+            if header is None and len(row) != GEONAMES_COLUMNS:
+                header = row
+                continue
+
+            if header is not None:
+                yield dict(zip(header, row))
+            else:
+                fields = {field: row[index] for field, index in GEONAMES_FIELDS.items()}
+                fields['alternate_names'] = ",".join(
+                    filter(None, [fields.pop('asciiname'), fields['alternate_names']]))
+                yield fields
+
+
+class Gazetteer:
+    """In-memory place name index with population-ranked disambiguation"""
+
+    def __init__(self, places: Iterable[Dict[str, Any]]):
+        """
+        Build the index
+
+        Args:
+            places: Dictionaries with name, latitude, longitude and optionally
+                alternate_names (list or comma separated string), country_code,
+                feature_code and population
+        """
+        self.names: List[str] = []
+        self.country_codes: List[str] = []
+        self.feature_codes: List[str] = []
+        self.latitudes = array('d')
+        self.longitudes = array('d')
+        self.populations = array('q')
+
+        keys: Dict[str, set] = {}
+
+        for place in places:
+            place_id = len(self.names)
+            self.names.append(place['name'])
+            self.country_codes.append(place.get('country_code') or '')
+            self.feature_codes.append(place.get('feature_code') or '')
+            self.latitudes.append(float(place['latitude']))
+            self.longitudes.append(float(place['longitude']))
+            self.populations.append(int(place.get('population') or 0))
+
+            aliases = place.get('alternate_names') or []
+            if isinstance(aliases, str):
+                aliases = aliases.split(',')
+
+            keys.setdefault(normalize_name(place['name']), set()).add(place_id)
+            for alias in aliases:
+                key = normalize_name(alias)
+                if len(key) >= MIN_ALIAS_LENGTH:
+                    keys.setdefault(key, set()).add(place_id)
+
+        # Most populous first, so lookup() is a single index
+        ranked = {key: tuple(sorted(ids, key=lambda i: -self.populations[i]))
+                  for key, ids in keys.items() if key}
+
+        if marisa_trie is not None:
+            self._trie = marisa_trie.RecordTrie('<I', (
+                (key, (place_id,)) for key, ids in ranked.items() for place_id in ids
+            ))
+            self._index = None
+            self._sorted_keys = None
+        else:
+            self._trie = None
+            self._index = ranked
+            self._sorted_keys = sorted(ranked)
+
+    @classmethod
+    def load(cls, path: str = None) -> 'Gazetteer':
+        """
+        Load a gazetteer file
+
+        Args:
+            path: GeoNames dump or headered TSV (defaults to GAZETTEER_PATH)
+        """
+        path = path or GAZETTEER_PATH
+        gazetteer = cls(_read_rows(path))
+        logger.info(f"Loaded {len(gazetteer)} places from gazetteer {path}")
+        return gazetteer
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return bool(self._place_ids(normalize_name(name)))
+
+    def _place_ids(self, key: str) -> Tuple[int, ...]:
+        """Place ids for a normalized key, most populous first"""
+        if self._trie is not None:
+            if key not in self._trie:
+                return ()
+            ids = [record[0] for record in self._trie[key]]
+            return tuple(sorted(ids, key=lambda i: -self.populations[i]))
+        return self._index.get(key, ())
+
+    def _place(self, place_id: int) -> Dict[str, Any]:
+        return {
+            'name': self.names[place_id],
+            'latitude': self.latitudes[place_id],
+            'longitude': self.longitudes[place_id],
+            'country_code': self.country_codes[place_id],
+            'feature_code': self.feature_codes[place_id],
+            'population': self.populations[place_id],
+        }
+
+    def candidates(self, name: str) -> List[Dict[str, Any]]:
+        """All places a name or alias can refer to, most populous first"""
+        place_ids = self._place_ids(normalize_name(name))
+        return [self._place(place_id) for place_id in place_ids]
+
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """Most populous place with this name or alias, or None"""
+        ids = self._place_ids(normalize_name(name))
+        return self._place(ids[0]) if ids else None
+
+    def geocode(self, name: str) -> Optional[Tuple[float, float]]:
+        """(latitude, longitude) of the most populous matching place, or None"""
+        ids = self._place_ids(normalize_name(name))
+        if not ids:
+            return None
+        return (self.latitudes[ids[0]], self.longitudes[ids[0]])
+
+    def keys(self) -> List[str]:
+        """Every indexed (normalized) name and alias"""
+        if self._trie is not None:
+            return self._trie.keys()
+        return list(self._sorted_keys)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Indexed names starting with a prefix, most populous place first
+
+        Args:
+            prefix: Beginning of a place name
+            limit: Maximum number of names to return
+        """
+        prefix = normalize_name(prefix)
+
+        if self._trie is not None:
+            keys = set(self._trie.keys(prefix))
+        else:
+            start = bisect.bisect_left(self._sorted_keys, prefix)
+            keys = set()
+            for key in self._sorted_keys[start:]:
+                if not key.startswith(prefix):
+                    break
+                keys.add(key)
+
+        ranked = sorted(
+            keys, key=lambda key: (-self.populations[self._place_ids(key)[0]], key))
+        return ranked[:limit]
+
+
+# Global instance, loaded on first use
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_loaded = False
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """Get the shared gazetteer, or None if GAZETTEER_PATH cannot be loaded"""
+    global _gazetteer, _gazetteer_loaded
+
+    if not _gazetteer_loaded:
+        with _gazetteer_lock:
+            if not _gazetteer_loaded:
+                try:
+                    _gazetteer = Gazetteer.load()
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning("Offline gazetteer unavailable, "
+                                   f"geocoding online only: {e}")
+                _gazetteer_loaded = True
+
+    return _gazetteer
@@ -1,29 +1,238 @@
-import spacy
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import re
-from typing import Dict, List, Tuple, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple, Optional
 import logging
 import requests
-from functools import lru_cache
 import time
+import threading
+
+from core.database import (
+    get_geocode_cache_entry, load_geocode_cache, save_geocode_cache_entry
+)
+from core.gazetteer import get_gazetteer, normalize_name
+from core.ner_pool import NERWorkerPool
+from core.place_matcher import get_place_matcher
+from utils.config import (
+    LOCATION_EXTRACTION_MODE, NER_PROCESS_POOL, NER_WARMUP, NER_WORKERS
+)
+from utils.logging_config import metrics
+from utils.rate_limiter import MAX_WAIT, TokenBucket, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
-# Load spaCy model for NER
-try:
-    nlp = spacy.load("en_core_web_sm")
-    logger.info("SpaCy model loaded successfully")
-except OSError:
-    logger.error("SpaCy model 'en_core_web_sm' not found. Install with: python -m spacy download en_core_web_sm")
-    nlp = None
+# Tweets per nlp.pipe batch
+NER_BATCH_SIZE = 64
+
+# Location extraction modes: spaCy NER, gazetteer place matching, or both
+EXTRACTION_MODES = ('ner', 'gazetteer', 'hybrid')
+
+# How long geocoding results stay cached
+GEOCODE_POSITIVE_TTL = 30 * 24 * 3600  # Places don't move
+GEOCODE_NEGATIVE_TTL = 24 * 3600       # Nominatim's data does improve
+GEOCODE_ERROR_TTL = 300                # Failed requests are retried soon, not persisted
+
+# Geocoding results kept in memory per extractor; the rest stay in the database
+GEOCODE_MEMORY_CACHE_SIZE = 10000
+
+# spaCy model for NER, loaded on first use (importing spaCy and loading the
+# model take seconds, and gazetteer mode never needs either)
+SPACY_MODEL = "en_core_web_sm"
+
+_nlp = None
+_nlp_loaded = False
+_nlp_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
+
+
+def get_nlp():
+    """
+    Get the spaCy model, loading it on first use
+
+    Callers block while another thread (e.g. the warm-up) is loading it.
+
+    Returns:
+        The loaded pipeline, or None if the model is not installed
+    """
+    global _nlp, _nlp_loaded
+
+    if not _nlp_loaded:
+        with _nlp_lock:
+            if not _nlp_loaded:
+                start_time = time.time()
+                try:
+                    import spacy
+                    _nlp = spacy.load(SPACY_MODEL)
+                    logger.info(f"SpaCy model loaded in "
+                                f"{time.time() - start_time:.2f}s")
+                except (ImportError, OSError):
+                    logger.error(f"SpaCy model '{SPACY_MODEL}' not found. Install "
+                                 f"with: python -m spacy download {SPACY_MODEL}")
+                _nlp_loaded = True
+
+    return _nlp
+
+
+def is_model_ready() -> bool:
+    """
+    Whether the spaCy model is loaded (by the NER workers, if used) and NER
+    can run without waiting
+    """
+    if location_extractor.ner_pool is not None:
+        return location_extractor.ner_pool.ready
+    return _nlp_loaded and _nlp is not None
+
+
+def start_model_warmup() -> Optional[threading.Thread]:
+    """
+    Load the spaCy model in a background thread
+
+    Returns:
+        The warm-up thread, or None if the model is already loaded or loading
+    """
+    global _warmup_thread
+
+    if _nlp_loaded or (_warmup_thread is not None and _warmup_thread.is_alive()):
+        return None
+
+    _warmup_thread = threading.Thread(target=get_nlp, name='spacy-warmup', daemon=True)
+    _warmup_thread.start()
+    return _warmup_thread
+
+
+def _ner_disabled_components(model) -> List[str]:
+    """
+    Pipeline components that doc.ents does not need
+
+    Keeps the NER component and any shared tok2vec/transformer it listens to,
+    so the tagger, parser, lemmatizer and the like are skipped.
+    """
+    if 'ner' not in model.pipe_names:
+        return []
+
+    keep = {'ner'}
+    ner_model = getattr(model.get_pipe('ner'), 'model', None)
+    if ner_model is not None:
+        for node in ner_model.walk():
+            upstream = getattr(node, 'upstream_name', None)
+            if upstream == '*':
+                keep.update(name for name in model.pipe_names
+                            if model.get_pipe_meta(name).factory
+                            in ('tok2vec', 'transformer'))
+            elif upstream:
+                keep.add(upstream)
+
+    return [name for name in model.pipe_names if name not in keep]
+
+
+def normalize_location(location: str) -> str:
+    """Cache key for a location string (same normalization as the gazetteer)"""
+    return normalize_name(location)
+
+
+class ExpiringLRUCache:
+    """Thread-safe LRU cache whose entries also expire at a given time"""
+
+    def __init__(self, max_size: int):
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Entries kept before the least recently used is evicted
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()  # Key -> (value, expiry)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Look up an unexpired entry, dropping it if it has expired
+
+        Returns:
+            Tuple of (value, expiry as a Unix timestamp), or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, value: Any, expires: float):
+        """Store a value until the given Unix timestamp"""
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
 
 
 class LocationExtractor:
     """Extract and geocode locations from tweet text"""
     
-    def __init__(self):
-        self.geocoding_cache = {}
-        self.rate_limit_delay = 1  # Delay between geocoding requests
-        self.last_request_time = 0
+    def __init__(self, positive_ttl: int = GEOCODE_POSITIVE_TTL,
+                 negative_ttl: int = GEOCODE_NEGATIVE_TTL, mode: str = None,
+                 ner_workers: Optional[int] = None,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 memory_cache_size: int = GEOCODE_MEMORY_CACHE_SIZE):
+        """
+        Initialize location extractor
+
+        Args:
+            positive_ttl: Seconds a found location stays cached
+            negative_ttl: Seconds a location Nominatim could not find stays cached
+            mode: One of EXTRACTION_MODES (defaults to LOCATION_EXTRACTION_MODE)
+            ner_workers: Worker processes running NER (0 runs it in the calling
+                thread; defaults to NER_WORKERS if NER_PROCESS_POOL is set, else 0)
+            rate_limiter: Budget for Nominatim requests (defaults to the shared one)
+            memory_cache_size: Geocoding results kept in memory
+        """
+        self.mode = mode or LOCATION_EXTRACTION_MODE
+        if self.mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown location extraction mode '{self.mode}', "
+                             f"expected one of {EXTRACTION_MODES}")
+
+        # Location key -> coordinates or None, for the most recently used
+        # locations; backed by the geocode_cache table shared with other processes
+        self.geocoding_cache = ExpiringLRUCache(memory_cache_size)
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        # Shared with every thread and extractor, since keyword fetches
+        # geocode concurrently
+        self.rate_limiter = rate_limiter or get_rate_limiter('nominatim')
+        
+        if ner_workers is None:
+            ner_workers = NER_WORKERS if NER_PROCESS_POOL else 0
+        self.ner_pool = NERWorkerPool(SPACY_MODEL, ner_workers) if ner_workers else None
+
+    def warm_geocode_cache(self) -> int:
+        """
+        Load unexpired geocoding results from the database into memory
+
+        Returns:
+            Number of cached locations loaded
+        """
+        try:
+            cached = load_geocode_cache()
+        except Exception as e:
+            logger.error(f"Error loading geocode cache: {e}")
+            cached = {}
+
+        # Longest-lived last, so they are the ones kept if there are too many
+        by_expiry = sorted(cached.items(), key=lambda item: item[1][1])
+        for key, (coordinates, expires) in by_expiry:
+            self.geocoding_cache.put(key, coordinates, expires)
+        return len(self.geocoding_cache)
         
     def extract_locations_from_text(self, text: str) -> List[str]:
         """
@@ -35,34 +244,91 @@ class LocationExtractor:
         Returns:
             List of location strings found in the text
         """
+        return self.extract_locations_batch([text])[0]
+
+    def extract_locations_batch(self, texts: List[str],
+                                batch_size: int = NER_BATCH_SIZE) -> List[List[str]]:
+        """
+        Extract location entities from many texts
+
+        In 'ner' mode texts are streamed through nlp.pipe; in 'gazetteer' mode
+        known place names are matched in one pass per text; 'hybrid' returns
+        the gazetteer matches followed by any other places NER found.
+
+        Args:
+            texts: Tweet texts to analyze
+            batch_size: Number of texts per nlp.pipe batch
+
+        Returns:
+            List of location string lists, one per text, in input order
+        """
+        matcher = get_place_matcher() if self.mode != 'ner' else None
+        if matcher is None:
+            return self._extract_locations_ner(texts, batch_size)
+
+        matched = [matcher.extract(text) for text in texts]
+        if self.mode == 'gazetteer' or (self.ner_pool is None and not get_nlp()):
+            return matched
+
+        # Hybrid: NER adds places the gazetteer does not know
+        combined = []
+        ner_locations = self._extract_locations_ner(texts, batch_size)
+        for places, entities in zip(matched, ner_locations):
+            seen = {place.lower() for place in places}
+            combined.append(places + [entity for entity in entities
+                                      if entity.lower() not in seen])
+        return combined
+
+    def _extract_locations_ner(self, texts: List[str],
+                               batch_size: int) -> List[List[str]]:
+        """
+        Extract location entities with spaCy, streamed through nlp.pipe
+
+        Only the NER component runs, which is all doc.ents needs. With a
+        worker pool the texts are split across its processes instead.
+        """
+        if self.ner_pool is not None:
+            try:
+                return self.ner_pool.extract(texts, batch_size)
+            except Exception as e:
+                logger.error(f"NER worker pool failed, extracting in-process: {e}")
+
+        nlp = get_nlp()
         if not nlp:
-            return self._extract_locations_regex(text)
+            return [self._extract_locations_regex(text) for text in texts]
             
         try:
-            doc = nlp(text)
-            locations = []
-            
-            # Extract named entities of type GPE (Geopolitical entity), LOC (Location)
-            for ent in doc.ents:
-                if ent.label_ in ["GPE", "LOC"]:
-                    location = ent.text.strip()
-                    if len(location) > 2:  # Filter out very short matches
-                        locations.append(location)
-                        
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_locations = []
-            for loc in locations:
-                if loc.lower() not in seen:
-                    seen.add(loc.lower())
-                    unique_locations.append(loc)
-                    
-            logger.debug(f"Extracted locations from '{text[:50]}...': {unique_locations}")
-            return unique_locations
+            docs = nlp.pipe(texts, batch_size=batch_size,
+                            disable=_ner_disabled_components(nlp))
+            return [self._locations_from_doc(doc) for doc in docs]
             
         except Exception as e:
             logger.error(f"Error in NER location extraction: {e}")
-            return self._extract_locations_regex(text)
+            return [self._extract_locations_regex(text) for text in texts]
+
+    @staticmethod
+    def _locations_from_doc(doc) -> List[str]:
+        """Location entities of a processed doc, without duplicates"""
+        locations = []
+
+        # Extract named entities of type GPE (Geopolitical entity), LOC (Location)
+        for ent in doc.ents:
+            if ent.label_ in ["GPE", "LOC"]:
+                location = ent.text.strip()
+                if len(location) > 2:  # Filter out very short matches
+                    locations.append(location)
+
+        # Remove duplicates while preserving order
+        seen = set()
+        unique_locations = []
+        for loc in locations:
+            if loc.lower() not in seen:
+                seen.add(loc.lower())
+                unique_locations.append(loc)
+
+        logger.debug(f"Extracted locations from '{doc.text[:50]}...': "
+                     f"{unique_locations}")
+        return unique_locations
     
     def _extract_locations_regex(self, text: str) -> List[str]:
         """
@@ -96,24 +362,40 @@ class LocationExtractor:
         
         return list(set(locations))  # Remove duplicates
     
-    @lru_cache(maxsize=1000)
     def geocode_location(self, location: str) -> Optional[Tuple[float, float]]:
         """
         Get latitude and longitude for a location string
         
+        Checks the offline gazetteer, then the in-memory cache, then the shared
+        database cache, and only then asks Nominatim.
+
         Args:
             location: Location name to geocode
             
         Returns:
             Tuple of (latitude, longitude) or None if not found
         """
-        if location in self.geocoding_cache:
-            return self.geocoding_cache[location]
+        coordinates = self.geocode_offline(location)
+        if coordinates:
+            return coordinates
+
+        key = normalize_location(location)
+
+        cached = self.geocoding_cache.get(key)
+        if cached is not None:
+            metrics.increment('geocode_cache_hits')
+            return cached[0]
             
-        # Rate limiting
-        current_time = time.time()
-        if current_time - self.last_request_time < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay)
+        try:
+            found, coordinates, expires = get_geocode_cache_entry(key)
+            if found:
+                self.geocoding_cache.put(key, coordinates, expires)
+                metrics.increment('geocode_cache_hits')
+                return coordinates
+        except Exception as e:
+            logger.error(f"Error reading geocode cache for '{location}': {e}")
+            
+        metrics.increment('geocode_cache_misses')
         
         try:
             # Using OpenStreetMap Nominatim API (free)
@@ -128,27 +410,65 @@ class LocationExtractor:
                 'User-Agent': 'CrowdSense-DisasterAlert/1.0'
             }
             
+            if not self.rate_limiter.acquire(timeout=MAX_WAIT):
+                logger.warning("Nominatim budget exhausted, "
+                               f"not geocoding '{location}' for now")
+                return None
+
             response = requests.get(url, params=params, headers=headers, timeout=5)
-            self.last_request_time = time.time()
+            self.rate_limiter.update_from_headers(response.headers,
+                                                  response.status_code)
+            metrics.increment('geocoding_requests')
             
             if response.status_code == 200:
                 data = response.json()
+                coordinates = None
                 if data:
-                    lat = float(data[0]['lat'])
-                    lon = float(data[0]['lon'])
-                    coordinates = (lat, lon)
-                    
-                    # Cache the result
-                    self.geocoding_cache[location] = coordinates
+                    coordinates = (float(data[0]['lat']), float(data[0]['lon']))
                     logger.debug(f"Geocoded {location} -> {coordinates}")
-                    return coordinates
+
+                # Cache the result, including "not found" to avoid repeated requests
+                self._cache_result(key, coordinates)
+                return coordinates
+
+            logger.warning(f"Nominatim returned status {response.status_code} "
+                           f"for '{location}'")
                     
         except Exception as e:
             logger.error(f"Error geocoding location '{location}': {e}")
             
-        # Cache negative results to avoid repeated requests
-        self.geocoding_cache[location] = None
+        # Back off briefly from locations that failed, without persisting the failure
+        self.geocoding_cache.put(key, None, time.time() + GEOCODE_ERROR_TTL)
         return None
+
+    def geocode_offline(self, location: str) -> Optional[Tuple[float, float]]:
+        """
+        Resolve a location from the local gazetteer, without any network call
+
+        Args:
+            location: Location name to geocode
+
+        Returns:
+            Coordinates of the most populous place with that name, or None
+        """
+        gazetteer = get_gazetteer()
+        if gazetteer is None:
+            return None
+
+        coordinates = gazetteer.geocode(location)
+        if coordinates:
+            metrics.increment('gazetteer_hits')
+        return coordinates
+
+    def _cache_result(self, key: str, coordinates: Optional[Tuple[float, float]]):
+        """Cache a Nominatim answer in memory and in the shared database cache"""
+        ttl = self.positive_ttl if coordinates else self.negative_ttl
+        self.geocoding_cache.put(key, coordinates, time.time() + ttl)
+
+        try:
+            save_geocode_cache_entry(key, coordinates, ttl)
+        except Exception as e:
+            logger.error(f"Error saving geocode cache entry for '{key}': {e}")
     
     def extract_and_geocode(self, text: str) -> Dict[str, any]:
         """
@@ -160,8 +480,26 @@ class LocationExtractor:
         Returns:
             Dictionary with location info
         """
-        locations = self.extract_locations_from_text(text)
+        return self._geocode_locations(self.extract_locations_from_text(text))
         
+    def extract_and_geocode_batch(
+            self, texts: List[str],
+            batch_size: int = NER_BATCH_SIZE) -> List[Dict[str, any]]:
+        """
+        Extract and geocode locations for a page of texts with one batched NER pass
+        
+        Args:
+            texts: Tweet texts to analyze
+            batch_size: Number of texts per nlp.pipe batch
+
+        Returns:
+            List of location info dictionaries, one per text, in input order
+        """
+        return [self._geocode_locations(locations)
+                for locations in self.extract_locations_batch(texts, batch_size)]
+
+    def _geocode_locations(self, locations: List[str]) -> Dict[str, any]:
+        """Geocode the most prominent of the extracted locations"""
         result = {
             'locations_found': locations,
             'primary_location': None,
@@ -172,6 +510,17 @@ class LocationExtractor:
         if not locations:
             return result
             
+        # Resolve offline first, in order of prominence, before going online
+        for location in locations:
+            coordinates = self.geocode_offline(location)
+            if coordinates:
+                result.update({
+                    'primary_location': location,
+                    'latitude': coordinates[0],
+                    'longitude': coordinates[1]
+                })
+                return result
+
         # Try to geocode the first (most prominent) location
         primary_location = locations[0]
         coordinates = self.geocode_location(primary_location)
@@ -201,6 +550,33 @@ class LocationExtractor:
 location_extractor = LocationExtractor()
 
 
+def warm_geocode_cache() -> int:
+    """Load the shared geocode cache into the global extractor"""
+    return location_extractor.warm_geocode_cache()
+
+
+def warm_place_matcher():
+    """Build the gazetteer place matcher up front when the extraction mode uses it"""
+    if location_extractor.mode != 'ner':
+        get_place_matcher()
+
+
+def warm_ner_model() -> Optional[threading.Thread]:
+    """
+    Start loading the spaCy model in the background, when enabled and the
+    extraction mode uses it
+    """
+    if not NER_WARMUP or location_extractor.mode == 'gazetteer':
+        return None
+
+    if location_extractor.ner_pool is not None:
+        thread = threading.Thread(target=location_extractor.ner_pool.warm_up,
+                                  name='ner-pool-warmup', daemon=True)
+        thread.start()
+        return thread
+    return start_model_warmup()
+
+
 def extract_location_from_tweet(tweet_text: str) -> Dict[str, any]:
     """
     Convenience function to extract location from tweet text
@@ -214,6 +590,19 @@ def extract_location_from_tweet(tweet_text: str) -> Dict[str, any]:
     return location_extractor.extract_and_geocode(tweet_text)
 
 
+def extract_locations_from_tweets(tweet_texts: List[str]) -> List[Dict[str, any]]:
+    """
+    Convenience function to extract locations from a page of tweet texts
+
+    Args:
+        tweet_texts: The text content of each tweet
+
+    Returns:
+        List of location extraction results, one per tweet
+    """
+    return location_extractor.extract_and_geocode_batch(tweet_texts)
+
+
 def get_sample_locations() -> List[Dict[str, any]]:
     """Get sample location data for testing"""
     return [
@@ -0,0 +1,202 @@
+"""
+NER worker pool - run spaCy location NER in worker processes
+
+Each worker loads the model once, then extracts locations from chunks of
+tweets, so enrichment scales across cores instead of holding the GIL that
+the scheduler shares with the Flask request threads.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tweets sent to a worker per task
+NER_CHUNK_SIZE = 32
+
+# Pool restarts tolerated per extract() call before giving up on a batch
+MAX_RESTARTS = 3
+
+# Seconds warm_up() waits for every worker to load the model
+WARM_UP_TIMEOUT = 120
+
+# Set in each worker by _init_worker
+_worker_nlp = None
+_worker_disabled: List[str] = []
+_worker_barrier = None
+
+
+def _init_worker(model_name: str, barrier=None):
+    """Load the model once per worker process"""
+    global _worker_nlp, _worker_disabled, _worker_barrier
+
+    _worker_barrier = barrier
+
+    from core.location_extraction import _ner_disabled_components
+    try:
+        import spacy
+        _worker_nlp = spacy.load(model_name)
+        _worker_disabled = _ner_disabled_components(_worker_nlp)
+    except (ImportError, OSError) as e:
+        logger.error(f"NER worker could not load spaCy model '{model_name}': {e}")
+
+
+def _worker_ready(timeout: float) -> bool:
+    # Hold this worker until every other one has loaded the model and taken a
+    # warm-up task too, so one fast worker cannot answer for the rest
+    _worker_barrier.wait(timeout)
+    return _worker_nlp is not None
+
+
+def _extract_chunk(texts: List[str], batch_size: int) -> List[List[str]]:
+    """Location entities for a chunk of texts, in order"""
+    from core.location_extraction import LocationExtractor
+
+    if _worker_nlp is None:
+        raise RuntimeError("spaCy model not available in NER worker")
+
+    docs = _worker_nlp.pipe(texts, batch_size=batch_size, disable=_worker_disabled)
+    return [LocationExtractor._locations_from_doc(doc) for doc in docs]
+
+
+class NERWorkerPool:
+    """Process pool extracting location entities, restarted if a worker dies"""
+
+    def __init__(self, model_name: str, workers: Optional[int] = None,
+                 chunk_size: int = NER_CHUNK_SIZE, max_restarts: int = MAX_RESTARTS):
+        """
+        Initialize the worker pool (processes start on first use or warm_up())
+
+        Args:
+            model_name: spaCy model name or path loaded by every worker
+            workers: Number of worker processes (defaults to the number of cores)
+            chunk_size: Texts dispatched to a worker per task
+            max_restarts: Pool restarts tolerated per batch before giving up
+        """
+        self.model_name = model_name
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_restarts = max_restarts
+        self.ready = False
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._barrier = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Forking a process running Flask and scheduler threads is not
+                # safe, so workers are spawned fresh
+                context = multiprocessing.get_context('spawn')
+                self._barrier = context.Barrier(self.workers)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self._barrier)
+                )
+            return self._executor
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        """Replace a broken executor (unless another thread already has)"""
+        with self._lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self.ready = False
+
+    def warm_up(self, timeout: float = WARM_UP_TIMEOUT) -> bool:
+        """
+        Start every worker and wait for all of them to load the model
+
+        Args:
+            timeout: Seconds to wait for the slowest worker
+
+        Returns:
+            Whether every worker loaded the model
+        """
+        executor = self._get_executor()
+        self._barrier.reset()
+        try:
+            futures = [executor.submit(_worker_ready, timeout)
+                       for _ in range(self.workers)]
+            self.ready = all(future.result() for future in futures)
+        except BrokenProcessPool:
+            self._restart(executor)
+            return False
+        except threading.BrokenBarrierError:
+            logger.warning(f"NER workers did not all load the model within {timeout}s")
+            self.ready = False
+            return False
+
+        logger.info(f"NER worker pool started with {self.workers} workers "
+                    f"(ready: {self.ready})")
+        return self.ready
+
+    def extract(self, texts: List[str], batch_size: int) -> List[List[str]]:
+        """
+        Extract location entities for many texts across the workers
+
+        Chunks lost to a crashed worker are resubmitted to a fresh pool.
+
+        Args:
+            texts: Texts to analyze
+            batch_size: nlp.pipe batch size inside each worker
+
+        Returns:
+            List of location string lists, one per text, in input order
+
+        Raises:
+            BrokenProcessPool: If workers keep dying after max_restarts restarts
+        """
+        chunks = [texts[i:i + self.chunk_size]
+                  for i in range(0, len(texts), self.chunk_size)]
+        results: List[Optional[List[List[str]]]] = [None] * len(chunks)
+        pending = list(range(len(chunks)))
+        restarts = 0
+
+        while pending:
+            executor = self._get_executor()
+            try:
+                futures = {
+                    executor.submit(_extract_chunk, chunks[index], batch_size): index
+                    for index in pending
+                }
+            except BrokenProcessPool:
+                futures = {}
+            wait(futures)
+
+            broken = not futures
+            for future, index in futures.items():
+                try:
+                    results[index] = future.result()
+                except BrokenProcessPool:
+                    broken = True
+
+            pending = [index for index in pending if results[index] is None]
+            if broken:
+                restarts += 1
+                self._restart(executor)
+                if restarts > self.max_restarts:
+                    raise BrokenProcessPool(f"NER workers crashed {restarts} times")
+                logger.warning(f"NER worker crashed, resubmitting {len(pending)} "
+                               f"of {len(chunks)} chunks")
+
+        self.ready = True
+        return [locations for chunk in results for locations in chunk]
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+                self.ready = False
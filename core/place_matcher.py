@@ -0,0 +1,237 @@
+"""
+Place matcher - find gazetteer place names in text with an Aho-Corasick automaton
+
+The automaton is built once over every indexed gazetteer name and alias, then
+scans each text in a single linear pass regardless of how many names it knows.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.gazetteer import Gazetteer, MIN_ALIAS_LENGTH, get_gazetteer
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=4096)
+def _fold_char(char: str) -> str:
+    """Fold one character like gazetteer.normalize_name: no accents, case-folded"""
+    if char.isspace():
+        return " "
+    decomposed = unicodedata.normalize('NFKD', char)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def fold_text(text: str) -> Tuple[str, List[int]]:
+    """
+    Normalize text for matching, keeping track of where each character came from
+
+    Returns:
+        Tuple of (folded text with whitespace runs collapsed, original index of
+        each folded character)
+    """
+    folded = []
+    positions = []
+
+    for index, char in enumerate(text):
+        for out in _fold_char(char):
+            if out == " " and folded and folded[-1] == " ":
+                continue
+            folded.append(out)
+            positions.append(index)
+
+    return "".join(folded), positions
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher (Aho-Corasick automaton)"""
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Build the automaton
+
+        Args:
+            patterns: Strings to search for
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Length of the pattern ending at a node, or 0
+        self._length: List[int] = [0]
+        # Nearest node on the failure chain that ends a pattern
+        self._output_link: List[int] = [0]
+
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build_links()
+
+    def __len__(self) -> int:
+        return sum(1 for length in self._length if length)
+
+    def _add(self, pattern: str):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._length.append(0)
+                self._output_link.append(0)
+            node = next_node
+        self._length[node] = len(pattern)
+
+    def _build_links(self):
+        """Breadth-first pass setting failure and output links"""
+        queue = list(self._goto[0].values())
+        head = 0
+
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+
+            for char, child in self._goto[node].items():
+                queue.append(child)
+
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail = self._goto[fallback].get(char, 0)
+                self._fail[child] = fail if fail != child else 0
+
+                fail = self._fail[child]
+                self._output_link[child] = (fail if self._length[fail]
+                                            else self._output_link[fail])
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Find every occurrence of every pattern, overlapping ones included
+
+        Returns:
+            List of (start, end) spans into text, ordered by end
+        """
+        matches = []
+        goto = self._goto
+        fail = self._fail
+        node = 0
+
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match = node if self._length[node] else self._output_link[node]
+            while match:
+                matches.append((index + 1 - self._length[match], index + 1))
+                match = self._output_link[match]
+
+        return matches
+
+
+class PlaceMatcher:
+    """Find gazetteer places mentioned in text"""
+
+    def __init__(self, gazetteer: Gazetteer, require_capitalized: bool = True):
+        """
+        Build the matcher
+
+        Args:
+            gazetteer: Places to match; every name and alias becomes a pattern
+            require_capitalized: Only accept matches whose first letter is
+                capitalized in the text, which keeps place names that are also
+                common words ("Nice", "Mobile") from matching ordinary prose
+        """
+        self.gazetteer = gazetteer
+        self.require_capitalized = require_capitalized
+        self.automaton = AhoCorasick(key for key in gazetteer.keys()
+                                     if len(key) >= MIN_ALIAS_LENGTH)
+
+    def match(self, text: str) -> List[Dict[str, object]]:
+        """
+        Find the places mentioned in text, leftmost-longest and non-overlapping
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            List of dictionaries with start and end (span in text), text (as
+            written), name (canonical gazetteer name), latitude and longitude,
+            in order of appearance
+        """
+        folded, positions = fold_text(text)
+        candidates = []
+
+        for start, end in self.automaton.find_all(folded):
+            # Whole words only
+            if start > 0 and folded[start - 1].isalnum():
+                continue
+            if end < len(folded) and folded[end].isalnum():
+                continue
+
+            original_start = positions[start]
+            original_end = positions[end - 1] + 1
+            if self.require_capitalized and text[original_start].islower():
+                continue
+
+            candidates.append((original_start, original_end, folded[start:end]))
+
+        # Leftmost-longest: earliest start wins, then the longest match there
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        places = []
+        covered_until = 0
+
+        for start, end, key in candidates:
+            if start < covered_until:
+                continue
+            place = self.gazetteer.lookup(key)
+            places.append({
+                'start': start,
+                'end': end,
+                'text': text[start:end],
+                'name': place['name'],
+                'latitude': place['latitude'],
+                'longitude': place['longitude'],
+            })
+            covered_until = end
+
+        return places
+
+    def extract(self, text: str) -> List[str]:
+        """Place names as written in text, in order of appearance, without duplicates"""
+        seen = set()
+        locations = []
+        for place in self.match(text):
+            key = place['text'].lower()
+            if key not in seen:
+                seen.add(key)
+                locations.append(place['text'])
+        return locations
+
+
+# Global instance, built on first use
+_place_matcher: Optional[PlaceMatcher] = None
+_place_matcher_lock = threading.Lock()
+
+
+def get_place_matcher() -> Optional[PlaceMatcher]:
+    """Get the shared place matcher, or None if no gazetteer is available"""
+    global _place_matcher
+
+    if _place_matcher is None:
+        with _place_matcher_lock:
+            if _place_matcher is None:
+                gazetteer = get_gazetteer()
+                if gazetteer is None:
+                    return None
+                _place_matcher = PlaceMatcher(gazetteer)
+                logger.info(f"Built place matcher over "
+                            f"{len(_place_matcher.automaton)} gazetteer names")
+
+    return _place_matcher
@@ -0,0 +1,155 @@
+"""
+Fetch planning - pack several keywords into one Twitter OR query and split
+the returned tweets back out per keyword
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Pattern
+
+logger = logging.getLogger(__name__)
+
+# Recent search query length limit on the Basic and Pro access levels
+MAX_QUERY_LENGTH = 512
+
+
+def _quote_term(keyword: str) -> str:
+    """Quote multi-word keywords so they are matched as exact phrases"""
+    return f'"{keyword}"' if re.search(r'\s', keyword) else keyword
+
+
+def build_or_query(keywords: List[str], suffix: str = "") -> str:
+    """
+    Build a recent search query matching any of the keywords
+
+    Args:
+        keywords: Keywords to OR together
+        suffix: Operators applied to the whole query, e.g. "-is:retweet lang:en"
+
+    Returns:
+        Query string such as '(earthquake OR flood) -is:retweet'
+    """
+    query = " OR ".join(_quote_term(keyword) for keyword in keywords)
+    if not suffix:
+        return query
+    if len(keywords) > 1:
+        query = f"({query})"
+    return f"{query} {suffix}"
+
+
+def plan_keyword_queries(keywords: List[str],
+                         max_query_length: Optional[int] = MAX_QUERY_LENGTH,
+                         suffix: str = "") -> List[List[str]]:
+    """
+    Greedily pack keywords, in order, into as few OR queries as fit the limit
+
+    Args:
+        keywords: Keywords to fetch
+        max_query_length: Maximum length of each built query (None sends one
+            query per keyword)
+        suffix: Operators appended to every query (counted against the limit)
+
+    Returns:
+        List of keyword groups; build each query with build_or_query(group, suffix)
+    """
+    if max_query_length is None:
+        return [[keyword] for keyword in keywords]
+
+    groups: List[List[str]] = []
+    current: List[str] = []
+
+    for keyword in keywords:
+        if current:
+            query = build_or_query(current + [keyword], suffix)
+            if len(query) <= max_query_length:
+                current.append(keyword)
+                continue
+
+        if current:
+            groups.append(current)
+        current = [keyword]
+
+        if len(build_or_query(current, suffix)) > max_query_length:
+            logger.warning(f"Keyword '{keyword}' alone exceeds the "
+                           f"{max_query_length} character query limit")
+
+    if current:
+        groups.append(current)
+
+    return groups
+
+
+@lru_cache(maxsize=1024)
+def _keyword_pattern(keyword: str) -> Pattern:
+    """Case-insensitive whole-word pattern for a keyword"""
+    words = [re.escape(word) for word in keyword.split()]
+    return re.compile(r'\b' + r'\s+'.join(words) + r'\b', re.IGNORECASE)
+
+
+def match_keywords(text: str, keywords: List[str]) -> List[str]:
+    """Keywords that occur as whole words in the text, in the given order"""
+    return [keyword for keyword in keywords
+            if _keyword_pattern(keyword).search(text or "")]
+
+
+def match_query_keywords(tweet: Dict[str, Any], keywords: List[str]) -> List[str]:
+    """
+    Keywords of a packed query that a returned tweet belongs to
+
+    Tweets of a single-keyword query always belong to that keyword, since the
+    API may match on text we cannot see locally (hashtags, expanded URLs).
+    """
+    if len(keywords) == 1:
+        return list(keywords)
+    return match_keywords(tweet.get('text', ''), keywords)
+
+
+def demultiplex(tweets: List[Dict[str, Any]],
+                keywords: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split the results of a packed query back out per keyword
+
+    A tweet matching several keywords is listed under each of them.
+
+    Args:
+        tweets: Tweets returned for build_or_query(keywords)
+        keywords: The keywords packed into the query
+
+    Returns:
+        Dictionary of keyword -> tweets, with every keyword present
+    """
+    results = {keyword: [] for keyword in keywords}
+    unmatched = 0
+
+    for tweet in tweets:
+        matched = match_query_keywords(tweet, keywords)
+        if not matched:
+            unmatched += 1
+        for keyword in matched:
+            results[keyword].append(tweet)
+
+    if unmatched:
+        logger.debug(f"{unmatched} tweets matched no keyword locally "
+                     f"for query group {keywords}")
+
+    return results
+
+
+def group_since_id(keywords: List[str], since_ids: Dict[str, str]) -> Optional[str]:
+    """
+    since_id for a packed query: the oldest of its keywords' marks, or None
+    if any keyword has not been fetched yet
+    """
+    marks = [since_ids.get(keyword) for keyword in keywords]
+    if not marks or any(mark is None for mark in marks):
+        return None
+    return min(marks, key=int)
+
+
+def is_newer(tweet_id: str, since_id: Optional[str]) -> bool:
+    """Whether a tweet id is past a keyword's since_id mark"""
+    return since_id is None or int(tweet_id) > int(since_id)
@@ -8,7 +8,7 @@ import threading
 from datetime import datetime, timedelta
 from typing import Callable, Dict, Any
 import signal
-from utils.logging_config import get_logger, metrics
+from utils.logging_config import get_logger, metrics, flush_database_logging
 
 logger = get_logger('scheduler')
 
@@ -156,6 +156,9 @@ class BackgroundScheduler:
             self.scheduler_thread.join(timeout=10)
             
         logger.info("Background scheduler stopped")
+
+        # Make sure queued warnings/errors reach the database before exit
+        flush_database_logging()
     
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals"""
@@ -214,7 +217,9 @@ scheduler = BackgroundScheduler()
 
 def start_crowdsense_scheduler():
     """Start the CrowdSense background scheduler with all tasks"""
-    from core.crowdsense_enhanced import fetch_and_analyze_tweets
+    from core.crowdsense_enhanced import (
+        fetch_and_analyze_tweets, save_detector_snapshot
+    )
     
     # Add the main tweet fetching task
     scheduler.add_task(
@@ -236,6 +241,14 @@ def start_crowdsense_scheduler():
         run_immediately=False
     )
     
+    # Add anomaly detector snapshot task
+    scheduler.add_task(
+        name="detector_snapshot",
+        func=save_detector_snapshot,
+        interval_minutes=5,  # Snapshot every 5 minutes
+        run_immediately=False
+    )
+
     # Add database cleanup task
     def cleanup_old_data():
         """Clean up old data from database"""
@@ -260,6 +273,21 @@ def start_crowdsense_scheduler():
                     WHERE created_at < datetime('now', '-30 days')
                 """)
                 
+                # Minute rollups only serve recent charts; hourly ones cover a quarter
+                conn.execute("""
+                    DELETE FROM volume_rollups
+                    WHERE (granularity = 'minute'
+                           AND bucket < datetime('now', '-2 days'))
+                       OR (granularity = 'hour'
+                           AND bucket < datetime('now', '-90 days'))
+                """)
+
+                # Delete expired geocoding results
+                conn.execute("""
+                    DELETE FROM geocode_cache
+                    WHERE expires_at < datetime('now')
+                """)
+
                 conn.commit()
                 return "Database cleanup completed"
         except Exception as e:
@@ -0,0 +1,101 @@
+"""
+Single-flight snapshot cache
+
+Holds the last value built by an expensive function and serves it from
+memory until it is older than a TTL. Only one caller rebuilds an expired
+snapshot at a time; while it does, everyone else gets the previous
+snapshot instead of repeating the same work.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+
+class SnapshotCache:
+    """
+    Cache one built value with TTL expiry and single-flight rebuilds
+
+    The first get() builds synchronously. After that an expired snapshot is
+    rebuilt by the first caller to notice, and concurrent callers keep
+    getting the stale copy until the new one is ready. refresh() rebuilds
+    immediately, e.g. when the underlying data is known to have changed.
+    """
+
+    def __init__(self, builder: Callable[[], Any], ttl: float,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the cache
+
+        Args:
+            builder: Function returning a fresh snapshot
+            ttl: Seconds a snapshot is served before it is rebuilt
+            clock: Time source in seconds
+        """
+        self._builder = builder
+        self.ttl = ttl
+        self._clock = clock
+        self._value = None
+        self._built_at: Optional[float] = None
+        self._lock = threading.Lock()        # Guards the value and its build time
+        self._build_lock = threading.Lock()  # Held by the one caller rebuilding
+        self.builds = 0
+
+    def _snapshot(self) -> Tuple[Any, Optional[float]]:
+        with self._lock:
+            if self._built_at is None:
+                return None, None
+            return self._value, self._clock() - self._built_at
+
+    def _build(self) -> Tuple[Any, float]:
+        # Caller holds _build_lock
+        value = self._builder()
+        with self._lock:
+            self._value = value
+            self._built_at = self._clock()
+            self.builds += 1
+        return value, 0.0
+
+    def age(self) -> Optional[float]:
+        """Seconds since the current snapshot was built (None before the first)"""
+        return self._snapshot()[1]
+
+    def get(self) -> Tuple[Any, float]:
+        """
+        Get the snapshot, rebuilding it if it has expired
+
+        Returns:
+            The snapshot and its age in seconds
+        """
+        value, age = self._snapshot()
+        if age is not None and age < self.ttl:
+            return value, age
+
+        if age is None:
+            # Nothing to serve yet: wait for whoever is building the first snapshot
+            self._build_lock.acquire()
+        elif not self._build_lock.acquire(blocking=False):
+            # Someone else is already rebuilding; serve the stale snapshot meanwhile
+            return value, age
+
+        try:
+            value, age = self._snapshot()
+            if age is not None and age < self.ttl:
+                return value, age
+            return self._build()
+        finally:
+            self._build_lock.release()
+
+    def refresh(self) -> Any:
+        """Rebuild the snapshot now and return it"""
+        with self._build_lock:
+            return self._build()[0]
+
+    def clear(self):
+        """Drop the snapshot so the next get() rebuilds it"""
+        with self._lock:
+            self._value = None
+            self._built_at = None
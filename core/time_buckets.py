@@ -0,0 +1,134 @@
+"""
+Time-bucketed event counts
+
+Keeps per-key counts in a fixed ring of time buckets instead of one
+timestamp per event, so memory and work per update stay constant however
+many tweets arrive, and sums over any window up to the ring's horizon come
+from the same buckets.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+# Default bucket width and the longest window that can be summed
+BUCKET_SECONDS = 10
+HORIZON_SECONDS = 60 * 60
+
+Seconds = Union[float, timedelta]
+
+
+def _seconds(value: Seconds) -> float:
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+class BucketedCounter:
+    """
+    Per-key counts in a ring of fixed-width time buckets
+
+    add() is O(1) and a window sum is O(buckets). Windows are measured in
+    whole buckets ending with the current one, so they are accurate to
+    bucket_seconds.
+    """
+
+    def __init__(self, bucket_seconds: float = BUCKET_SECONDS,
+                 horizon: Seconds = HORIZON_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initialize the counter
+
+        Args:
+            bucket_seconds: Width of each bucket
+            horizon: Longest window that can be summed
+            clock: Time source in seconds
+        """
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = max(1, math.ceil(_seconds(horizon) / bucket_seconds))
+        self._clock = clock
+        self._counts: Dict[str, List[int]] = {}
+        # Bucket number currently held by each slot
+        self._buckets: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def _current_bucket(self, now: Optional[float]) -> int:
+        return int((self._clock() if now is None else now) // self.bucket_seconds)
+
+    def _span(self, window: Seconds) -> int:
+        span = math.ceil(_seconds(window) / self.bucket_seconds)
+        if span > self.num_buckets:
+            raise ValueError(f"Window of {_seconds(window):.0f}s is longer than "
+                             "the counter's horizon")
+        return span
+
+    def add(self, key: str, count: int = 1, now: float = None):
+        """
+        Count events for a key
+
+        Args:
+            key: Series the events belong to
+            count: Number of events
+            now: Event time (defaults to the clock)
+        """
+        bucket = self._current_bucket(now)
+        slot = bucket % self.num_buckets
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * self.num_buckets
+                self._buckets[key] = [-1] * self.num_buckets
+            buckets = self._buckets[key]
+            if buckets[slot] != bucket:
+                buckets[slot] = bucket
+                counts[slot] = 0
+            counts[slot] += count
+
+    def window_sums(self, key: str, windows: Iterable[Seconds],
+                    now: float = None) -> List[int]:
+        """
+        Events for a key in several trailing windows, in one pass over the ring
+
+        Args:
+            key: Series to sum
+            windows: Window lengths (seconds or timedelta), each within the horizon
+            now: End of the windows (defaults to the clock)
+
+        Returns:
+            Event count per window, in the order given
+        """
+        spans = [self._span(window) for window in windows]
+        current = self._current_bucket(now)
+        longest = max(spans, default=0)
+
+        # Events per bucket age, then running totals by age
+        by_age = [0] * longest
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is not None:
+                for bucket, count in zip(self._buckets[key], counts):
+                    age = current - bucket
+                    if 0 <= age < longest:
+                        by_age[age] += count
+
+        totals = [0] * (longest + 1)
+        for age, count in enumerate(by_age):
+            totals[age + 1] = totals[age] + count
+        return [totals[span] for span in spans]
+
+    def window_sum(self, key: str, window: Seconds, now: float = None) -> int:
+        """Events for a key in the trailing window"""
+        return self.window_sums(key, [window], now)[0]
+
+    def clear(self, key: str = None):
+        """Forget the counts of one key, or of every key"""
+        with self._lock:
+            if key is None:
+                self._counts.clear()
+                self._buckets.clear()
+            else:
+                self._counts.pop(key, None)
+                self._buckets.pop(key, None)
@@ -142,17 +142,54 @@ def test_components():
     print("\n🎉 All components tested successfully!")
 
 
+def run_backtest_mode(generate: bool = False, labels: str = None, hours: int = None,
+                      workers: int = None):
+    """Replay stored or generated metrics through every detector configuration"""
+    from core.backtesting import (
+        generate_series, replay_metrics, run_grid, format_results
+    )
+
+    if generate:
+        data = generate_series()
+        print(f"Replaying {data.points} points from {len(data.keywords)} series "
+              f"with {len(data.events)} known events...")
+        results = run_grid(data, workers=workers)
+    else:
+        init_database()
+        print("Streaming tweet_metrics through every detector configuration...")
+        results = replay_metrics(hours=hours, labels_path=labels, workers=workers)
+        if not results or not results[0]['points']:
+            print("No metrics to replay")
+            return
+        print(f"Replayed {results[0]['points']} points")
+
+    print(format_results(results))
+
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description='CrowdSense - Real-time Disaster Detection System')
-    parser.add_argument('mode', choices=['web', 'background', 'single', 'test', 'simulation'], 
-                       help='Run mode: web (dashboard), background (monitoring only), single (one analysis), test (component tests), simulation (web with simulation)')
+    parser.add_argument('mode', choices=['web', 'background', 'single', 'test',
+                                         'simulation', 'backtest'],
+                        help='Run mode: web (dashboard), background (monitoring only), '
+                             'single (one analysis), test (component tests), '
+                             'simulation (web with simulation), '
+                             'backtest (grade detector settings offline)')
     parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
-                       help='Logging level')
+                        help='Logging level')
     parser.add_argument('--no-db-logging', action='store_true',
-                       help='Disable database logging')
+                        help='Disable database logging')
     parser.add_argument('--simulation', action='store_true',
-                       help='Enable simulation mode for testing')
+                        help='Enable simulation mode for testing')
+    parser.add_argument('--generate', action='store_true',
+                        help='Backtest on generated series instead of tweet_metrics')
+    parser.add_argument('--labels',
+                        help='Backtest: CSV of known events (keyword,start,end in UTC) '
+                             'to grade against')
+    parser.add_argument('--hours', type=int,
+                        help='Backtest: only replay metrics from the last hours')
+    parser.add_argument('--workers', type=int,
+                        help='Backtest: worker processes for the parameter grid')
     
     args = parser.parse_args()
     
@@ -170,6 +207,9 @@ def main():
             run_single_analysis()
         elif args.mode == 'test':
             test_components()
+        elif args.mode == 'backtest':
+            run_backtest_mode(generate=args.generate, labels=args.labels,
+                              hours=args.hours, workers=args.workers)
     except KeyboardInterrupt:
         logger.info("Application interrupted by user")
         sys.exit(0)
@@ -0,0 +1,203 @@
+"""
+Stand-in HTTP server for the Twitter and News APIs
+Serves deterministic responses on localhost so the ingestion engines can be
+tested and benchmarked without credentials, network access or rate limits
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import itertools
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+from aiohttp import web
+
+
+def query_terms(query: str) -> List[str]:
+    """Search terms of an OR query, without operators such as -is:retweet or lang:en"""
+    query = re.sub(r'-?\w+:\S+', ' ', query)
+    terms = [term.strip(' ()"') for term in query.split(' OR ')]
+    return [term for term in terms if term] or [query.strip()]
+
+
+class StandInAPIServer:
+    """Local aiohttp server imitating Twitter recent search and NewsAPI"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 tweets_per_page: int = 10):
+        """
+        Initialize the stand-in server
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Artificial delay added to every response, in seconds
+            tweets_per_page: New tweets published to a query's timeline on each
+                first-page search request (0 to publish only via publish())
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.tweets_per_page = tweets_per_page
+
+        self.request_count = 0
+        self.requests: List[Dict[str, Any]] = []
+        self._failures: List[tuple] = []
+        self._tweet_ids = itertools.count(1)
+        # Tweet ids, oldest first
+        self.timelines: Dict[str, List[int]] = defaultdict(list)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def twitter_base_url(self) -> str:
+        return f"{self.base_url}/2"
+
+    @property
+    def news_base_url(self) -> str:
+        return f"{self.base_url}/v2"
+
+    def fail_next(self, count: int, status: int = 503, headers: Dict[str, str] = None):
+        """Answer the next `count` requests with an error status"""
+        self._failures.extend([(status, headers or {})] * count)
+
+    def publish(self, query: str, count: int):
+        """Add `count` new tweets to a query's timeline"""
+        self.timelines[query].extend(next(self._tweet_ids) for _ in range(count))
+
+    async def _respond(self, request: web.Request,
+                       build_payload: Callable[[], Dict[str, Any]]) -> web.Response:
+        """Apply latency and injected failures, then answer with the built payload"""
+        self.request_count += 1
+        self.requests.append({'path': request.path, 'query': dict(request.query)})
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self._failures:
+            status, headers = self._failures.pop(0)
+            return web.json_response({'error': 'injected failure'},
+                                     status=status, headers=headers)
+
+        return web.json_response(build_payload())
+
+    async def _search_recent(self, request: web.Request) -> web.Response:
+        query = request.query.get('query', '')
+        since_id = int(request.query.get('since_id') or 0)
+        max_results = int(request.query.get('max_results') or 10)
+        offset = int(request.query.get('next_token') or 0)
+        terms = query_terms(query)
+
+        def build_payload():
+            if 'next_token' not in request.query and self.tweets_per_page:
+                self.publish(query, self.tweets_per_page)
+
+            # Like the real API: newest first, paged with an opaque next_token
+            matching = [tweet_id for tweet_id in reversed(self.timelines[query])
+                        if tweet_id > since_id]
+            page = matching[offset:offset + max_results]
+            now = datetime.utcnow().isoformat() + "Z"
+
+            meta = {'result_count': len(page)}
+            if not page:
+                return {'meta': meta}
+
+            meta.update({'newest_id': str(page[0]), 'oldest_id': str(page[-1])})
+            if offset + max_results < len(matching):
+                meta['next_token'] = str(offset + max_results)
+
+            # OR queries return tweets about each of their terms in turn
+            tweets = [
+                {
+                    'id': str(tweet_id),
+                    'text': f"Reports of {terms[tweet_id % len(terms)]} near "
+                            f"Springfield, residents advised to stay alert",
+                    'created_at': now,
+                    'author_id': f"user_{tweet_id % 100}",
+                }
+                for tweet_id in page
+            ]
+            return {'data': tweets, 'meta': meta}
+
+        return await self._respond(request, build_payload)
+
+    async def _news(self, request: web.Request) -> web.Response:
+        query = request.query.get('q', '')
+        articles = [
+            {
+                'title': f"Officials respond to {query} reports",
+                'url': f"https://news.example.com/{query}/{i}",
+                'source': {'name': 'Stand-in News'},
+            }
+            for i in range(3)
+        ]
+        return await self._respond(request,
+                                   lambda: {'status': 'ok', 'articles': articles})
+
+    def _build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/2/tweets/search/recent', self._search_recent)
+        app.router.add_get('/v2/everything', self._news)
+        return app
+
+    def start(self) -> str:
+        """Start serving in a background thread and return the base URL"""
+        ready = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            self._loop = loop
+
+            runner = web.AppRunner(self._build_app(), access_log=None)
+            loop.run_until_complete(runner.setup())
+            site = web.TCPSite(runner, self.host, self.port)
+            loop.run_until_complete(site.start())
+            self.port = runner.addresses[0][1]
+            ready.set()
+
+            loop.run_forever()
+            loop.run_until_complete(runner.cleanup())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name='stand-in-api', daemon=True)
+        self._thread.start()
+        ready.wait(timeout=10)
+        return self.base_url
+
+    def stop(self):
+        """Stop the server and wait for its thread to exit"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import time
+
+    server = StandInAPIServer()
+    print(f"Stand-in API serving at {server.start()}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
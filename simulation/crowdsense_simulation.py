@@ -5,7 +5,6 @@ Modified version that uses simulated data instead of real APIs for testing
 
 import time
 from datetime import datetime, timedelta
-from collections import deque
 from typing import Dict, List, Any, Optional, Tuple
 
 import requests
@@ -18,12 +17,17 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.config import TWITTER_BEARER_TOKEN, NEWS_API_KEY
 from utils.alert import send_alert
+from utils.rate_limiter import MAX_WAIT, get_rate_limiter
 from core.database import (
-    init_database, save_alert, save_tweet, save_tweet_metrics, 
+    init_database, save_alert, save_tweets_bulk, save_tweet_metrics,
     get_recent_alerts, get_recent_tweets, get_system_stats
 )
 from core.anomaly_detection import AnomalyDetector
-from core.location_extraction import extract_location_from_tweet
+from core.time_buckets import BucketedCounter
+from core.location_extraction import (
+    extract_locations_from_tweets, warm_geocode_cache, warm_place_matcher,
+    warm_ner_model
+)
 from utils.logging_config import (
     setup_logging, get_logger, metrics, 
     log_tweet_processed, log_alert_sent, log_anomaly_detected,
@@ -40,7 +44,7 @@ WINDOW = timedelta(minutes=5)
 ALERT_COOLDOWN = timedelta(minutes=15)
 
 # Global state
-tweet_buffers = {keyword: deque() for keyword in DISASTER_KEYWORDS}
+tweet_buckets = BucketedCounter(bucket_seconds=10, horizon=WINDOW)
 last_alert_times = {keyword: None for keyword in DISASTER_KEYWORDS}
 anomaly_detector = AnomalyDetector(window_size=15, ewma_alpha=0.3, z_threshold=2.0)  # Lower threshold for simulation
 
@@ -59,7 +63,7 @@ def build_retry_session() -> requests.Session:
         read=5,
         connect=5,
         backoff_factor=0.5,
-        status_forcelist=[429, 500, 502, 503, 504],
+        status_forcelist=[500, 502, 503, 504],  # 429s are left to the rate limiters
         allowed_methods=["GET", "POST"],
         raise_on_status=False,
     )
@@ -96,11 +100,18 @@ def check_news(keyword: str) -> List[Dict[str, Any]]:
         return []
         
     try:
+        if not get_rate_limiter('newsapi').acquire(timeout=MAX_WAIT):
+            logger.warning("News API budget exhausted, "
+                           f"skipping news check for '{keyword}'", keyword=keyword)
+            return []
+
         start_time = time.time()
         url = f"https://newsapi.org/v2/everything?q={keyword}&sortBy=publishedAt&apiKey={NEWS_API_KEY}"
         
         response = http.get(url, timeout=10)
         response_time = time.time() - start_time
+        get_rate_limiter('newsapi').update_from_headers(response.headers,
+                                                        response.status_code)
         
         log_api_request('newsapi', response.status_code, response_time)
         
@@ -136,11 +147,13 @@ def fetch_tweets_for_keyword(keyword: str) -> List[Dict[str, Any]]:
                 logger.debug(f"No simulated tweets for keyword '{keyword}'", keyword=keyword)
                 return []
                 
-            tweets = []
-            for tweet_data in data["data"]:
-                # Extract location information
-                location_info = extract_location_from_tweet(tweet_data.get('text', ''))
-                
+            # Extract location information for the whole page in one NER pass
+            location_infos = extract_locations_from_tweets(
+                [tweet_data.get('text', '') for tweet_data in data["data"]]
+            )
+
+            records = []
+            for tweet_data, location_info in zip(data["data"], location_infos):
                 if location_info['primary_location']:
                     log_location_extracted(
                         location_info['primary_location'],
@@ -162,10 +175,12 @@ def fetch_tweets_for_keyword(keyword: str) -> List[Dict[str, Any]]:
                     'tweet_created_at': tweet_data.get('created_at')
                 }
                 
-                # Save to database
-                if save_tweet(tweet_record):
-                    tweets.append(tweet_record)
+                records.append(tweet_record)
                 
+            # Save the whole page in one transaction and keep only fresh tweets
+            inserted_ids = set(save_tweets_bulk(records))
+            tweets = [record for record in records if record['id'] in inserted_ids]
+
             logger.info(f"Processed {len(tweets)} simulated tweets for keyword '{keyword}'",
                        keyword=keyword, tweet_count=len(tweets))
             
@@ -183,11 +198,18 @@ def fetch_tweets_for_keyword(keyword: str) -> List[Dict[str, Any]]:
     headers = {"Authorization": f"Bearer {TWITTER_BEARER_TOKEN}"}
 
     try:
+        if not get_rate_limiter('twitter').acquire(timeout=MAX_WAIT):
+            logger.warning("Twitter rate limit budget exhausted, "
+                           f"skipping '{keyword}' this cycle", keyword=keyword)
+            return []
+
         start_time = time.time()
         url = f"https://api.twitter.com/2/tweets/search/recent?query={keyword}&max_results=10&tweet.fields=created_at,author_id,public_metrics"
         
         response = http.get(url, headers=headers, timeout=10)
         response_time = time.time() - start_time
+        get_rate_limiter('twitter').update_from_headers(response.headers,
+                                                        response.status_code)
         
         log_api_request('twitter', response.status_code, response_time)
         
@@ -202,11 +224,13 @@ def fetch_tweets_for_keyword(keyword: str) -> List[Dict[str, Any]]:
             logger.debug(f"No tweets found for keyword '{keyword}'", keyword=keyword)
             return []
             
-        tweets = []
-        for tweet_data in data["data"]:
-            # Extract location information
-            location_info = extract_location_from_tweet(tweet_data.get('text', ''))
-            
+        # Extract location information for the whole page in one NER pass
+        location_infos = extract_locations_from_tweets(
+            [tweet_data.get('text', '') for tweet_data in data["data"]]
+        )
+
+        records = []
+        for tweet_data, location_info in zip(data["data"], location_infos):
             if location_info['primary_location']:
                 log_location_extracted(
                     location_info['primary_location'],
@@ -228,10 +252,12 @@ def fetch_tweets_for_keyword(keyword: str) -> List[Dict[str, Any]]:
                 'tweet_created_at': tweet_data.get('created_at')
             }
             
-            # Save to database
-            if save_tweet(tweet_record):
-                tweets.append(tweet_record)
+            records.append(tweet_record)
             
+        # Save the whole page in one transaction and keep only fresh tweets
+        inserted_ids = set(save_tweets_bulk(records))
+        tweets = [record for record in records if record['id'] in inserted_ids]
+
         logger.debug(f"Processed {len(tweets)} tweets for keyword '{keyword}'",
                     keyword=keyword, tweet_count=len(tweets))
         
@@ -309,17 +335,12 @@ def fetch_and_analyze_tweets() -> Dict[str, Any]:
                 tweets = fetch_tweets_for_keyword(keyword)
                 tweet_count = len(tweets)
                 
-                # Update tweet buffer
+                # Count tweets in this keyword's time buckets
                 current_time = datetime.utcnow()
-                tweet_buffers[keyword].extend([current_time] * tweet_count)
-                
-                # Clean old tweets from buffer
-                cutoff = current_time - WINDOW
-                while tweet_buffers[keyword] and tweet_buffers[keyword][0] < cutoff:
-                    tweet_buffers[keyword].popleft()
+                tweet_buckets.add(keyword, tweet_count)
                 
                 # Get current count in window
-                window_count = len(tweet_buffers[keyword])
+                window_count = tweet_buckets.window_sum(keyword, WINDOW)
                 
                 # Analyze for anomalies
                 z_score, ewma_value, is_anomaly = analyze_tweet_anomaly(keyword, window_count)
@@ -371,8 +392,8 @@ def fetch_and_analyze_tweets() -> Dict[str, Any]:
                             last_alert_times[keyword] = current_time
                             results['alerts_sent'] += 1
                             
-                            # Clear buffer after alert
-                            tweet_buffers[keyword].clear()
+                            # Clear window after alert
+                            tweet_buckets.clear(keyword)
                             
                             log_alert_sent(keyword, alert_msg, sms_sid)
                             
@@ -486,9 +507,13 @@ def initialize_system():
     init_database()
     logger.info("Database initialized")
     
+    # Reuse geocoding results from earlier runs and other processes
+    logger.info(f"Loaded {warm_geocode_cache()} cached geocoding results")
+    warm_place_matcher()
+    warm_ner_model()
+
     # Load historical data for anomaly detection
-    for keyword in DISASTER_KEYWORDS:
-        anomaly_detector.load_historical_data(keyword, hours=48)
+    anomaly_detector.load_historical_data_bulk(DISASTER_KEYWORDS, hours=48)
     
     logger.info("Historical data loaded for anomaly detection")
     
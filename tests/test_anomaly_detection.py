@@ -0,0 +1,372 @@
+import os
+import random
+import tempfile
+import time
+import unittest
+from collections import deque
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+
+from core import anomaly_detection
+from core.anomaly_detection import (
+    AnomalyDetector, CusumDetector, PageHinkleyDetector, SeasonalAnomalyDetector,
+    VectorizedAnomalyDetector, WindowStats, create_anomaly_detector
+)
+
+
+def reference_z_scores(counts, window_size):
+    """Z-scores as the detector computed them with NumPy over the copied window"""
+    history = deque(maxlen=window_size)
+    z_scores = []
+    for count in counts:
+        history.append(count)
+        values = list(history)
+        if len(values) < 2:
+            z_scores.append(0.0)
+            continue
+        historical_data = values[:-1]
+        std = np.std(historical_data)
+        mean = np.mean(historical_data)
+        z_scores.append(0.0 if std == 0 else float((count - mean) / std))
+    return z_scores
+
+
+class TestIncrementalZScore(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(anomaly_detection.logger, 'info')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_matches_numpy_reference(self):
+        rng = random.Random(1234)
+        for trial in range(100):
+            window_size = rng.choice([1, 2, 3, 5, 15, 100, 300])
+            scale = rng.choice([0, 1, 5, 1000, 10 ** 6])
+            length = rng.randint(1, 3 * window_size + 5)
+            counts = [rng.randint(0, scale) for _ in range(length)]
+            if trial % 7 == 0:
+                counts[rng.randrange(len(counts))] += 50 * (scale + 1)  # A spike
+
+            detector = AnomalyDetector(window_size=window_size)
+            z_scores = [detector.update_history("kw", count)[0] for count in counts]
+
+            expected = reference_z_scores(counts, window_size)
+            for got, want in zip(z_scores, expected):
+                self.assertAlmostEqual(got, want, delta=1e-9 * max(1.0, abs(want)),
+                                       msg=f"window {window_size}, counts {counts}")
+
+    def test_loaded_history_continues_the_window(self):
+        counts = [3, 8, 2, 7, 4, 9, 1, 6, 20, 5, 5, 5]
+        # The database returns history newest first
+        loaded = [{'count': count} for count in reversed(counts[:6])]
+
+        detector = AnomalyDetector(window_size=4)
+        with mock.patch.object(anomaly_detection, 'get_tweet_metrics_history',
+                               return_value=loaded):
+            detector.load_historical_data("kw")
+        z_scores = [detector.update_history("kw", count)[0] for count in counts[6:]]
+
+        for got, want in zip(z_scores, reference_z_scores(counts, 4)[6:]):
+            self.assertAlmostEqual(got, want, places=9)
+
+    def test_window_stats(self):
+        stats = WindowStats([2, 4, 4, 4, 5, 5, 7, 9])
+        self.assertEqual((stats.mean(), stats.std()), (5.0, 2.0))
+        stats.remove(9)
+        stats.add(9)
+        self.assertEqual(stats.std(), 2.0)
+
+
+class TestVectorizedDetector(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(anomaly_detection.logger, 'info')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assert_same_scores(self, got, want):
+        self.assertAlmostEqual(got[0], want[0], delta=1e-9 * max(1.0, abs(want[0])))
+        self.assertAlmostEqual(got[1], want[1], places=9)
+        self.assertEqual(got[2], want[2])
+
+    def test_matches_per_keyword_detector(self):
+        rng = random.Random(99)
+        for window_size in (1, 2, 5, 15):
+            keywords = [f"kw{i}" for i in range(20)]
+            vectorized = VectorizedAnomalyDetector(
+                keywords[:10], window_size=window_size, z_threshold=1.5)
+            scalar = AnomalyDetector(window_size=window_size, z_threshold=1.5)
+
+            for cycle in range(60):
+                # Keywords join part way through and skip cycles when their fetch fails
+                active = [k for k in keywords[:10 + cycle // 6] if rng.random() > 0.1]
+                counts = {k: rng.choice([rng.randint(0, 10), rng.randint(0, 200)])
+                          for k in active}
+
+                scores = vectorized.update_counts(counts)
+                for keyword, count in counts.items():
+                    self.assert_same_scores(scores[keyword],
+                                            scalar.update_history(keyword, count))
+
+    def test_update_batch_vectors(self):
+        detector = VectorizedAnomalyDetector(["a", "b", "c"], window_size=5,
+                                             z_threshold=2.0)
+        for counts in ([2, 10, 0], [3, 11, 0], [2, 9, 0], [3, 10, 0]):
+            detector.update_batch(counts)
+        z_scores, ewma, is_anomaly = detector.update_batch(np.array([30, 10, 0]))
+
+        self.assertEqual(z_scores.shape, (3,))
+        self.assertGreater(z_scores[0], 2.0)
+        self.assertEqual(list(is_anomaly), [True, False, False])
+        self.assertEqual(z_scores[2], 0.0)
+
+    def test_loaded_history_matches(self):
+        loaded = [{'count': count} for count in reversed([5, 7, 6, 8, 30, 6])]
+        vectorized = VectorizedAnomalyDetector(window_size=4)
+        scalar = AnomalyDetector(window_size=4)
+        with mock.patch.object(anomaly_detection, 'get_tweet_metrics_history',
+                               return_value=loaded):
+            vectorized.load_historical_data("kw")
+            scalar.load_historical_data("kw")
+
+        self.assertTrue(vectorized.has_history("kw"))
+        self.assertFalse(vectorized.has_history("other"))
+        for count in [7, 40, 5, 6, 9]:
+            self.assert_same_scores(vectorized.update_history("kw", count),
+                                    scalar.update_history("kw", count))
+
+    def test_loads_the_most_recent_points(self):
+        # Newest first, as get_tweet_metrics_history returns them
+        loaded = [{'count': count} for count in [10, 20, 30, 40, 1000, 2000]]
+        detector = VectorizedAnomalyDetector(window_size=4)
+        with mock.patch.object(anomaly_detection, 'get_tweet_metrics_history',
+                               return_value=loaded):
+            detector.load_historical_data("kw")
+
+        row = detector.index["kw"]
+        self.assertEqual(sorted(detector.history[row].tolist()), [10, 20, 30, 40])
+        self.assertEqual(detector.ewma[row], np.mean([10, 20, 30, 40, 1000]))
+
+    def test_bulk_load_matches_per_keyword_load(self):
+        histories = {"a": [{'count': c} for c in [9, 4, 6, 5, 7, 3]],
+                     "b": [{'count': 2}]}
+        bulk = VectorizedAnomalyDetector(["a"], window_size=4)
+        scalar = AnomalyDetector(window_size=4)
+        with mock.patch.object(anomaly_detection, 'get_tweet_metrics_histories',
+                               return_value=histories) as query:
+            self.assertEqual(bulk.load_historical_data_bulk(["a", "b", "c"]), 2)
+            scalar.load_historical_data_bulk(["a", "b", "c"])
+        query.assert_called_with(["a", "b", "c"], 24, limit=4)
+
+        self.assertFalse(bulk.has_history("c"))
+        for keyword, count in [("a", 30), ("b", 3), ("a", 5)]:
+            self.assert_same_scores(bulk.update_history(keyword, count),
+                                    scalar.update_history(keyword, count))
+
+
+class TestDetectorSnapshot(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(anomaly_detection.logger, 'info')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "detector_state.npz")
+
+    def make_detector(self, keywords=("a", "b", "c"), window_size=5):
+        detector = VectorizedAnomalyDetector(list(keywords), window_size=window_size)
+        rng = random.Random(7)
+        for _ in range(8):
+            detector.update_counts({k: rng.randint(0, 50) for k in keywords})
+        return detector
+
+    def test_round_trip(self):
+        original = self.make_detector()
+        original.save_snapshot(self.path)
+        self.assertEqual(os.listdir(self.tmpdir.name), ["detector_state.npz"])
+
+        restored = VectorizedAnomalyDetector(["a", "d"], window_size=5)
+        self.assertTrue(restored.load_snapshot(self.path, max_age=60))
+        self.assertEqual(restored.keywords, ["a", "b", "c", "d"])
+        self.assertFalse(restored.has_history("d"))
+
+        counts = {"a": 90, "b": 3, "c": 20}
+        self.assertEqual(restored.update_counts(counts), original.update_counts(counts))
+
+    def test_rejects_unusable_snapshots(self):
+        self.make_detector().save_snapshot(self.path)
+        detector = VectorizedAnomalyDetector(["a"], window_size=10)
+        self.assertFalse(detector.load_snapshot(self.path))
+        self.assertFalse(detector.has_history("a"))
+
+        detector = VectorizedAnomalyDetector(["a"], window_size=5)
+        with mock.patch.object(anomaly_detection.time, 'time',
+                               return_value=time.time() + 7200):
+            self.assertFalse(detector.load_snapshot(self.path, max_age=3600))
+
+        missing = os.path.join(self.tmpdir.name, "missing.npz")
+        self.assertFalse(detector.load_snapshot(missing))
+        with open(self.path, 'wb') as f:
+            f.write(b"not a snapshot")
+        with mock.patch.object(anomaly_detection.logger, 'error') as error:
+            self.assertFalse(detector.load_snapshot(self.path))
+        error.assert_called_once()
+
+
+class TestSeasonalDetector(unittest.TestCase):
+    START = datetime(2026, 3, 2)  # A Monday
+
+    def setUp(self):
+        patcher = mock.patch.object(anomaly_detection.logger, 'info')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def daily_cycle(self, weeks, rng):
+        """Counts every 20 minutes: quiet nights, a steady day and an evening peak"""
+        for step in range(weeks * 7 * 24 * 3):
+            timestamp = self.START + timedelta(minutes=20 * step)
+            base = 60 if 18 <= timestamp.hour < 22 else 5 if timestamp.hour < 7 else 15
+            yield timestamp, base + rng.randint(-3, 3)
+
+    def test_evening_peak_is_not_an_anomaly(self):
+        rng = random.Random(5)
+        seasonal = create_anomaly_detector("seasonal", ["fire"])
+        windowed = create_anomaly_detector("zscore")
+        evening = self.START + timedelta(weeks=3, hours=18)
+        night = self.START + timedelta(weeks=3, days=1, hours=3)
+
+        for timestamp, count in self.daily_cycle(4, rng):
+            if timestamp == evening:
+                # The usual evening rise only stands out against the last few windows
+                self.assertFalse(seasonal.update_history("fire", count, timestamp)[2])
+                self.assertTrue(windowed.update_history("fire", count)[2])
+            elif timestamp == night:
+                # A night-time burst the size of a normal day still does
+                self.assertTrue(seasonal.update_history("fire", 30, timestamp)[2])
+                break
+            else:
+                seasonal.update_history("fire", count, timestamp)
+                windowed.update_history("fire", count)
+
+    def test_slot_statistics_match_numpy(self):
+        detector = SeasonalAnomalyDetector(slot_memory=1000)
+        values = [3, 9, 4, 4, 12, 7]
+        for week, value in enumerate(values):
+            timestamp = self.START + timedelta(weeks=week, hours=5)
+            detector.update_history("kw", value, timestamp)
+
+        row = detector.index["kw"]
+        self.assertEqual(detector.slot_means.shape, (1, 168))
+        self.assertAlmostEqual(detector.slot_means[row, 5], np.mean(values))
+        self.assertAlmostEqual(detector.slot_vars[row, 5], np.var(values))
+        self.assertEqual(detector.slot_weights[row].sum(), len(values))
+
+        # Enough samples: scored against the slot
+        timestamp = self.START + timedelta(weeks=6, hours=5)
+        z_score = detector.update_history("kw", 20, timestamp)[0]
+        self.assertAlmostEqual(z_score, (20 - np.mean(values)) / np.std(values))
+
+    def test_loaded_history_matches_online_updates(self):
+        rng = random.Random(8)
+        samples = list(self.daily_cycle(1, rng))
+        online = SeasonalAnomalyDetector()
+        for timestamp, count in samples:
+            online.update_history("kw", count, timestamp)
+
+        history = [{'count': count,
+                    'created_at': timestamp.strftime('%Y-%m-%d %H:%M:%S')}
+                   for timestamp, count in reversed(samples)]
+        loaded = SeasonalAnomalyDetector()
+        with mock.patch.object(anomaly_detection, 'get_tweet_metrics_histories',
+                               return_value={"kw": history}):
+            self.assertEqual(loaded.load_historical_data_bulk(["kw"]), 1)
+
+        for name in SeasonalAnomalyDetector.STATE_ARRAYS:
+            np.testing.assert_allclose(getattr(loaded, name), getattr(online, name),
+                                       err_msg=name)
+
+    def test_snapshot_round_trip(self):
+        rng = random.Random(3)
+        detector = SeasonalAnomalyDetector(["a"])
+        for timestamp, count in self.daily_cycle(1, rng):
+            detector.update_history("a", count, timestamp)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "detector_state.npz")
+            detector.save_snapshot(path)
+            restored = SeasonalAnomalyDetector()
+            self.assertTrue(restored.load_snapshot(path))
+            # A windowed detector's snapshot cannot be used, and vice versa
+            self.assertFalse(VectorizedAnomalyDetector().load_snapshot(path))
+
+        timestamp = self.START + timedelta(weeks=1, hours=19)
+        self.assertEqual(restored.update_history("a", 80, timestamp),
+                         detector.update_history("a", 80, timestamp))
+
+
+class TestChangePointDetectors(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(anomaly_detection.logger, 'info')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def first_alert(self, detector, counts):
+        for cycle, count in enumerate(counts):
+            if detector.update_history("flood", int(count))[2]:
+                return cycle
+        return None
+
+    def test_base_class_needs_accumulate(self):
+        with self.assertRaises(TypeError):
+            anomaly_detection.ChangePointDetector(["flood"])
+
+    def test_slow_build_detected_before_zscore(self):
+        rng = np.random.default_rng(4)
+        quiet = rng.poisson(20, 100)
+        rising = rng.poisson(20 * (1 + 0.05 * np.arange(30)))
+
+        for method in ("cusum", "page_hinkley"):
+            detector = create_anomaly_detector(method)
+            self.assertIsNone(self.first_alert(detector, quiet), method)
+            onset = self.first_alert(detector, rising)
+            self.assertIsNotNone(onset, method)
+            self.assertLess(onset, 15, method)
+
+        windowed = create_anomaly_detector("vectorized")
+        self.first_alert(windowed, quiet)
+        self.assertIsNone(self.first_alert(windowed, rising[:15]))
+
+    def test_statistic_reported_then_reset(self):
+        detector = CusumDetector(threshold=5.0, drift=0.5, min_samples=3)
+        for count in [10, 10, 10, 10]:
+            detector.update_history("kw", count)
+        self.assertEqual(detector.change_score("kw"), 0.0)
+
+        # 10 +- sqrt(10): a count of 30 is ~6.3 deviations above the baseline
+        z_score, _, is_change = detector.update_history("kw", 30)
+        self.assertTrue(is_change)
+        self.assertAlmostEqual(detector.change_score("kw"), z_score - 0.5)
+        self.assertEqual(detector.sums[detector.index["kw"]], 0.0)
+
+    def test_constant_state_per_keyword(self):
+        detector = PageHinkleyDetector(["a", "b"])
+        rng = random.Random(2)
+        for _ in range(500):
+            detector.update_counts({"a": rng.randint(0, 30), "b": rng.randint(0, 30),
+                                    "c": 4})
+        for name in detector.state_arrays:
+            self.assertEqual(getattr(detector, name).shape, (3,), name)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "detector_state.npz")
+            detector.save_snapshot(path)
+            restored = PageHinkleyDetector()
+            self.assertTrue(restored.load_snapshot(path))
+            self.assertFalse(CusumDetector().load_snapshot(path))
+        self.assertEqual(restored.update_counts({"a": 90}),
+                         detector.update_counts({"a": 90}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from core import database
+from core.async_ingestion import (
+    AsyncIngestionEngine, backoff_delay, run_ingestion_cycle
+)
+from simulation.api_server import StandInAPIServer
+from utils.logging_config import flush_database_logging
+from utils.rate_limiter import TokenBucket
+
+
+def setUpModule():
+    # Error logs may reach the database log handler once another test has set it up
+    tmpdir = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(tmpdir.cleanup)
+    patcher = mock.patch.object(database, 'DATABASE_PATH',
+                                os.path.join(tmpdir.name, "test.db"))
+    patcher.start()
+    unittest.addModuleCleanup(patcher.stop)
+    unittest.addModuleCleanup(database.connection_pool.close_all)
+    unittest.addModuleCleanup(flush_database_logging)
+    database.init_database()
+
+
+class TestAsyncIngestionEngine(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = StandInAPIServer(tweets_per_page=3)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def make_engine(self, **options):
+        options.setdefault('rate_limiters', {})
+        return AsyncIngestionEngine(
+            bearer_token="token", news_api_key="key",
+            twitter_base_url=self.server.twitter_base_url,
+            news_base_url=self.server.news_base_url,
+            backoff_factor=0.01, **options
+        )
+
+    async def test_fetch_all_keywords(self):
+        keywords = ["earthquake", "flood", "fire"]
+        async with self.make_engine(max_query_length=None) as engine:
+            results = await engine.fetch_all(keywords)
+        self.assertEqual(list(results), keywords)
+        self.assertTrue(all(len(tweets) == 3 for tweets in results.values()))
+        self.assertEqual(self.server.request_count, 3)
+
+    async def test_retries_retryable_status(self):
+        self.server.fail_next(2, status=503)
+        async with self.make_engine() as engine:
+            tweets = await engine.fetch_tweets_for_keyword("storm")
+        self.assertEqual(len(tweets), 3)
+        self.assertEqual(self.server.request_count, 3)
+
+    async def test_rate_limited_retry_waits_for_the_limiter(self):
+        limiter = TokenBucket('twitter', rate=100, capacity=10)
+        self.server.fail_next(1, status=429, headers={'Retry-After': '0.3'})
+        start = time.monotonic()
+        async with self.make_engine(rate_limiters={'twitter': limiter}) as engine:
+            tweets = await engine.fetch_tweets_for_keyword("storm")
+        self.assertEqual(len(tweets), 3)
+        self.assertEqual(self.server.request_count, 2)
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+
+    async def test_gives_up_after_max_retries(self):
+        self.server.fail_next(3, status=500)
+        async with self.make_engine(max_retries=2) as engine:
+            tweets = await engine.fetch_tweets_for_keyword("storm")
+        self.assertEqual(tweets, [])
+
+    async def test_process_page_and_news(self):
+        def process_page(keywords, tweets):
+            return {keyword: [{'id': tweet['id'], 'keyword': keyword}
+                              for tweet in tweets]
+                    for keyword in keywords}
+
+        async with self.make_engine(process_page=process_page) as engine:
+            tweets = await engine.fetch_tweets_for_keyword("flood")
+            articles = await engine.check_news("flood")
+        self.assertEqual({tweet['keyword'] for tweet in tweets}, {"flood"})
+        self.assertEqual(len(articles), 3)
+
+    async def test_incremental_fetch_uses_since_id(self):
+        async with self.make_engine() as engine:
+            first = await engine.fetch_tweets_for_keyword("quake")
+            second = await engine.fetch_tweets_for_keyword("quake")
+        self.assertEqual([t['id'] for t in first], ["3", "2", "1"])
+        self.assertEqual([t['id'] for t in second], ["6", "5", "4"])
+        self.assertEqual(engine.since_ids["quake"], "6")
+        self.assertEqual(self.server.requests[1]['query']['since_id'], "3")
+
+    async def test_follows_next_token_pages(self):
+        self.server.tweets_per_page = 0
+        self.server.publish("quake", 25)
+        async with self.make_engine(since_ids={"quake": "5"}, page_size=10) as engine:
+            tweets = await engine.fetch_tweets_for_keyword("quake")
+        self.assertEqual(len(tweets), 20)
+        self.assertEqual(self.server.request_count, 2)
+        self.assertEqual(engine.since_ids["quake"], "25")
+
+    async def test_page_limit_and_failed_fetch_keep_mark(self):
+        self.server.tweets_per_page = 0
+        self.server.publish("quake", 30)
+        engine = self.make_engine(since_ids={"quake": "1"}, page_size=10, max_pages=2)
+        async with engine:
+            tweets = await engine.fetch_tweets_for_keyword("quake")
+            self.assertEqual(len(tweets), 20)
+            self.assertEqual(engine.since_ids["quake"], "30")
+
+            self.server.publish("quake", 15)
+            self.server.requests.clear()
+            self.server.fail_next(1, status=404)
+            engine.max_pages = 5
+            await engine.fetch_tweets_for_keyword("quake")
+        self.assertEqual(engine.since_ids["quake"], "30")
+
+    async def test_packed_query_split_per_keyword(self):
+        self.server.tweets_per_page = 6
+        async with self.make_engine() as engine:
+            results = await engine.fetch_all(["flood", "fire", "storm"])
+        self.assertEqual(self.server.request_count, 1)
+        self.assertEqual(self.server.requests[0]['query']['query'],
+                         "flood OR fire OR storm")
+        self.assertEqual({k: len(v) for k, v in results.items()},
+                         {"flood": 2, "fire": 2, "storm": 2})
+        self.assertEqual(set(engine.since_ids.values()), {"6"})
+
+
+class TestSyncWrapper(unittest.TestCase):
+    def test_run_ingestion_cycle(self):
+        with StandInAPIServer(tweets_per_page=4) as server:
+            results = run_ingestion_cycle(
+                ["tsunami", "cyclone"], bearer_token="token",
+                twitter_base_url=server.twitter_base_url, rate_limiters={}
+            )
+        self.assertEqual({k: len(v) for k, v in results.items()},
+                         {"tsunami": 2, "cyclone": 2})
+
+    def test_backoff_matches_urllib3(self):
+        self.assertEqual([backoff_delay(n) for n in range(1, 5)], [0.0, 1.0, 2.0, 4.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
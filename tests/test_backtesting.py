@@ -0,0 +1,178 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from core import backtesting, database
+from core.backtesting import (
+    BacktestData, evaluate, expand_grid, generate_series, run_backtest, run_grid
+)
+
+
+class TestEvaluate(unittest.TestCase):
+    def test_precision_recall_and_delay(self):
+        counts = np.zeros((2, 40))
+        data = BacktestData(["a", "b"], list(range(40)), counts,
+                            events=[(0, 10, 20), (1, 5, 8)])
+        flags = np.zeros(counts.shape, dtype=bool)
+        flags[0, 13] = flags[0, 14] = True   # Detected 3 cycles in
+        flags[0, 30] = True                   # False alarm
+        flags[1, 8 + backtesting.GRACE_CYCLES] = True  # Just past the grace period
+
+        result = evaluate(data, flags)
+        self.assertEqual(result['alerts'], 4)
+        self.assertEqual(result['precision'], 0.5)
+        self.assertEqual(result['recall'], 0.5)
+        self.assertEqual(result['median_delay'], 3.0)
+
+    def test_without_events(self):
+        data = BacktestData(["a"], [0, 1], np.zeros((1, 2)))
+        result = evaluate(data, np.array([[False, True]]))
+        self.assertEqual(result['alerts'], 1)
+        self.assertIsNone(result['precision'])
+        self.assertIsNone(result['recall'])
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.data = generate_series(keywords=6, cycles=600, events_per_keyword=2,
+                                    seed=3)
+
+    def test_generated_events(self):
+        self.assertEqual(self.data.counts.shape, (6, 600))
+        self.assertEqual(len(self.data.events), 12)
+        for row, start, end in self.data.events:
+            self.assertLess(start, end)
+            self.assertLessEqual(end, 600)
+
+    def test_scalar_and_vectorized_detectors_agree(self):
+        params = {'window_size': 15, 'ewma_alpha': 0.3, 'z_threshold': 2.5}
+        scalar = run_backtest(self.data, 'zscore', params)
+        vectorized = run_backtest(self.data, 'vectorized', params)
+        for key in ('alerts', 'precision', 'recall', 'median_delay'):
+            self.assertEqual(scalar[key], vectorized[key], key)
+        self.assertEqual(vectorized['points'], 3600)
+        self.assertGreater(vectorized['points_per_second'], 0)
+
+    def test_grid_in_worker_processes(self):
+        grid = [('cusum', {'threshold': [4.0, 8.0]}),
+                ('adaptive', {'base_threshold': [5]})]
+        self.assertEqual(expand_grid(grid), [('cusum', {'threshold': 4.0}),
+                                             ('cusum', {'threshold': 8.0}),
+                                             ('adaptive', {'base_threshold': 5})])
+
+        parallel = run_grid(self.data, grid, workers=2)
+        serial = run_grid(self.data, grid, workers=1)
+
+        def strip(results):
+            # Timings differ between runs
+            return [{k: v for k, v in r.items()
+                     if k not in ('seconds', 'points_per_second')}
+                    for r in results]
+
+        self.assertEqual(strip(parallel), strip(serial))
+        self.assertGreater(parallel[0]['recall'], 0.5)
+
+
+class TestLoadMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_path = database.DATABASE_PATH
+        database.DATABASE_PATH = os.path.join(self.tmpdir.name, "test.db")
+        database.init_database()
+
+    def tearDown(self):
+        database.connection_pool.close_all()
+        database.DATABASE_PATH = self.original_path
+        self.tmpdir.cleanup()
+
+    def test_metrics_pivoted_by_minute(self):
+        rows = [("flood", 3, "2026-05-01 10:00:05"),
+                ("fire", 7, "2026-05-01 10:00:40"),
+                ("flood", 4, "2026-05-01 10:01:02"),
+                ("flood", 9, "2026-05-01 10:02:01")]
+        with database.get_db_connection() as conn:
+            conn.executemany("""
+                INSERT INTO tweet_metrics
+                    (keyword, count, window_start, window_end, created_at)
+                VALUES (?, ?, '', '', ?)
+            """, rows)
+            conn.commit()
+        labels = os.path.join(self.tmpdir.name, "events.csv")
+        with open(labels, 'w') as f:
+            f.write("keyword,start,end\n"
+                    "flood,2026-05-01 10:01:00,2026-05-01 10:03:00\n"
+                    "quake,2026-05-01,2026-05-02\n")
+
+        with self.assertLogs(backtesting.logger, 'WARNING'):
+            data = backtesting.load_metrics(labels_path=labels)
+
+        self.assertEqual(data.keywords, ["flood", "fire"])
+        self.assertEqual(data.timestamps[0], datetime(2026, 5, 1, 10, 0))
+        np.testing.assert_array_equal(data.counts, [[3, 4, 9], [7, np.nan, np.nan]])
+        self.assertEqual(data.events, [(0, 1, 3)])
+
+
+class TestStreamingReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_path = database.DATABASE_PATH
+        database.DATABASE_PATH = os.path.join(self.tmpdir.name, "test.db")
+        database.init_database()
+
+        generated = generate_series(keywords=4, cycles=240, events_per_keyword=1,
+                                    seed=5)
+        with database.get_db_connection() as conn:
+            conn.executemany("""
+                INSERT INTO tweet_metrics
+                (keyword, count, window_start, window_end, created_at)
+                VALUES (?, ?, '', '', ?)
+            """, [(keyword, int(count), str(timestamp))
+                  for cycle, timestamp in enumerate(generated.timestamps)
+                  for keyword, count in zip(generated.keywords,
+                                            generated.counts[:, cycle])])
+            conn.commit()
+
+        self.labels = os.path.join(self.tmpdir.name, "events.csv")
+        with open(self.labels, 'w') as f:
+            f.write("keyword,start,end\n")
+            for row, start, end in generated.events:
+                f.write(f"{generated.keywords[row]},{generated.timestamps[start]},"
+                        f"{generated.timestamps[end - 1]}\n")
+
+    def tearDown(self):
+        database.connection_pool.close_all()
+        database.DATABASE_PATH = self.original_path
+        self.tmpdir.cleanup()
+
+    def test_batches_do_not_split_cycles(self):
+        whole = list(backtesting.stream_metrics())
+        self.assertEqual(len(whole), 240)
+        self.assertEqual(list(backtesting.stream_metrics(batch_size=3)), whole)
+
+    def test_matches_dense_replay(self):
+        grid = [('vectorized', {'z_threshold': [2.0, 3.0]}),
+                ('cusum', {'threshold': [4.0]}),
+                ('zscore', {'window_size': [15]}),
+                ('adaptive', {'base_threshold': [5]})]
+        keys = ('method', 'params', 'alerts', 'precision', 'recall', 'median_delay',
+                'points')
+
+        def graded(results):
+            return [{key: result[key] for key in keys} for result in results]
+
+        dense_data = backtesting.load_metrics(labels_path=self.labels)
+        dense = run_grid(dense_data, grid, workers=1)
+        streamed = backtesting.replay_metrics(grid, labels_path=self.labels, workers=1)
+        self.assertEqual(graded(streamed), graded(dense))
+        self.assertGreater(streamed[0]['recall'], 0)
+
+        parallel = backtesting.replay_metrics(grid, labels_path=self.labels,
+                                              workers=2)
+        self.assertEqual(graded(parallel), graded(streamed))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+import os
+import tempfile
+import time
+import unittest
+from functools import partial
+from unittest import mock
+
+from core import crowdsense_enhanced, database
+from core.anomaly_detection import (
+    ANOMALY_METHODS, VectorizedAnomalyDetector, create_anomaly_detector
+)
+from core.snapshot_cache import SnapshotCache
+from utils.logging_config import flush_database_logging
+
+
+def slow_fetch(keywords):
+    time.sleep(0.1)
+    return {keyword: [{'id': f"{keyword}-{i}", 'keyword': keyword}
+                      for i in range(len(keyword) % 3)]
+            for keyword in keywords}
+
+
+class TestConcurrentFetching(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        patches = [
+            mock.patch.object(database, 'DATABASE_PATH',
+                              os.path.join(tmpdir.name, "test.db")),
+            mock.patch.object(crowdsense_enhanced, 'fetch_tweets_for_query',
+                              side_effect=slow_fetch),
+            # One query per keyword, so there is something to fetch concurrently
+            mock.patch.object(crowdsense_enhanced, 'TWITTER_MAX_QUERY_LENGTH', None),
+            mock.patch.object(crowdsense_enhanced, 'analyze_tweet_anomalies',
+                              side_effect=lambda counts: {k: (0.0, 0.0, False)
+                                                          for k in counts}),
+            mock.patch.object(crowdsense_enhanced, 'log_tweet_processed'),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(database.connection_pool.close_all)
+        self.addCleanup(flush_database_logging)
+        database.init_database()
+        crowdsense_enhanced.tweet_buckets.clear()
+
+    def run_cycle(self, workers):
+        start = time.perf_counter()
+        results = crowdsense_enhanced.fetch_and_analyze_tweets(max_workers=workers)
+        results.pop('timestamp')
+        return results, time.perf_counter() - start
+
+    def test_concurrent_matches_serial(self):
+        serial, serial_time = self.run_cycle(1)
+        keywords = len(crowdsense_enhanced.DISASTER_KEYWORDS)
+        concurrent, concurrent_time = self.run_cycle(keywords)
+        self.assertEqual(serial, concurrent)
+        self.assertEqual(serial['keywords_processed'], keywords)
+        self.assertLess(concurrent_time, serial_time / 2)
+
+    def test_fetch_error_counted(self):
+        def failing_fetch(keywords):
+            if 'flood' in keywords:
+                raise RuntimeError("boom")
+            return {keyword: [] for keyword in keywords}
+
+        crowdsense_enhanced.fetch_tweets_for_query.side_effect = failing_fetch
+        results, _ = self.run_cycle(4)
+        self.assertEqual(results['errors'], 1)
+        self.assertEqual(results['keywords_processed'],
+                         len(crowdsense_enhanced.DISASTER_KEYWORDS) - 1)
+
+    def test_keywords_packed_into_one_query(self):
+        with mock.patch.object(crowdsense_enhanced, 'TWITTER_MAX_QUERY_LENGTH', 512):
+            serial, _ = self.run_cycle(1)
+        crowdsense_enhanced.fetch_tweets_for_query.assert_called_once_with(
+            crowdsense_enhanced.DISASTER_KEYWORDS)
+        self.assertEqual(serial['keywords_processed'],
+                         len(crowdsense_enhanced.DISASTER_KEYWORDS))
+
+    def test_cycle_refreshes_watched_dashboard(self):
+        cache = SnapshotCache(crowdsense_enhanced.get_dashboard_data, ttl=3600)
+        with mock.patch.object(crowdsense_enhanced, 'dashboard_cache', cache):
+            self.run_cycle(1)
+            self.assertEqual(cache.builds, 0)  # Nobody is watching yet
+
+            data = crowdsense_enhanced.get_cached_dashboard_data()
+            self.assertEqual(data['snapshot_age_seconds'], 0.0)
+            self.assertEqual(data['volumes']['flood']['5m'], 2)
+            self.run_cycle(1)
+            data = crowdsense_enhanced.get_cached_dashboard_data()
+        self.assertEqual(cache.builds, 2)
+        self.assertEqual(data['volumes']['flood']['5m'], 4)
+
+    def test_failed_dashboard_build_not_cached(self):
+        build = partial(crowdsense_enhanced.get_dashboard_data, raise_errors=True)
+        cache = SnapshotCache(build, ttl=3600)
+        with mock.patch.object(crowdsense_enhanced, 'dashboard_cache', cache), \
+                mock.patch.object(crowdsense_enhanced, 'log_error') as log_error:
+            with mock.patch.object(crowdsense_enhanced, 'get_system_stats',
+                                   side_effect=RuntimeError("database is locked")):
+                data = crowdsense_enhanced.get_cached_dashboard_data()
+            self.assertEqual(data['status'], 'ERROR')
+            self.assertEqual(cache.builds, 0)
+            log_error.assert_called_once()
+
+            data = crowdsense_enhanced.get_cached_dashboard_data()
+        self.assertEqual(data['status'], 'SAFE')
+        self.assertEqual(cache.builds, 1)
+
+
+class TestQueryPageSplit(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        no_location = {'primary_location': None, 'latitude': None, 'longitude': None}
+        patches = [
+            mock.patch.object(database, 'DATABASE_PATH',
+                              os.path.join(tmpdir.name, "test.db")),
+            mock.patch.object(crowdsense_enhanced, 'extract_locations_from_tweets',
+                              side_effect=lambda texts: [no_location] * len(texts)),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(database.connection_pool.close_all)
+        self.addCleanup(flush_database_logging)
+        database.init_database()
+
+    def test_tweet_shared_by_two_query_groups(self):
+        shared = {'id': '10', 'text': 'Storm sparks a fire downtown'}
+        page_a = [shared, {'id': '11', 'text': 'flood warning'}, shared]
+        page_b = [{'id': '12', 'text': 'fire crews out'}, shared]
+
+        first = crowdsense_enhanced.process_query_page(['flood', 'storm'], page_a)
+        second = crowdsense_enhanced.process_query_page(['fire', 'tornado'], page_b)
+
+        def ids(split):
+            return {keyword: [record['id'] for record in records]
+                    for keyword, records in split.items()}
+
+        self.assertEqual(ids(first), {'flood': ['11'], 'storm': ['10']})
+        self.assertEqual(ids(second), {'fire': ['12', '10'], 'tornado': []})
+        self.assertEqual(database.get_system_stats()['total_tweets'], 3)
+
+
+class TestBatchAnomalyAnalysis(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        patches = [
+            mock.patch.object(database, 'DATABASE_PATH',
+                              os.path.join(tmpdir.name, "test.db")),
+            mock.patch.object(
+                crowdsense_enhanced, 'anomaly_detector',
+                VectorizedAnomalyDetector(window_size=5, z_threshold=2.0)),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(database.connection_pool.close_all)
+        self.addCleanup(flush_database_logging)
+        database.init_database()
+
+    def test_cycle_scored_and_saved_per_keyword(self):
+        cycles = ({'flood': 2, 'fire': 5}, {'flood': 3, 'fire': 5},
+                  {'flood': 2, 'fire': 6})
+        for counts in cycles:
+            crowdsense_enhanced.analyze_tweet_anomalies(counts)
+        with mock.patch.object(crowdsense_enhanced,
+                               'log_anomaly_detected') as log_anomaly:
+            scores = crowdsense_enhanced.analyze_tweet_anomalies(
+                {'flood': 40, 'fire': 5})
+
+        self.assertTrue(scores['flood'][2])
+        self.assertFalse(scores['fire'][2])
+        log_anomaly.assert_called_once_with('flood', scores['flood'][0], 40)
+        self.assertEqual(len(database.get_tweet_metrics_history('flood')), 4)
+
+
+class TestEveryAnomalyMethod(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+        patches = [
+            mock.patch.object(crowdsense_enhanced, 'warm_ner_model'),
+            mock.patch.object(crowdsense_enhanced, 'log_error'),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_pipeline(self, method):
+        keywords = crowdsense_enhanced.DISASTER_KEYWORDS
+        patches = [
+            mock.patch.object(database, 'DATABASE_PATH',
+                              os.path.join(self.tmpdir, f"{method}.db")),
+            mock.patch.object(crowdsense_enhanced, 'DETECTOR_SNAPSHOT_PATH',
+                              os.path.join(self.tmpdir, f"{method}.npz")),
+            mock.patch.object(crowdsense_enhanced, 'anomaly_detector',
+                              create_anomaly_detector(method, keywords)),
+        ]
+        for patcher in patches:
+            patcher.start()
+        try:
+            crowdsense_enhanced.initialize_system()
+            for cycle in range(20):
+                crowdsense_enhanced.analyze_tweet_anomalies(
+                    {keyword: 3 + cycle % 3 for keyword in keywords})
+            scores = crowdsense_enhanced.analyze_tweet_anomalies(
+                {keyword: 200 if keyword == 'flood' else 4 for keyword in keywords})
+
+            crowdsense_enhanced.save_detector_snapshot()
+            replayed = crowdsense_enhanced.restore_detector_state()
+        finally:
+            flush_database_logging()
+            database.connection_pool.close_all()
+            for patcher in reversed(patches):
+                patcher.stop()
+        return scores, replayed
+
+    def test_pipeline_runs_with_every_method(self):
+        for method in ANOMALY_METHODS:
+            with self.subTest(method=method):
+                scores, replayed = self.run_pipeline(method)
+                crowdsense_enhanced.log_error.assert_not_called()
+                self.assertTrue(scores['flood'][2])
+                self.assertFalse(scores['fire'][2])
+                self.assertEqual(replayed, 0)  # Restored from the snapshot
+
+
+if __name__ == "__main__":
+    unittest.main()
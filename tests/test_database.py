@@ -0,0 +1,235 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from core import database
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Points core.database at a throwaway database file"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_path = database.DATABASE_PATH
+        database.DATABASE_PATH = os.path.join(self.tmpdir.name, "test.db")
+        database.init_database()
+
+    def tearDown(self):
+        database.connection_pool.close_all()
+        database.DATABASE_PATH = self.original_path
+        self.tmpdir.cleanup()
+
+
+class TestConnectionPool(DatabaseTestCase):
+    def test_connection_reused_within_thread(self):
+        with database.get_db_connection() as first:
+            pass
+        with database.get_db_connection() as second:
+            pass
+        self.assertIs(first, second)
+
+    def test_threads_get_separate_connections(self):
+        connections = []
+
+        def borrow():
+            with database.get_db_connection() as conn:
+                connections.append(conn)
+
+        worker = threading.Thread(target=borrow)
+        worker.start()
+        worker.join()
+        borrow()
+        self.assertIsNot(connections[0], connections[1])
+
+    def test_pragmas_applied(self):
+        with database.get_db_connection() as conn:
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+        self.assertEqual(journal_mode, "wal")
+        self.assertEqual(synchronous, 1)  # NORMAL
+
+    def test_uncommitted_work_rolled_back(self):
+        with database.get_db_connection() as conn:
+            conn.execute("INSERT INTO alerts (keyword, message, tweet_count) "
+                         "VALUES ('x', 'y', 1)")
+        self.assertEqual(database.get_system_stats()['total_alerts'], 0)
+
+    def test_helpers_round_trip(self):
+        database.save_alert("flood", "Flood activity detected", 12)
+        self.assertTrue(database.save_tweet(
+            {'id': '1', 'keyword': 'flood', 'text': 'water'}))
+        stats = database.get_system_stats()
+        self.assertEqual(stats['total_alerts'], 1)
+        self.assertEqual(stats['total_tweets'], 1)
+
+
+class TestBulkTweetIngestion(DatabaseTestCase):
+    def test_returns_only_new_ids(self):
+        database.save_tweet({'id': '1', 'keyword': 'fire', 'text': 'smoke'})
+        records = [
+            {'id': '1', 'keyword': 'fire', 'text': 'smoke'},
+            {'id': '2', 'keyword': 'fire', 'text': 'flames'},
+            {'id': '3', 'keyword': 'fire', 'text': 'evacuate'},
+            {'id': '2', 'keyword': 'fire', 'text': 'flames again'},
+        ]
+        self.assertEqual(database.save_tweets_bulk(records), ['2', '3'])
+        self.assertEqual(database.get_system_stats()['total_tweets'], 3)
+
+    def test_empty_page(self):
+        self.assertEqual(database.save_tweets_bulk([]), [])
+
+
+class TestSchemaMigrations(DatabaseTestCase):
+    def test_migrations_recorded_and_idempotent(self):
+        latest = database.SCHEMA_MIGRATIONS[-1][0]
+        with database.get_db_connection() as conn:
+            self.assertEqual(database.get_schema_version(conn), latest)
+            self.assertEqual(database.apply_migrations(conn), latest)
+
+    def test_hot_queries_use_indexes(self):
+        statements = []
+        with database.get_db_connection() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            database.get_recent_alerts()
+            database.get_recent_tweets()
+            database.get_tweets_with_location()
+            database.get_tweet_metrics_history("flood")
+            database.get_system_stats()
+        finally:
+            with database.get_db_connection() as conn:
+                conn.set_trace_callback(None)
+
+        queries = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        self.assertEqual(len(queries), 7)
+        with database.get_db_connection() as conn:
+            for query in queries:
+                rows = conn.execute("EXPLAIN QUERY PLAN " + query)
+                plan = " ".join(row[3] for row in rows)
+                self.assertIn("INDEX", plan, query)
+                self.assertNotIn("TEMP B-TREE", plan, query)
+
+
+class TestKeywordSinceIds(DatabaseTestCase):
+    def test_since_id_upsert(self):
+        self.assertEqual(database.get_keyword_since_ids(), {})
+        database.save_keyword_since_id("flood", "100")
+        database.save_keyword_since_id("flood", "250")
+        database.save_keyword_since_id("fire", "7")
+        self.assertEqual(database.get_keyword_since_ids(),
+                         {"flood": "250", "fire": "7"})
+
+
+class TestTweetMetricsHistories(DatabaseTestCase):
+    def add_metrics(self, keyword, counts, minutes_ago):
+        with database.get_db_connection() as conn:
+            conn.executemany("""
+                INSERT INTO tweet_metrics
+                    (keyword, count, window_start, window_end, created_at)
+                VALUES (?, ?, '', '', datetime('now', ?))
+            """, [(keyword, count, f'-{minutes} minutes')
+                  for count, minutes in zip(counts, minutes_ago)])
+            conn.commit()
+
+    def test_matches_per_keyword_history(self):
+        self.add_metrics("flood", [1, 2, 3, 4], [40, 30, 20, 10])
+        self.add_metrics("fire", [9, 8], [25, 5])
+        self.add_metrics("storm", [7], [60 * 30])  # Outside the window
+
+        histories = database.get_tweet_metrics_histories(
+            ["flood", "fire", "storm", "quiet", "flood"], hours=24)
+        self.assertEqual(set(histories), {"flood", "fire"})
+        for keyword in ("flood", "fire"):
+            self.assertEqual(histories[keyword],
+                             database.get_tweet_metrics_history(keyword, hours=24))
+
+    def test_change_score_saved(self):
+        database.save_tweet_metrics("flood", 12, "start", "end", z_score=1.5,
+                                    change_score=6.2)
+        database.save_tweet_metrics("fire", 3, "start", "end")
+        flood = database.get_tweet_metrics_history("flood")[0]
+        self.assertEqual(flood['change_score'], 6.2)
+        self.assertIsNone(database.get_tweet_metrics_history("fire")[0]['change_score'])
+
+    def test_limit_keeps_newest_rows(self):
+        self.add_metrics("flood", [1, 2, 3, 4], [40, 30, 20, 10])
+        histories = database.get_tweet_metrics_histories(["flood"], limit=2)
+        self.assertEqual([row['count'] for row in histories["flood"]], [4, 3])
+        self.assertEqual(database.get_tweet_metrics_histories([]), {})
+
+
+class TestVolumeRollups(DatabaseTestCase):
+    def add_tweets(self, keyword, minutes_ago):
+        with database.get_db_connection() as conn:
+            conn.executemany("""
+                INSERT INTO tweets (tweet_id, keyword, text, created_at)
+                VALUES (?, ?, 'text', datetime('now', ?))
+            """, [(f"{keyword}-{i}", keyword, f'-{minutes} minutes')
+                  for i, minutes in enumerate(minutes_ago)])
+            conn.commit()
+
+    def test_counters_follow_inserts_and_deletes(self):
+        self.add_tweets("flood", [0, 5, 90, 60 * 30])
+        database.save_tweets_bulk([{'id': '1', 'keyword': 'fire', 'text': 'smoke'},
+                                   {'id': '1', 'keyword': 'fire', 'text': 'duplicate'}])
+        database.save_alert("flood", "Flood activity detected", 12)
+        self.assertEqual(database.get_system_stats(),
+                         {'total_alerts': 1, 'total_tweets': 5,
+                          'alerts_24h': 1, 'tweets_1h': 3})
+
+        with database.get_db_connection() as conn:
+            conn.execute(
+                "DELETE FROM tweets WHERE created_at < datetime('now', '-1 day')")
+            conn.commit()
+        self.assertEqual(database.get_stat_counters()['total_tweets'], 4)
+
+    def test_day_window_reads_hourly_buckets(self):
+        with database.get_db_connection() as conn:
+            conn.executemany("""
+                INSERT INTO alerts (keyword, message, tweet_count, created_at)
+                VALUES ('storm', 'Storm activity detected', 5, datetime('now', ?))
+            """, [(f'-{minutes} minutes',) for minutes in (1, 90, 300, 1430, 1450)])
+            # Whole hours inside the window must come from the hourly rollups
+            conn.execute("""
+                DELETE FROM volume_rollups
+                WHERE granularity = 'minute' AND bucket < datetime('now', '-2 hours')
+                  AND bucket > datetime('now', '-20 hours')
+            """)
+            conn.commit()
+        self.assertEqual(database.get_system_stats()['alerts_24h'], 4)
+
+    def test_volume_series(self):
+        self.add_tweets("flood", [0, 0, 60 * 5])
+        self.add_tweets("fire", [0])
+
+        hourly = database.get_volume_series('hour', hours=1)
+        self.assertEqual([(row['keyword'], row['count']) for row in hourly],
+                         [("fire", 1), ("flood", 2)])
+        daily = database.get_volume_series('day', hours=24 * 2, keyword="flood")
+        self.assertEqual(sum(row['count'] for row in daily), 3)
+        self.assertEqual(database.get_volume_series('minute', kind='alerts'), [])
+        with self.assertRaises(ValueError):
+            database.get_volume_series('week')
+
+    def test_migration_backfills_existing_rows(self):
+        self.add_tweets("flood", [0, 1, 120])
+        database.save_alert("storm", "Storm activity detected", 5)
+        expected = database.get_volume_series('minute', hours=3)
+        with database.get_db_connection() as conn:
+            for name in ("tweets_rollup_insert", "tweets_rollup_delete",
+                         "alerts_rollup_insert", "alerts_rollup_delete"):
+                conn.execute(f"DROP TRIGGER {name}")
+            conn.execute("DROP TABLE volume_rollups")
+            conn.execute("DROP TABLE stat_counters")
+            conn.execute("PRAGMA user_version = 4")
+            conn.commit()
+            database.apply_migrations(conn)
+
+        self.assertEqual(database.get_volume_series('minute', hours=3), expected)
+        self.assertEqual(database.get_stat_counters(),
+                         {'total_alerts': 1, 'total_tweets': 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
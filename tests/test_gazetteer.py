@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from core import gazetteer
+from core.gazetteer import Gazetteer, normalize_name
+
+PLACES = [
+    {'name': "Springfield", 'latitude': 37.2, 'longitude': -93.3,
+     'country_code': "US", 'population': 169176},
+    {'name': "Springfield", 'latitude': 39.8, 'longitude': -89.6,
+     'country_code': "US", 'population': 114394},
+    {'name': "São Paulo", 'alternate_names': "Sao Paulo,SP",
+     'latitude': -23.5, 'longitude': -46.6, 'country_code': "BR",
+     'population': 10021295},
+    {'name': "San Francisco", 'alternate_names': ["San Fran"],
+     'latitude': 37.8, 'longitude': -122.4, 'population': 864816},
+    {'name': "Santa Fe", 'latitude': 35.7, 'longitude': -105.9, 'population': 84683},
+]
+
+
+class GazetteerBehaviour:
+    """Checks shared by the marisa-trie and dict indexes"""
+
+    def test_lookup_and_aliases(self):
+        self.assertEqual(self.gazetteer.geocode("SAN FRAN"), (37.8, -122.4))
+        self.assertEqual(self.gazetteer.lookup("sao paulo")['name'], "São Paulo")
+        self.assertIn("São  Paulo!", self.gazetteer)
+        self.assertNotIn("SP", self.gazetteer)  # Too short to index as an alias
+        self.assertIsNone(self.gazetteer.geocode("Atlantis"))
+
+    def test_population_ranked_disambiguation(self):
+        self.assertEqual(self.gazetteer.geocode("Springfield"), (37.2, -93.3))
+        candidates = self.gazetteer.candidates("springfield")
+        self.assertEqual([p['population'] for p in candidates], [169176, 114394])
+
+    def test_prefix_completion(self):
+        self.assertEqual(self.gazetteer.complete("San"),
+                         ["san fran", "san francisco", "santa fe"])
+        self.assertEqual(self.gazetteer.complete("sa", limit=3),
+                         ["sao paulo", "san fran", "san francisco"])
+        self.assertEqual(self.gazetteer.complete("xyz"), [])
+
+
+class TestTrieGazetteer(GazetteerBehaviour, unittest.TestCase):
+    def setUp(self):
+        if gazetteer.marisa_trie is None:
+            self.skipTest("marisa-trie not installed")
+        self.gazetteer = Gazetteer(PLACES)
+
+
+class TestDictGazetteer(GazetteerBehaviour, unittest.TestCase):
+    def setUp(self):
+        with mock.patch.object(gazetteer, 'marisa_trie', None):
+            self.gazetteer = Gazetteer(PLACES)
+
+
+class TestGazetteerFiles(unittest.TestCase):
+    def test_bundled_gazetteer(self):
+        bundled = Gazetteer.load()
+        self.assertGreater(len(bundled), 100)
+        self.assertEqual(bundled.lookup("Bombay")['name'], "Mumbai")
+        self.assertEqual(bundled.lookup("Paris")['country_code'], "FR")
+
+    def test_geonames_dump(self):
+        row = ["1275339", "Mumbai", "Mumbai", "Bombay,Bombei", "19.07283", "72.88261",
+               "P", "PPLA", "IN", "", "16", "", "", "", "12691836", "", "8",
+               "Asia/Kolkata", "2019-08-22"]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cities.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\t".join(row) + "\n")
+            loaded = Gazetteer.load(path)
+
+        self.assertEqual(loaded.lookup("bombei"),
+                         {'name': "Mumbai", 'latitude': 19.07283, 'longitude': 72.88261,
+                          'country_code': "IN", 'feature_code': "PPLA",
+                          'population': 12691836})
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("  Bogotá,  D.C. "), "bogota, d.c")
+
+
+if __name__ == "__main__":
+    unittest.main()
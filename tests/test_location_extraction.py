@@ -0,0 +1,287 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import spacy
+from spacy.language import Language
+
+from core import database, location_extraction, ner_pool
+from core.ner_pool import NERWorkerPool
+from utils.logging_config import flush_database_logging, metrics
+from utils.rate_limiter import TokenBucket
+
+component_calls = []
+
+
+@Language.component("test_record_calls")
+def record_calls(doc):
+    component_calls.append(doc.text)
+    return doc
+
+
+def build_pipeline():
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler", name="ner")
+    ruler.add_patterns([
+        {"label": "GPE", "pattern": "Mumbai"},
+        {"label": "GPE", "pattern": [{"LOWER": "san"}, {"LOWER": "francisco"}]},
+        {"label": "LOC", "pattern": "Bay Area"},
+        {"label": "GPE", "pattern": "Bandra"},
+        {"label": "ORG", "pattern": "NASA"},
+    ])
+    nlp.add_pipe("test_record_calls")
+    return nlp
+
+
+class TestBatchedNER(unittest.TestCase):
+    def setUp(self):
+        component_calls.clear()
+        self.nlp = build_pipeline()
+        patcher = mock.patch.object(location_extraction, 'get_nlp',
+                                    return_value=self.nlp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.extractor = location_extraction.LocationExtractor()
+
+    def test_batch_matches_single_text(self):
+        texts = [
+            "Flooding in Mumbai again, mumbai trains stopped",
+            "Earthquake near San Francisco and the Bay Area",
+            "NASA satellite images show the storm",
+        ]
+        batch = self.extractor.extract_locations_batch(texts, batch_size=2)
+        self.assertEqual(batch, [["Mumbai"], ["San Francisco", "Bay Area"], []])
+        self.assertEqual(batch, [self.extractor.extract_locations_from_text(t)
+                                 for t in texts])
+
+    def test_only_ner_runs(self):
+        self.assertEqual(location_extraction._ner_disabled_components(self.nlp),
+                         ["test_record_calls"])
+        self.extractor.extract_locations_batch(["Flooding in Mumbai"])
+        self.assertEqual(component_calls, [])
+
+    def test_geocode_batch(self):
+        with mock.patch.object(self.extractor, 'geocode_location',
+                               return_value=(19.05, 72.84)) as geocode:
+            results = self.extractor.extract_and_geocode_batch(
+                ["Waterlogging in Bandra", "Flooding in Mumbai", "No place here"])
+
+        # Gazetteer places resolve offline; only the unknown one goes online
+        geocode.assert_called_once_with("Bandra")
+        self.assertEqual([r['primary_location'] for r in results],
+                         ["Bandra", "Mumbai", None])
+        self.assertEqual((results[0]['latitude'], results[0]['longitude']),
+                         (19.05, 72.84))
+        self.assertEqual((results[1]['latitude'], results[1]['longitude']),
+                         (19.07283, 72.88261))
+
+    def test_extraction_modes(self):
+        text = "Flooding in Bandra, Mumbai. Breaking news from Springfield"
+        modes = {
+            mode: location_extraction.LocationExtractor(mode=mode)
+            .extract_locations_from_text(text)
+            for mode in location_extraction.EXTRACTION_MODES
+        }
+        self.assertEqual(modes, {
+            'ner': ["Bandra", "Mumbai"],
+            'gazetteer': ["Mumbai", "Springfield"],
+            'hybrid': ["Mumbai", "Springfield", "Bandra"],
+        })
+        with self.assertRaises(ValueError):
+            location_extraction.LocationExtractor(mode="psychic")
+
+    def test_regex_fallback_without_model(self):
+        with mock.patch.object(location_extraction, 'get_nlp', return_value=None):
+            batch = self.extractor.extract_locations_batch(["Flooding in Springfield"])
+        self.assertEqual(batch, [["Springfield"]])
+
+
+class TestNERWorkerPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        nlp = build_pipeline()
+        nlp.remove_pipe("test_record_calls")  # Not registered in the workers
+        nlp.to_disk(cls.tmpdir.name)
+
+        cls.pool = NERWorkerPool(cls.tmpdir.name, workers=2, chunk_size=2)
+        cls.pool.warm_up()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        self.extractor = location_extraction.LocationExtractor(mode='ner',
+                                                               ner_workers=0)
+        self.extractor.ner_pool = self.pool
+        self.texts = [f"Flooding in Mumbai, day {i}" if i % 3
+                      else f"Quake near San Francisco {i}"
+                      for i in range(11)]
+
+    def test_results_in_order(self):
+        self.assertTrue(self.pool.ready)
+        batch = self.extractor.extract_locations_batch(self.texts)
+        self.assertEqual(batch, [["Mumbai"] if i % 3 else ["San Francisco"]
+                                 for i in range(11)])
+
+    def test_warm_up_reaches_every_worker(self):
+        self.assertTrue(self.pool.warm_up())
+        processes = self.pool._executor._processes
+        self.assertEqual(len(processes), 2)
+        self.assertTrue(all(process.is_alive() for process in processes.values()))
+
+    def test_crashed_worker_is_replaced(self):
+        for process in list(self.pool._executor._processes.values()):
+            process.kill()
+            process.join()
+
+        with self.assertLogs(ner_pool.logger, 'WARNING'):
+            batch = self.pool.extract(self.texts, batch_size=4)
+        self.assertEqual(len(batch), 11)
+        self.assertEqual(batch[3], ["San Francisco"])
+        self.assertEqual(self.pool.extract(["Bay Area"], batch_size=4), [["Bay Area"]])
+
+
+class TestLazyModelLoading(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(location_extraction, '_nlp', None),
+            mock.patch.object(location_extraction, '_nlp_loaded', False),
+            mock.patch.object(location_extraction, '_warmup_thread', None),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(spacy, 'load', return_value=build_pipeline())
+        self.load = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_model_loads_once_on_first_use(self):
+        self.assertFalse(location_extraction.is_model_ready())
+        nlp = location_extraction.get_nlp()
+        self.assertIs(location_extraction.get_nlp(), nlp)
+        self.assertTrue(location_extraction.is_model_ready())
+        self.load.assert_called_once_with(location_extraction.SPACY_MODEL)
+
+    def test_gazetteer_mode_never_loads_model(self):
+        extractor = location_extraction.LocationExtractor(mode='gazetteer')
+        self.assertEqual(extractor.extract_locations_from_text("Flooding in Mumbai"),
+                         ["Mumbai"])
+        self.load.assert_not_called()
+
+    def test_warmup_thread(self):
+        thread = location_extraction.start_model_warmup()
+        thread.join(timeout=10)
+        self.assertTrue(location_extraction.is_model_ready())
+        self.assertIsNone(location_extraction.start_model_warmup())
+
+    def test_missing_model(self):
+        self.load.side_effect = OSError("model not found")
+        with self.assertLogs(location_extraction.logger, 'ERROR'):
+            self.assertIsNone(location_extraction.get_nlp())
+        self.assertIsNone(location_extraction.get_nlp())
+        self.assertFalse(location_extraction.is_model_ready())
+        self.load.assert_called_once()
+
+
+def nominatim_response(results):
+    return mock.Mock(status_code=200, headers={}, json=mock.Mock(return_value=results))
+
+
+class TestGeocodeCache(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        patches = [
+            mock.patch.object(database, 'DATABASE_PATH',
+                              os.path.join(tmpdir.name, "test.db")),
+            mock.patch.object(location_extraction.requests, 'get'),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(database.connection_pool.close_all)
+        self.addCleanup(flush_database_logging)
+        database.init_database()
+        self.get = location_extraction.requests.get
+
+    def make_extractor(self):
+        return location_extraction.LocationExtractor(
+            rate_limiter=TokenBucket('nominatim', rate=1000, capacity=1000))
+
+    def test_result_shared_through_database(self):
+        self.get.return_value = nominatim_response([{'lat': "19.05", 'lon': "72.84"}])
+        self.assertEqual(self.make_extractor().geocode_location("Bandra"),
+                         (19.05, 72.84))
+
+        # A fresh extractor, as in another process, normalizes the key and
+        # skips Nominatim
+        hits = metrics.metrics['geocode_cache_hits']
+        self.assertEqual(self.make_extractor().geocode_location("  BANDRA. "),
+                         (19.05, 72.84))
+        self.assertEqual(self.get.call_count, 1)
+        self.assertEqual(metrics.metrics['geocode_cache_hits'], hits + 1)
+
+    def test_not_found_cached_with_negative_ttl(self):
+        self.get.return_value = nominatim_response([])
+        extractor = self.make_extractor()
+        self.assertIsNone(extractor.geocode_location("Atlantis"))
+        self.assertIsNone(extractor.geocode_location("atlantis"))
+        self.assertEqual(self.get.call_count, 1)
+
+        found, coordinates, expires = database.get_geocode_cache_entry("atlantis")
+        self.assertTrue(found)
+        self.assertIsNone(coordinates)
+        self.assertAlmostEqual(expires - time.time(),
+                               location_extraction.GEOCODE_NEGATIVE_TTL, delta=60)
+
+    def test_request_errors_not_persisted(self):
+        self.get.side_effect = ConnectionError("offline")
+        with self.assertLogs('core.location_extraction', 'ERROR'):
+            self.assertIsNone(self.make_extractor().geocode_location("Bandra"))
+        self.assertFalse(database.get_geocode_cache_entry("bandra")[0])
+
+    def test_gazetteer_resolves_offline(self):
+        hits = metrics.metrics['gazetteer_hits']
+        self.assertEqual(self.make_extractor().geocode_location("Bombay"),
+                         (19.07283, 72.88261))
+        self.get.assert_not_called()
+        self.assertEqual(metrics.metrics['gazetteer_hits'], hits + 1)
+
+    def test_warm_load_skips_expired(self):
+        database.save_geocode_cache_entry("tokyo", (35.67, 139.65), 3600)
+        database.save_geocode_cache_entry("houston", (29.76, -95.36), 3600)
+        with database.get_db_connection() as conn:
+            conn.execute("UPDATE geocode_cache "
+                         "SET expires_at = datetime('now', '-1 hour') "
+                         "WHERE location_key = 'houston'")
+            conn.commit()
+
+        extractor = self.make_extractor()
+        self.assertEqual(extractor.warm_geocode_cache(), 1)
+        self.assertEqual(extractor.geocoding_cache.get("tokyo")[0], (35.67, 139.65))
+
+    def test_memory_cache_bounded_and_expiring(self):
+        self.get.return_value = nominatim_response([{'lat': "1.0", 'lon': "2.0"}])
+        extractor = location_extraction.LocationExtractor(
+            rate_limiter=TokenBucket('nominatim', rate=1000, capacity=1000),
+            memory_cache_size=2)
+        for place in ("Alpha", "Bravo", "Alpha", "Charlie"):
+            extractor.geocode_location(place)
+        self.assertEqual(len(extractor.geocoding_cache), 2)
+        self.assertIsNone(extractor.geocoding_cache.get("bravo"))  # Least recently used
+        self.assertIsNotNone(extractor.geocoding_cache.get("alpha"))
+
+        with mock.patch.object(location_extraction.time, 'time',
+                               return_value=time.time() + 2 * extractor.positive_ttl):
+            self.assertIsNone(extractor.geocoding_cache.get("alpha"))
+        self.assertEqual(len(extractor.geocoding_cache), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
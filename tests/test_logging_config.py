@@ -0,0 +1,65 @@
+import logging
+import os
+import tempfile
+import unittest
+
+from core import database
+from utils.logging_config import DatabaseHandler
+
+
+def make_record(message, level=logging.WARNING):
+    return logging.LogRecord("crowdsense.test", level, __file__, 1, message, None, None)
+
+
+class TestDatabaseHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_path = database.DATABASE_PATH
+        database.DATABASE_PATH = os.path.join(self.tmpdir.name, "test.db")
+        database.init_database()
+
+    def tearDown(self):
+        database.connection_pool.close_all()
+        database.DATABASE_PATH = self.original_path
+        self.tmpdir.cleanup()
+
+    def logged_messages(self):
+        with database.get_db_connection() as conn:
+            rows = conn.execute(
+                "SELECT message FROM system_logs ORDER BY id").fetchall()
+        return [row['message'] for row in rows]
+
+    def test_flush_writes_queued_records(self):
+        handler = DatabaseHandler(batch_size=50, flush_interval=60)
+        try:
+            for i in range(5):
+                handler.emit(make_record(f"anomaly {i}"))
+            handler.flush()
+            self.assertEqual(self.logged_messages(), [f"anomaly {i}" for i in range(5)])
+        finally:
+            handler.close()
+
+    def test_overflow_drops_oldest(self):
+        handler = DatabaseHandler(max_queue_size=3, batch_size=100, flush_interval=60)
+        try:
+            for i in range(5):
+                handler.emit(make_record(f"record {i}"))
+            self.assertEqual(handler.dropped_records, 2)
+            handler.flush()
+            self.assertEqual(self.logged_messages(),
+                             ["record 2", "record 3", "record 4"])
+        finally:
+            handler.close()
+
+    def test_close_drains_queue(self):
+        handler = DatabaseHandler(batch_size=100, flush_interval=60)
+        for i in range(3):
+            handler.emit(make_record(f"shutdown {i}"))
+        handler.close()
+        self.assertEqual(len(self.logged_messages()), 3)
+        handler.emit(make_record("after close"))
+        self.assertEqual(len(self.logged_messages()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
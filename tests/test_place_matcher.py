@@ -0,0 +1,64 @@
+import random
+import unittest
+
+from core.gazetteer import Gazetteer
+from core.place_matcher import AhoCorasick, PlaceMatcher, fold_text
+
+PLACES = [
+    {'name': "York", 'latitude': 53.96, 'longitude': -1.08, 'population': 153717},
+    {'name': "New York", 'alternate_names': "New York City",
+     'latitude': 40.71, 'longitude': -74.01, 'population': 8804190},
+    {'name': "São Paulo", 'latitude': -23.55, 'longitude': -46.64,
+     'population': 10021295},
+    {'name': "Nice", 'latitude': 43.70, 'longitude': 7.27, 'population': 338620},
+    {'name': "Mumbai", 'alternate_names': "Bombay",
+     'latitude': 19.07, 'longitude': 72.88, 'population': 12691836},
+]
+
+
+class TestAhoCorasick(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        patterns = {"".join(rng.choice("abc") for _ in range(rng.randint(1, 4)))
+                    for _ in range(30)}
+        automaton = AhoCorasick(patterns)
+
+        for _ in range(50):
+            text = "".join(rng.choice("abcd") for _ in range(40))
+            expected = sorted((i, i + len(p))
+                              for p in patterns for i in range(len(text))
+                              if text.startswith(p, i))
+            self.assertEqual(sorted(automaton.find_all(text)), expected)
+
+    def test_fold_text_tracks_positions(self):
+        folded, positions = fold_text("São  PAULO")
+        self.assertEqual(folded, "sao paulo")
+        self.assertEqual(positions, [0, 1, 2, 3, 5, 6, 7, 8, 9])
+
+
+class TestPlaceMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = PlaceMatcher(Gazetteer(PLACES))
+
+    def test_leftmost_longest_with_spans(self):
+        text = "Flooding in New York City and York"
+        places = self.matcher.match(text)
+        self.assertEqual([(p['start'], p['end'], p['name']) for p in places],
+                         [(12, 25, "New York"), (30, 34, "York")])
+        self.assertEqual(text[places[0]['start']:places[0]['end']], "New York City")
+
+    def test_word_boundaries_and_capitalization(self):
+        self.assertEqual(self.matcher.extract("Newyorkers in Yorkshire feel Nice"),
+                         ["Nice"])
+        self.assertEqual(self.matcher.extract("what a nice day in york"), [])
+        self.assertEqual(PlaceMatcher(Gazetteer(PLACES), require_capitalized=False)
+                         .extract("what a nice day in york"), ["nice", "york"])
+
+    def test_aliases_accents_and_duplicates(self):
+        text = "#Bombay rains, SAO   PAULO storms, Bombay again"
+        self.assertEqual(self.matcher.extract(text), ["Bombay", "SAO   PAULO"])
+        self.assertEqual(self.matcher.match("Rain in Bombay")[0]['name'], "Mumbai")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from core.query_planner import (
+    build_or_query, plan_keyword_queries, match_keywords, demultiplex, group_since_id,
+    is_newer
+)
+
+
+class TestQueryPlanning(unittest.TestCase):
+    def test_build_or_query(self):
+        self.assertEqual(build_or_query(["flood"]), "flood")
+        self.assertEqual(build_or_query(["flood", "forest fire"]),
+                         'flood OR "forest fire"')
+        self.assertEqual(build_or_query(["flood", "fire"], "lang:en"),
+                         "(flood OR fire) lang:en")
+        self.assertEqual(build_or_query(["flood"], "lang:en"), "flood lang:en")
+
+    def test_groups_respect_length_limit(self):
+        keywords = [f"keyword{i}" for i in range(50)]
+        groups = plan_keyword_queries(keywords, max_query_length=100,
+                                      suffix="-is:retweet lang:en")
+        self.assertEqual([k for group in groups for k in group], keywords)
+        for group in groups:
+            self.assertLessEqual(len(build_or_query(group, "-is:retweet lang:en")), 100)
+        self.assertLess(len(groups), len(keywords) / 3)
+
+    def test_oversized_keyword_gets_own_group(self):
+        with self.assertLogs('core.query_planner', 'WARNING'):
+            groups = plan_keyword_queries(["flood", "x" * 30, "fire"],
+                                          max_query_length=20)
+        self.assertEqual(groups, [["flood"], ["x" * 30], ["fire"]])
+
+
+class TestDemultiplexing(unittest.TestCase):
+    def test_match_keywords_whole_words(self):
+        keywords = ["fire", "flood", "forest fire"]
+        self.assertEqual(
+            match_keywords("Forest FIRE spreading, #flood warning", keywords),
+            ["fire", "flood", "forest fire"])
+        self.assertEqual(match_keywords("firefighters at the floodgates", keywords), [])
+
+    def test_tweet_counted_for_each_keyword(self):
+        tweets = [
+            {'id': "1", 'text': "Flood after the storm"},
+            {'id': "2", 'text': "storm warning"},
+            {'id': "3", 'text': "nothing relevant"},
+        ]
+        split = demultiplex(tweets, ["flood", "storm", "fire"])
+        self.assertEqual({k: [t['id'] for t in v] for k, v in split.items()},
+                         {"flood": ["1"], "storm": ["1", "2"], "fire": []})
+
+    def test_single_keyword_query_keeps_everything(self):
+        tweets = [{'id': "1", 'text': "nothing relevant"}]
+        self.assertEqual(demultiplex(tweets, ["flood"]), {"flood": tweets})
+
+    def test_group_since_id(self):
+        self.assertEqual(group_since_id(["a", "b"], {"a": "100", "b": "99"}), "99")
+        self.assertIsNone(group_since_id(["a", "b"], {"a": "100"}))
+        self.assertTrue(is_newer("1000", "999"))
+        self.assertFalse(is_newer("999", "999"))
+        self.assertTrue(is_newer("1", None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+import unittest
+from email.utils import formatdate
+from unittest import mock
+
+from utils import rate_limiter
+from utils.rate_limiter import TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket('test', rate=2, capacity=4, cooldown=60,
+                                  clock=self.clock)
+        # Keep the test buckets' warnings out of the log database
+        patcher = mock.patch.object(rate_limiter.logger, 'warning')
+        self.warning = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_then_refill(self):
+        self.assertTrue(all(self.bucket.try_acquire() for _ in range(4)))
+        self.assertFalse(self.bucket.try_acquire())
+        self.assertAlmostEqual(self.bucket.wait_time(), 0.5)
+
+        self.clock.now += 0.5
+        self.assertTrue(self.bucket.try_acquire())
+        self.clock.now += 100
+        self.assertEqual(self.bucket.remaining, 4)
+
+    def test_waits_only_for_the_missing_share(self):
+        for _ in range(4):
+            self.bucket.try_acquire()
+        self.clock.now += 0.4
+
+        with mock.patch.object(rate_limiter.time, 'sleep') as sleep:
+            self.assertTrue(self.bucket.acquire())
+            self.assertTrue(self.bucket.acquire())
+        self.assertEqual([round(call.args[0], 6) for call in sleep.call_args_list],
+                         [0.1, 0.6])
+
+        # Nothing is taken when the wait would exceed the timeout
+        self.assertFalse(self.bucket.acquire(timeout=0.5))
+        self.assertAlmostEqual(self.bucket.remaining, -1.2)
+
+    def test_retry_after(self):
+        self.bucket.update_from_headers({'Retry-After': '30'}, 429)
+        self.assertAlmostEqual(self.bucket.wait_time(), 30.5)
+        self.clock.now += 30
+        self.assertAlmostEqual(self.bucket.wait_time(), 0.5)
+
+        date = formatdate(time.time() + 120, usegmt=True)
+        self.assertAlmostEqual(parse_retry_after(date), 120, delta=2)
+        self.assertIsNone(parse_retry_after("soon"))
+
+    def test_twitter_rate_limit_headers(self):
+        reset = str(time.time() + 600)
+        self.bucket.update_from_headers({'x-rate-limit-remaining': '1',
+                                         'x-rate-limit-reset': reset}, 200)
+        self.assertEqual(self.bucket.remaining, 1)
+
+        self.bucket.update_from_headers({'x-rate-limit-remaining': '0',
+                                         'x-rate-limit-reset': reset}, 200)
+        self.assertAlmostEqual(self.bucket.wait_time(), 600.5, delta=1)
+        self.assertFalse(self.bucket.try_acquire())
+
+    def test_429_without_headers_uses_cooldown(self):
+        self.bucket.update_from_headers({}, 429)
+        self.assertAlmostEqual(self.bucket.wait_time(), 60.5)
+        self.warning.assert_called_once()
+
+    def test_gauge(self):
+        self.bucket.try_acquire()
+        self.assertEqual(rate_limiter.metrics.metrics['rate_limit_remaining_test'], 3)
+        self.assertEqual(self.bucket.status()['remaining'], 3)
+
+
+class TestConcurrentAcquire(unittest.TestCase):
+    def test_threads_and_tasks_share_the_budget(self):
+        bucket = TokenBucket('concurrent', rate=50, capacity=5)
+        start = time.monotonic()
+
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+
+        async def acquire_all():
+            await asyncio.gather(*(bucket.acquire_async() for _ in range(5)))
+        asyncio.run(acquire_all())
+
+        for thread in threads:
+            thread.join()
+
+        # 5 tokens up front, the other 10 at 50 per second
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+        self.assertLess(bucket.remaining, 1)
+
+    def test_providers(self):
+        self.assertEqual(set(rate_limiter.get_rate_limit_status()),
+                         {'twitter', 'newsapi', 'nominatim', 'groq', 'twilio'})
+
+
+if __name__ == "__main__":
+    unittest.main()
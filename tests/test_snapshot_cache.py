@@ -0,0 +1,113 @@
+import threading
+import unittest
+
+from core.snapshot_cache import SnapshotCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSnapshotCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.calls = 0
+
+    def build(self):
+        self.calls += 1
+        return {'version': self.calls}
+
+    def test_served_from_memory_until_expired(self):
+        cache = SnapshotCache(self.build, ttl=30, clock=self.clock)
+        self.assertIsNone(cache.age())
+        self.assertEqual(cache.get(), ({'version': 1}, 0.0))
+
+        self.clock.now += 10
+        self.assertEqual(cache.get(), ({'version': 1}, 10.0))
+        self.assertEqual(self.calls, 1)
+
+        self.clock.now += 25
+        self.assertEqual(cache.get(), ({'version': 2}, 0.0))
+
+    def test_refresh_and_clear(self):
+        cache = SnapshotCache(self.build, ttl=30, clock=self.clock)
+        cache.get()
+        self.clock.now += 5
+        self.assertEqual(cache.refresh(), {'version': 2})
+        self.assertEqual(cache.age(), 0.0)
+        cache.clear()
+        self.assertEqual(cache.get()[0], {'version': 3})
+
+    def test_single_flight_rebuild_serves_stale_copy(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_build():
+            if self.calls:
+                started.set()
+                release.wait(5)
+            return self.build()
+
+        cache = SnapshotCache(slow_build, ttl=30, clock=self.clock)
+        cache.get()
+        self.clock.now += 60
+
+        rebuilt = []
+        rebuilder = threading.Thread(target=lambda: rebuilt.append(cache.get()))
+        rebuilder.start()
+        self.assertTrue(started.wait(5))
+
+        # Readers arriving during the rebuild get the expired snapshot without building
+        readers = [cache.get() for _ in range(20)]
+        self.assertEqual(readers, [({'version': 1}, 60.0)] * 20)
+
+        release.set()
+        rebuilder.join(5)
+        self.assertEqual(rebuilt, [({'version': 2}, 0.0)])
+        self.assertEqual(self.calls, 2)
+
+    def test_concurrent_first_build_runs_once(self):
+        release = threading.Event()
+
+        def slow_build():
+            release.wait(5)
+            return self.build()
+
+        cache = SnapshotCache(slow_build, ttl=30, clock=self.clock)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get()[0]))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(results, [{'version': 1}] * 8)
+        self.assertEqual(self.calls, 1)
+
+    def test_failed_rebuild_keeps_previous_snapshot(self):
+        fail = []
+
+        def flaky_build():
+            if fail:
+                raise RuntimeError("database unavailable")
+            return self.build()
+
+        cache = SnapshotCache(flaky_build, ttl=30, clock=self.clock)
+        cache.get()
+        self.clock.now += 45
+        fail.append(True)
+        with self.assertRaises(RuntimeError):
+            cache.get()
+        self.assertEqual(cache.age(), 45.0)
+
+        fail.clear()
+        self.assertEqual(cache.get(), ({'version': 2}, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
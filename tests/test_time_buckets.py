@@ -0,0 +1,74 @@
+import random
+import unittest
+from datetime import timedelta
+
+from core.time_buckets import BucketedCounter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBucketedCounter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.counter = BucketedCounter(bucket_seconds=10, horizon=timedelta(minutes=60),
+                                       clock=self.clock)
+
+    def test_counts_expire_with_the_window(self):
+        self.counter.add("flood", 5)
+        self.clock.now += 30
+        self.counter.add("flood", 2)
+        self.assertEqual(self.counter.window_sum("flood", 60), 7)
+        self.assertEqual(self.counter.window_sum("flood", 10), 2)
+
+        self.clock.now += 45
+        self.assertEqual(self.counter.window_sum("flood", 60), 2)
+        self.assertEqual(self.counter.window_sum("fire", 60), 0)
+
+    def test_multiple_windows_in_one_pass(self):
+        for minute in range(90):
+            self.counter.add("storm", minute)
+            self.clock.now += 60
+        self.clock.now -= 60
+
+        windows = [timedelta(minutes=1), timedelta(minutes=5),
+                   timedelta(minutes=15), 3600]
+        self.assertEqual(self.counter.window_sums("storm", windows),
+                         [89, sum(range(85, 90)), sum(range(75, 90)),
+                          sum(range(30, 90))])
+
+    def test_matches_per_event_timestamps(self):
+        rng = random.Random(11)
+        events = []
+        for _ in range(2000):
+            self.clock.now += rng.choice([0, 1, 3, 10, 45])
+            count = rng.randint(0, 50)
+            self.counter.add("kw", count)
+            events.append((self.clock.now, count))
+
+            # Whole buckets: the window starts at the beginning of the oldest
+            # bucket it covers
+            start = (self.clock.now // 10 - 29) * 10
+            expected = sum(c for t, c in events if t >= start)
+            self.assertEqual(self.counter.window_sum("kw", 300), expected)
+
+    def test_clear_and_horizon(self):
+        self.counter.add("a", 3)
+        self.counter.add("b", 4)
+        self.counter.clear("a")
+        self.assertEqual(self.counter.window_sums("a", [60]), [0])
+        self.assertEqual(self.counter.window_sum("b", 60), 4)
+        self.counter.clear()
+        self.assertEqual(self.counter.window_sum("b", 60), 0)
+
+        with self.assertRaises(ValueError):
+            self.counter.window_sum("b", timedelta(hours=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from typing import Optional
 import random
 from utils.config import get_twilio_client, TWILIO_PHONE, MY_PHONE, require
+from utils.rate_limiter import get_rate_limiter
 
 
 def send_alert(message: str, to_phone: Optional[str] = None) -> str:
@@ -53,6 +54,8 @@ def send_alert(message: str, to_phone: Optional[str] = None) -> str:
     ]
     final_message += random.choice(suffixes)
     
+    # Stay within the sending number's messages-per-second limit
+    get_rate_limiter('twilio').acquire()
     sms = client.messages.create(
         body=final_message,
         from_=from_number,
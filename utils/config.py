@@ -18,6 +18,54 @@ TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE = os.getenv("TWILIO_PHONE")
 MY_PHONE = os.getenv("MY_PHONE")
 
+# Number of keywords fetched concurrently per analysis cycle (1 = serial)
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+
+# Ingestion engine: "threads" (requests + thread pool) or "async" (aiohttp)
+INGESTION_MODE = os.getenv("INGESTION_MODE", "threads")
+
+# Keywords are packed into OR queries up to this length
+# (512 on Basic/Pro, 4096 on Enterprise)
+TWITTER_MAX_QUERY_LENGTH = int(os.getenv("TWITTER_MAX_QUERY_LENGTH", "512"))
+
+# Twitter recent search requests allowed per 15 minute window (60 on Basic, 450 on Pro)
+TWITTER_RATE_LIMIT = int(os.getenv("TWITTER_RATE_LIMIT", "60"))
+
+# Anomaly detection: "vectorized" (z-score over the last 15 windows),
+# "seasonal" (z-score against hour-of-week baselines), "cusum" /
+# "page_hinkley" (change-point detection, faster on slow-building events),
+# "zscore" (the per-keyword form of "vectorized") or "adaptive" (2x running average)
+ANOMALY_METHOD = os.getenv("ANOMALY_METHOD", "vectorized")
+
+# Anomaly detector state written by the scheduler and restored at startup, and
+# how old (in seconds) a snapshot may be before history is replayed from the
+# database instead
+DETECTOR_SNAPSHOT_PATH = os.getenv("DETECTOR_SNAPSHOT_PATH", "detector_state.npz")
+DETECTOR_SNAPSHOT_MAX_AGE = int(os.getenv("DETECTOR_SNAPSHOT_MAX_AGE", "3600"))
+
+# Seconds the web dashboard serves its in-memory data snapshot before rebuilding it
+# (each ingestion cycle also refreshes it)
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "30"))
+
+# Location extraction: "ner" (spaCy), "gazetteer" (place name matching)
+# or "hybrid" (both)
+LOCATION_EXTRACTION_MODE = os.getenv("LOCATION_EXTRACTION_MODE", "ner")
+
+# Load the spaCy model in a background thread at startup instead of on first use
+NER_WARMUP = os.getenv("NER_WARMUP", "true").lower() == "true"
+
+# Run NER in worker processes instead of the calling thread, and how many
+# (defaults to the core count)
+NER_PROCESS_POOL = os.getenv("NER_PROCESS_POOL", "false").lower() == "true"
+NER_WORKERS = int(os.getenv("NER_WORKERS") or os.cpu_count() or 1)
+
+# Offline gazetteer (GeoNames dump or headered TSV) tried before Nominatim
+GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                 "data", "gazetteer.tsv")
+)
+
 
 def require(value: str, name: str) -> str:
     if not value:
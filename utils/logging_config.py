@@ -4,16 +4,45 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import logging
 import json
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from typing import Dict, Any, Optional
-from core.database import log_to_database
+from core.database import save_system_logs
 
 
 class DatabaseHandler(logging.Handler):
-    """Custom logging handler that logs to database"""
+    """
+    Non-blocking logging handler that writes records to the database
+
+    emit() only appends to a bounded in-memory queue; a background writer
+    thread flushes system_logs rows in batches once batch_size records are
+    waiting or flush_interval seconds have passed. When the queue is full
+    the oldest record is dropped and counted.
+    """
+
+    def __init__(self, level=logging.NOTSET, max_queue_size: int = 10000,
+                 batch_size: int = 100, flush_interval: float = 2.0):
+        super().__init__(level)
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.dropped_records = 0
+        self.failed_records = 0
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+
+        self._writer = threading.Thread(target=self._run_writer,
+                                        name='db-log-writer', daemon=True)
+        self._writer.start()
     
     def emit(self, record):
-        """Emit a log record to the database"""
+        """Queue a log record for the database writer"""
         try:
             # Extract extra data from the record
             extra_data = {}
@@ -25,16 +54,83 @@ class DatabaseHandler(logging.Handler):
                               'getMessage', 'exc_info', 'exc_text', 'stack_info']:
                     extra_data[key] = value
             
-            # Log to database
-            log_to_database(
-                level=record.levelname,
-                module=record.module,
-                message=record.getMessage(),
-                extra_data=extra_data if extra_data else None
-            )
+            entry = (record.levelname, record.module, record.getMessage(),
+                     extra_data if extra_data else None)
         except Exception:
             # Avoid infinite recursion if database logging fails
-            pass
+            return
+
+        dropped = False
+        with self.condition:
+            if self._closed:
+                return
+            if len(self.queue) >= self.max_queue_size:
+                self.queue.popleft()
+                self.dropped_records += 1
+                dropped = True
+            self.queue.append(entry)
+            if len(self.queue) >= self.batch_size:
+                self.condition.notify_all()
+
+        if dropped:
+            metrics.increment('log_records_dropped')
+
+    def _next_batch(self):
+        """Wait for a full batch, the flush interval, a flush request or close"""
+        with self.condition:
+            deadline = time.monotonic() + self.flush_interval
+            while (not self._closed and not self._flush_requested
+                   and len(self.queue) < self.batch_size):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            batch = [self.queue.popleft()
+                     for _ in range(min(self.batch_size, len(self.queue)))]
+            if not self.queue:
+                self._flush_requested = False
+            self._in_flight = len(batch)
+            return batch, self._closed
+
+    def _run_writer(self):
+        """Background loop that writes queued records in batches"""
+        while True:
+            batch, closed = self._next_batch()
+
+            if batch:
+                try:
+                    save_system_logs(batch)
+                except Exception:
+                    # Never log from here: the record would come straight back
+                    self.failed_records += len(batch)
+
+            with self.condition:
+                self._in_flight = 0
+                self.condition.notify_all()
+                if closed and not self.queue:
+                    return
+
+    def flush(self, timeout: float = 5.0):
+        """Block until every queued record has been written (or timeout)"""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            self._flush_requested = True
+            self.condition.notify_all()
+            while self.queue or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._writer.is_alive():
+                    break
+                self.condition.wait(remaining)
+
+    def close(self):
+        """Drain the queue and stop the writer thread"""
+        with self.condition:
+            self._closed = True
+            self.condition.notify_all()
+        if self._writer.is_alive() and self._writer is not threading.current_thread():
+            self._writer.join(timeout=10)
+        super().close()
 
 
 class MetricsCollector:
@@ -49,14 +145,20 @@ class MetricsCollector:
             'errors': 0,
             'locations_extracted': 0,
             'geocoding_requests': 0,
+            'geocode_cache_hits': 0,
+            'geocode_cache_misses': 0,
+            'gazetteer_hits': 0,
+            'log_records_dropped': 0,
             'start_time': datetime.utcnow()
         }
         self.logger = logging.getLogger('metrics')
+        self._lock = threading.Lock()
     
     def increment(self, metric_name: str, value: int = 1):
-        """Increment a metric counter"""
+        """Increment a metric counter (safe to call from worker threads)"""
         if metric_name in self.metrics:
-            self.metrics[metric_name] += value
+            with self._lock:
+                self.metrics[metric_name] += value
             self.logger.debug(f"Metric {metric_name} incremented by {value} to {self.metrics[metric_name]}")
     
     def set_metric(self, metric_name: str, value: Any):
@@ -91,6 +193,10 @@ class MetricsCollector:
             'errors': 0,
             'locations_extracted': 0,
             'geocoding_requests': 0,
+            'geocode_cache_hits': 0,
+            'geocode_cache_misses': 0,
+            'gazetteer_hits': 0,
+            'log_records_dropped': 0,
             'start_time': start_time
         }
 
@@ -117,11 +223,13 @@ def setup_logging(level: str = 'INFO', enable_db_logging: bool = True):
         ]
     )
     
-    # Add database handler if enabled
-    if enable_db_logging:
+    # Add database handler if enabled (once, even if setup runs again)
+    root_logger = logging.getLogger()
+    has_db_handler = any(isinstance(h, DatabaseHandler) for h in root_logger.handlers)
+    if enable_db_logging and not has_db_handler:
         db_handler = DatabaseHandler()
         db_handler.setLevel(logging.WARNING)  # Only log warnings and errors to DB
-        logging.getLogger().addHandler(db_handler)
+        root_logger.addHandler(db_handler)
     
     # Set up specific loggers
     loggers = {
@@ -144,6 +252,13 @@ def setup_logging(level: str = 'INFO', enable_db_logging: bool = True):
     logging.info("Structured logging initialized")
 
 
+def flush_database_logging(timeout: float = 5.0):
+    """Write out any log records still queued for the database"""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DatabaseHandler):
+            handler.flush(timeout)
+
+
 class ContextLogger:
     """Logger with context information"""
     
@@ -0,0 +1,225 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from utils.config import TWITTER_RATE_LIMIT
+from utils.logging_config import get_logger, metrics
+
+logger = get_logger('crowdsense.rate_limiter')
+
+# Per-provider budgets: (requests, per seconds, burst, cooldown after a 429
+# without rate limit headers)
+PROVIDER_LIMITS = {
+    'twitter': (TWITTER_RATE_LIMIT, 15 * 60, 10, 15 * 60),  # Recent search window
+    'newsapi': (100, 24 * 3600, 10, 3600),                    # Developer plan
+    'nominatim': (1, 1, 1, 60),                               # Usage policy: 1/s
+    'groq': (30, 60, 5, 60),                                  # Free tier per minute
+    'twilio': (1, 1, 1, 60),                                  # Long code: 1/s
+}
+
+# Longest a request waits for its provider's budget before giving up for this cycle
+MAX_WAIT = 30
+
+
+def parse_retry_after(value: Optional[str], now: float = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay in seconds or an HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (now if now is not None else time.time()))
+
+
+class TokenBucket:
+    """
+    Token bucket shared by threads and asyncio tasks calling one provider
+
+    Callers reserve tokens up front, so concurrent callers queue in order and
+    sleep exactly as long as their turn needs instead of polling.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float, cooldown: float = 60,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the bucket, full
+
+        Args:
+            name: Provider name, used for the remaining-budget gauge
+            rate: Tokens added per second
+            capacity: Maximum burst size
+            cooldown: Seconds to pause after a 429 that carries no rate limit headers
+            clock: Monotonic time source
+        """
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.cooldown = cooldown
+        self._clock = clock
+        self._tokens = float(capacity)
+        # Tokens accrue from here; may be in the future while blocked
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            refill = (now - self._updated) * self.rate
+            self._tokens = min(self.capacity, self._tokens + refill)
+            self._updated = now
+
+    def _wait(self, tokens: float, now: float) -> float:
+        # Caller holds _lock and has refilled up to now
+        shortfall = max(0.0, tokens - self._tokens)
+        return max(0.0, self._updated - now) + shortfall / self.rate
+
+    def _reserve(self, tokens: float, timeout: Optional[float]) -> Optional[float]:
+        """
+        Take tokens, returning how long the caller must wait before using them
+        (None if that is over timeout)
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            wait = self._wait(tokens, now)
+            if timeout is not None and wait > timeout:
+                return None
+            self._tokens -= tokens
+            self._publish()
+            return wait
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens only if they are available right now"""
+        return self._reserve(tokens, 0) is not None
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, sleeping until they are available
+
+        Args:
+            tokens: Tokens to take (one per request)
+            timeout: Give up without taking anything if the wait would be longer
+
+        Returns:
+            Whether the tokens were taken
+        """
+        wait = self._reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self, tokens: float = 1,
+                            timeout: Optional[float] = None) -> bool:
+        """Like acquire(), but yields to the event loop while waiting"""
+        wait = self._reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Seconds until tokens would be available, without taking them"""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            return self._wait(tokens, now)
+
+    def block_for(self, seconds: float):
+        """Empty the bucket and hold it empty for a number of seconds"""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, now + seconds)
+            self._publish()
+        logger.warning(f"{self.name} rate limited, pausing requests for {seconds:.0f}s",
+                       provider=self.name, pause_seconds=seconds)
+
+    def update_from_headers(self, headers: Mapping[str, Any], status: int = None):
+        """
+        Align the bucket with a provider's response
+
+        Honors Retry-After, and Twitter's x-rate-limit-remaining and
+        x-rate-limit-reset (epoch seconds). A 429 with neither pauses for the
+        bucket's cooldown.
+
+        Args:
+            headers: Response headers
+            status: Response status code
+        """
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        wall_now = time.time()
+
+        retry_after = parse_retry_after(headers.get('retry-after'), wall_now)
+        if retry_after is not None and status in (429, 503):
+            self.block_for(retry_after)
+            return
+
+        try:
+            remaining = int(headers['x-rate-limit-remaining'])
+            reset = float(headers['x-rate-limit-reset'])
+        except (KeyError, TypeError, ValueError):
+            remaining = reset = None
+
+        if remaining is not None:
+            if remaining <= 0 or status == 429:
+                self.block_for(max(0.0, reset - wall_now))
+            else:
+                with self._lock:
+                    self._refill(self._clock())
+                    self._tokens = min(self._tokens, float(remaining))
+                    self._publish()
+            return
+
+        if status == 429:
+            self.block_for(self.cooldown)
+
+    @property
+    def remaining(self) -> float:
+        """Tokens available right now (negative while callers are queued)"""
+        with self._lock:
+            self._refill(self._clock())
+            return self._tokens
+
+    def _publish(self):
+        """Update the remaining-budget gauge (called with the lock held)"""
+        metrics.set_metric(f'rate_limit_remaining_{self.name}', round(self._tokens, 2))
+
+    def status(self) -> Dict[str, Any]:
+        """Remaining budget, for dashboards and health checks"""
+        return {
+            'remaining': round(self.remaining, 2),
+            'capacity': self.capacity,
+            'rate_per_second': self.rate,
+            'wait_seconds': round(self.wait_time(), 2),
+        }
+
+
+# Global per-provider limiters shared by every client in the process
+rate_limiters: Dict[str, TokenBucket] = {
+    name: TokenBucket(name, rate=requests / seconds, capacity=burst, cooldown=cooldown)
+    for name, (requests, seconds, burst, cooldown) in PROVIDER_LIMITS.items()
+}
+
+
+def get_rate_limiter(provider: str) -> TokenBucket:
+    """Get the shared limiter for a provider"""
+    return rate_limiters[provider]
+
+
+def get_rate_limit_status() -> Dict[str, Dict[str, Any]]:
+    """Remaining budget of every provider"""
+    return {name: limiter.status() for name, limiter in rate_limiters.items()}
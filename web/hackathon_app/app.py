@@ -2,10 +2,14 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from flask import Flask, render_template, jsonify
-from core.crowdsense_enhanced import get_dashboard_data, initialize_system
-from core.database import get_tweets_with_location, get_recent_alerts, get_system_stats
+from flask import Flask, render_template, jsonify, request
+from core.crowdsense_enhanced import get_cached_dashboard_data, initialize_system
+from core.database import (
+    get_tweets_with_location, get_recent_alerts, get_system_stats, get_volume_series
+)
+from core.location_extraction import is_model_ready
 from core.scheduler import scheduler
+from utils.rate_limiter import get_rate_limit_status
 import threading
 
 app = Flask(__name__)
@@ -17,7 +21,7 @@ initialize_system()
 def index():
     """Render the main dashboard"""
     try:
-        data = get_dashboard_data()
+        data = get_cached_dashboard_data()
         return render_template("index1.html", data=data)
     except Exception as e:
         # Fallback to basic data in case of error
@@ -32,7 +36,7 @@ def index():
 @app.route("/api/data")
 def api_data():
     """API endpoint for live dashboard data"""
-    return jsonify(get_dashboard_data())
+    return jsonify(get_cached_dashboard_data())
 
 @app.route("/api/map-data")
 def map_data():
@@ -68,6 +72,20 @@ def stats():
     except Exception as e:
         return jsonify({'error': str(e)})
 
+
+@app.route("/api/volume")
+def volume():
+    """API endpoint for per-keyword tweet volume over time"""
+    try:
+        granularity = request.args.get('granularity', 'hour')
+        hours = request.args.get('hours', 24, type=int)
+        series = get_volume_series(granularity=granularity, hours=hours,
+                                   keyword=request.args.get('keyword'),
+                                   kind=request.args.get('kind', 'tweets'))
+        return jsonify({'granularity': granularity, 'series': series})
+    except Exception as e:
+        return jsonify({'error': str(e), 'series': []})
+
 @app.route("/api/alerts")
 def alerts():
     """API endpoint for recent alerts"""
@@ -81,7 +99,10 @@ def alerts():
 def scheduler_status():
     """API endpoint for scheduler status"""
     try:
-        return jsonify(scheduler.get_task_status())
+        status = scheduler.get_task_status()
+        status['nlp_model_ready'] = is_model_ready()
+        status['rate_limits'] = get_rate_limit_status()
+        return jsonify(status)
     except Exception as e:
         return jsonify({'error': str(e)})
 
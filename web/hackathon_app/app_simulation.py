@@ -4,8 +4,12 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from flask import Flask, render_template, jsonify, request
 from simulation.crowdsense_simulation import get_dashboard_data, initialize_system
-from core.database import get_tweets_with_location, get_recent_alerts, get_system_stats
+from core.database import (
+    get_tweets_with_location, get_recent_alerts, get_system_stats, get_volume_series
+)
+from core.location_extraction import is_model_ready
 from core.scheduler import scheduler
+from utils.rate_limiter import get_rate_limit_status
 from simulation.simulation import (
     simulate_disaster_scenario, 
     get_active_scenarios, 
@@ -75,6 +79,20 @@ def stats():
     except Exception as e:
         return jsonify({'error': str(e)})
 
+
+@app.route("/api/volume")
+def volume():
+    """API endpoint for per-keyword tweet volume over time"""
+    try:
+        granularity = request.args.get('granularity', 'hour')
+        hours = request.args.get('hours', 24, type=int)
+        series = get_volume_series(granularity=granularity, hours=hours,
+                                   keyword=request.args.get('keyword'),
+                                   kind=request.args.get('kind', 'tweets'))
+        return jsonify({'granularity': granularity, 'series': series})
+    except Exception as e:
+        return jsonify({'error': str(e), 'series': []})
+
 @app.route("/api/alerts")
 def alerts():
     """API endpoint for recent alerts"""
@@ -88,7 +106,10 @@ def alerts():
 def scheduler_status():
     """API endpoint for scheduler status"""
     try:
-        return jsonify(scheduler.get_task_status())
+        status = scheduler.get_task_status()
+        status['nlp_model_ready'] = is_model_ready()
+        status['rate_limits'] = get_rate_limit_status()
+        return jsonify(status)
     except Exception as e:
         return jsonify({'error': str(e)})
 